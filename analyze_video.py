@@ -0,0 +1,699 @@
+#!/usr/bin/env python3
+"""
+Kabadi Player Tracking System - Headless Offline Analysis
+Processes a video as fast as possible without any window and writes
+violations, per-frame tracks and timing as JSON lines.
+
+Usage: python analyze_video.py [--video PATH] [--output results.jsonl]
+                               [--annotated-video out.mp4] [--max-frames N]
+                               [--stride N | --adaptive-stride] [--compare-stride]
+                               [--record-cache | --replay [--force-cache]] [--cache DIR]
+                               [--timing] [--metrics metrics.prom]
+                               [--pose-gate | --compare-pose-gate]
+                               [--segments N] [--workers N]
+"""
+
+import argparse
+import contextlib
+import copy
+import json
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from video_config import get_player_tracking_video, get_segment_config
+from player_tracker import (PlayerTracker, open_tracking_video, create_preprocessor, decode_frame,
+                            create_renderer, frame_overlay)
+from modules.detection_cache import DetectionCache
+from modules.event_bus import create_event_bus
+from modules.segment_stitcher import SegmentStitcher, plan_segments
+from modules.trajectory_store import load_trajectories, save_trajectories
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Headless kabadi violation analysis")
+    parser.add_argument('--video', default=None, help="Video file (default: player_tracking video from video_config.py)")
+    parser.add_argument('--output', default='analysis_results.jsonl', help="JSONL file for tracks, violations and timing")
+    parser.add_argument('--annotated-video', default=None, help="Optionally write an annotated video here")
+    parser.add_argument('--width', type=int, default=1280, help="Processing width in pixels")
+    parser.add_argument('--max-frames', type=int, default=0, help="Stop after N frames (0 = whole video)")
+    parser.add_argument('--no-evidence', action='store_true', help="Do not write screenshots/clips to violations/")
+    parser.add_argument('--stride', type=int, default=None, help="Run YOLO every N-th frame (default: video_config.py)")
+    parser.add_argument('--adaptive-stride', action='store_true', help="Adapt the stride to the measured processing time")
+    parser.add_argument('--pose-source', choices=('display', 'native'), default=None,
+                        help="Pose crops from the display or decoded frame (default: native when nothing is drawn "
+                             "or recorded, else video_config.py)")
+    parser.add_argument('--roi', action='store_true', help="Detect only in the boundary band (ROI tiles)")
+    parser.add_argument('--pose-gate', action='store_true',
+                        help="Run pose only for players near the boundary (default: video_config.py)")
+    parser.add_argument('--drift', action='store_true',
+                        help="Re-register the boundary against the setup frame when the camera moves "
+                             "(default: video_config.py)")
+    parser.add_argument('--trajectories', default=None,
+                        help="Keep every player's trajectory and export it to this .npz file")
+    parser.add_argument('--compare-pose-gate', action='store_true',
+                        help="Run without and with pose gating and report pose time and violation event changes")
+    parser.add_argument('--compare-stride', action='store_true',
+                        help="Also run with stride 1 and report speedup and violation event changes")
+    parser.add_argument('--record-cache', action='store_true',
+                        help="Store detections, track IDs and poses in the detection cache")
+    parser.add_argument('--replay', action='store_true',
+                        help="Re-score from the detection cache instead of running YOLO/MediaPipe")
+    parser.add_argument('--cache', default=None,
+                        help="Detection cache directory (default: detection_cache/<video>_<key hash>)")
+    parser.add_argument('--force-cache', action='store_true',
+                        help="Replay a cache recorded for another video or other detection settings (warns)")
+    parser.add_argument('--timing', action='store_true',
+                        help="Time every stage (rolling p50/p95/p99 in the summary and the annotated video)")
+    parser.add_argument('--metrics', default=None, help="Also export stage timings to this Prometheus text file")
+    parser.add_argument('--quiet', action='store_true', help="Only print the final summary")
+    parser.add_argument('--start-frame', type=int, default=0, help="Seek to this frame before analyzing")
+    parser.add_argument('--segments', type=int, default=None,
+                        help="Split the video into N overlapping segments analyzed in parallel and stitched")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes for --segments (default: SEGMENT_WORKERS in video_config.py)")
+    return parser.parse_args(argv)
+
+
+def frame_record(tracker, frame_number, violations, decode_ms, process_ms):
+    """JSON-serialisable record of one analyzed frame"""
+    return {
+        'type': 'frame',
+        'frame': frame_number,
+        'tracks': [
+            {
+                'id': player['stable_id'],
+                'yolo_id': player['yolo_id'],
+                'bbox': list(player['bbox']),
+                'foot': list(player['foot']),
+                'foot_source': 'kalman' if player['predicted'] else 'pose' if player['skeleton'] else 'bbox',
+                'violation': player['violation'],
+                'court_lines': tracker.court.flag_names(player['court_flags'])
+            }
+            for player in tracker.frame_players
+        ],
+        'violations': sorted(violations),
+        'timing_ms': {'decode': round(decode_ms, 3), 'process': round(process_ms, 3)}
+    }
+
+
+def violation_changes(active_violations, violations, frame_number, fps):
+    """Violation start/end events from the change in violating players (updates active_violations)"""
+    events = []
+    for player_id in sorted(violations - set(active_violations)):
+        active_violations[player_id] = frame_number
+        events.append({'type': 'violation_start', 'player': player_id, 'frame': frame_number,
+                       'time_s': round(frame_number / fps, 3)})
+    for player_id in sorted(set(active_violations) - violations):
+        events.append({'type': 'violation_end', 'player': player_id, 'frame': frame_number,
+                       'start_frame': active_violations.pop(player_id), 'time_s': round(frame_number / fps, 3)})
+    return events
+
+
+def open_violation_ends(active_violations, frame_number, fps):
+    """End events of the violations still running at the end of the video"""
+    return [{'type': 'violation_end', 'player': player_id, 'frame': frame_number,
+             'start_frame': active_violations[player_id], 'time_s': round(frame_number / fps, 3),
+             'open_at_end': True}
+            for player_id in sorted(active_violations)]
+
+
+def create_analysis_tracker(args, **tracker_kwargs):
+    """PlayerTracker set up from the command line options"""
+    annotate = args.annotated_video is not None
+    tracker = PlayerTracker(annotate=annotate, record_evidence=not args.no_evidence,
+                            detection_stride=args.stride, roi_detection=args.roi or None,
+                            timing=args.timing or args.metrics is not None or None,
+                            pose_gating=args.pose_gate or None, drift_tracking=args.drift or None,
+                            trajectory_export=args.trajectories, **tracker_kwargs)
+    if args.metrics:
+        tracker.timer.export_path = args.metrics
+    if args.adaptive_stride:
+        tracker.detection_stride.adaptive = True
+    if args.pose_source is not None:
+        tracker.pose_source = args.pose_source
+    elif not annotate and args.no_evidence:
+        # Nothing needs the display frame, so do not resize it just for pose crops
+        tracker.pose_source = 'native'
+    return tracker
+
+
+def open_detection_cache(args, video_path, settings):
+    """DetectionCache of --cache DIR or of the video + settings directory, keyed on both"""
+    if args.cache:
+        cache = DetectionCache(args.cache)
+        cache.key = DetectionCache.key_for(video_path, settings)
+        return cache
+    return DetectionCache.for_video(video_path, settings)
+
+
+def run_analysis(args, tracker=None):
+    """Analyze the video headlessly, return the summary dict (also written to the JSONL file)"""
+    if args.start_frame and (args.record_cache or args.replay):
+        # A cache covers the whole video from frame 0, and replay may not open the video to seek
+        print("Error: --start-frame cannot be combined with the detection cache")
+        if tracker is not None:
+            tracker.close()
+        return None
+    annotate = args.annotated_video is not None
+    if tracker is None:
+        tracker = create_analysis_tracker(args)
+
+    # Detection cache lookup (key: video content + detection settings)
+    cache = None
+    if args.record_cache or args.replay:
+        video_path = args.video or get_player_tracking_video()
+        cache = open_detection_cache(args, video_path, tracker.detection_settings(args.width))
+        if args.replay and tracker.pose_gate is not None and not cache.matches():
+            # Poses recorded without the gate replay with the gate applied to them
+            ungated = open_detection_cache(args, video_path, tracker.detection_settings(args.width, pose_gate=False))
+            if ungated.matches():
+                cache = ungated
+        if args.replay:
+            if not cache.is_complete():
+                print(f"Error: No complete detection cache at {cache.cache_dir} (run with --record-cache first)")
+                tracker.close()
+                return None
+            try:
+                cache.load(force=args.force_cache)
+            except ValueError as e:
+                print(f"Error: {e} (run with --record-cache, or --force-cache to replay it anyway)")
+                tracker.close()
+                return None
+            tracker.start_cache(cache, 'replay')
+    
+    # Replay without drawing or evidence never touches the video
+    decode_video = not args.replay or annotate or not args.no_evidence
+    cap = None
+    if decode_video:
+        cap = open_tracking_video(tracker, args.video, target_width=args.width)
+        if cap is None:
+            tracker.close()
+            return None
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    else:
+        fps = cache.fps
+    
+    if args.start_frame:
+        # Frame numbers continue from the seek position, as if the video had been analyzed from its start
+        cap.set(cv2.CAP_PROP_POS_FRAMES, args.start_frame)
+        position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+        if position != args.start_frame:
+            print(f"⚠️ Seeked to frame {position} instead of {args.start_frame}")
+        tracker.start_at(position)
+    
+    if args.record_cache:
+        native_size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        display_size = (args.width, int(native_size[1] * args.width / float(native_size[0])))
+        cache.start_recording(native_size, display_size, fps)
+        tracker.start_cache(cache, 'record')
+    
+    # Without drawing, the display-size frame is only resized when evidence or pose needs it
+    preprocessor = create_preprocessor(args.width)
+
+    # Annotations are composited for the annotated video only (no window)
+    renderer = create_renderer(tracker, enabled=False) if annotate else None
+    writer = None
+    active_violations = {}  # stable_id: start frame
+    events = []
+    frames = 0
+    decode_total = process_total = 0.0
+    start_time = time.perf_counter()
+
+    with open(args.output, 'w') as out:
+        def emit(record):
+            out.write(json.dumps(record) + "\n")
+
+        while not args.max_frames or frames < args.max_frames:
+            t0 = time.perf_counter()
+            if decode_video:
+                frame, prepared = decode_frame(cap, preprocessor, args.width, need_display=annotate,
+                                               timer=tracker.timer)
+                if frame is None and prepared is None:
+                    break
+            elif frames < cache.frame_count:
+                frame, prepared = None, None
+            else:
+                break
+            if args.replay and frames >= cache.frame_count:
+                break
+            t1 = time.perf_counter()
+
+            frame, violations = tracker.process_frame(frame, prepared=prepared)
+            t2 = time.perf_counter()
+            frames += 1
+            decode_total += t1 - t0
+            process_total += t2 - t1
+
+            for event in violation_changes(active_violations, violations, tracker.frame_count, fps):
+                events.append(event)
+                emit(event)
+
+            emit(frame_record(tracker, tracker.frame_count, violations, 1000 * (t1 - t0), 1000 * (t2 - t1)))
+
+            if writer is None and annotate:
+                h, w = frame.shape[:2]
+                writer = cv2.VideoWriter(args.annotated_video, cv2.VideoWriter_fourcc(*'mp4v'), fps, (w, h))
+            if writer is not None:
+                with tracker.timer.stage('draw'):
+                    renderer.compose(frame, frame_overlay(tracker, violations))
+                with tracker.timer.stage('display'):
+                    writer.write(frame)
+            tracker.timer.end_frame()
+
+            if not args.quiet and frames % 300 == 0:
+                elapsed = time.perf_counter() - start_time
+                print(f"⏱️ {frames} frames, {frames / elapsed:.1f} fps")
+
+        # Violations still running at end of video
+        for event in open_violation_ends(active_violations, tracker.frame_count, fps):
+            events.append(event)
+            emit(event)
+
+        if cap is not None:
+            cap.release()
+        if writer is not None:
+            writer.release()
+        if args.max_frames and frames >= args.max_frames and args.record_cache:
+            print(f"⚠️ Detection cache covers only the first {frames} frames")
+        tracker.finish_cache()
+        tracker.close()
+
+        elapsed = time.perf_counter() - start_time
+        summary = {
+            'type': 'summary',
+            'video': args.video,
+            'start_frame': args.start_frame,
+            'frames': frames,
+            'seconds': round(elapsed, 3),
+            'fps': round(frames / elapsed, 2) if elapsed > 0 else 0.0,
+            'decode_ms_per_frame': round(1000 * decode_total / max(1, frames), 3),
+            'process_ms_per_frame': round(1000 * process_total / max(1, frames), 3),
+            'violation_events': sum(1 for e in events if e['type'] == 'violation_start'),
+            'players_seen': tracker.next_stable_id - 1,
+            'detection': tracker.detection_stride.get_stats()
+        }
+        if tracker.roi_detector is not None:
+            summary['roi'] = tracker.roi_detector.get_stats()
+        if tracker.pose_gate is not None:
+            summary['pose_gate'] = tracker.pose_gate.get_stats()
+        if tracker.drift_tracker is not None:
+            summary['drift'] = tracker.drift_tracker.get_stats()
+        if tracker.trajectories is not None:
+            summary['trajectories'] = tracker.trajectories.get_stats()
+        if tracker.timer.enabled:
+            summary['timing'] = tracker.timer.summary()
+        emit(summary)
+
+    summary['events'] = events
+    return summary
+
+
+def compare_violation_events(baseline, candidate, tolerance):
+    """Violation starts of one run that have no start of the same player within tolerance frames in the other"""
+    def starts(summary):
+        return [(e['player'], e['frame']) for e in summary['events'] if e['type'] == 'violation_start']
+
+    def unmatched(events, others):
+        return [(player, frame) for player, frame in events
+                if not any(p == player and abs(f - frame) <= tolerance for p, f in others)]
+
+    return {
+        'missing': unmatched(starts(baseline), starts(candidate)),  # Only in the stride 1 run
+        'extra': unmatched(starts(candidate), starts(baseline))     # Only in the strided run
+    }
+
+
+def run_stride_comparison(args):
+    """Run with stride 1 and with the requested stride, report speedup and violation event changes"""
+    baseline_args = copy.copy(args)
+    baseline_args.stride = 1
+    baseline_args.adaptive_stride = False
+    baseline_args.annotated_video = None
+    root, ext = os.path.splitext(args.output)
+    baseline_args.output = f"{root}_stride1{ext}"
+
+    print("▶️ Baseline run (stride 1)")
+    baseline = run_analysis(baseline_args)
+    print("▶️ Strided run")
+    candidate = run_analysis(args)
+    if baseline is None or candidate is None:
+        return None
+
+    tolerance = max(1, candidate['detection']['stride'])
+    diff = compare_violation_events(baseline, candidate, tolerance)
+    speedup = candidate['fps'] / baseline['fps'] if baseline['fps'] else 0.0
+
+    print("=" * 50)
+    print(f"Stride 1: {baseline['fps']:.1f} fps, {baseline['violation_events']} violation events")
+    stats = candidate['detection']
+    print(f"Stride {'adaptive' if args.adaptive_stride else stats['stride']}: {candidate['fps']:.1f} fps, "
+          f"{candidate['violation_events']} violation events "
+          f"({stats['detected_frames']} detected / {stats['predicted_frames']} predicted, "
+          f"{stats['forced_frames']} forced near the boundary)")
+    print(f"Speedup: {speedup:.2f}x")
+    if diff['missing'] or diff['extra']:
+        print(f"⚠️ Violation events changed (±{tolerance} frames): missing {diff['missing']}, extra {diff['extra']}")
+    else:
+        print(f"✅ Same violation events (±{tolerance} frames)")
+    print("Note: player IDs are compared as assigned in each run")
+    return {'baseline': baseline, 'strided': candidate, 'speedup': speedup, 'diff': diff}
+
+
+def run_pose_gate_comparison(args):
+    """Run with pose on every player and with pose gating, report pose time and violation event changes"""
+    baseline_args = argparse.Namespace(**vars(args))
+    baseline_args.pose_gate = False
+    baseline_args.annotated_video = None
+    root, ext = os.path.splitext(args.output)
+    baseline_args.output = f"{root}_ungated{ext}"
+    gated_args = argparse.Namespace(**vars(args))
+    gated_args.pose_gate = True
+    gated_args.timing = baseline_args.timing = True
+
+    print("▶️ Baseline run (pose for every player)")
+    baseline = run_analysis(baseline_args)
+    print("▶️ Pose-gated run")
+    candidate = run_analysis(gated_args)
+    if baseline is None or candidate is None:
+        return None
+
+    diff = compare_violation_events(baseline, candidate, 0)
+    pose_ms = [run['timing'].get('pose', {}).get('mean_ms', 0.0) for run in (baseline, candidate)]
+    gate = candidate['pose_gate']
+
+    print("=" * 50)
+    print(f"Pose for every player: {pose_ms[0]:.2f} ms/frame pose, {baseline['fps']:.1f} fps, "
+          f"{baseline['violation_events']} violation events")
+    print(f"Pose gated: {pose_ms[1]:.2f} ms/frame pose, {candidate['fps']:.1f} fps, "
+          f"{candidate['violation_events']} violation events "
+          f"({gate['pose_calls']} pose calls for {gate['players']} players, {gate['capped']} capped)")
+    if diff['missing'] or diff['extra']:
+        print(f"⚠️ Violation events changed: missing {diff['missing']}, extra {diff['extra']}")
+    else:
+        print("✅ Same violation events")
+    return {'baseline': baseline, 'gated': candidate, 'diff': diff}
+
+
+def read_jsonl(path):
+    with open(path) as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def segment_tracks(path, first, last):
+    """{frame index: {stable_id: bbox}} of a segment's results for frame indices in [first, last)"""
+    tracks = {}
+    for record in read_jsonl(path):
+        if record['type'] != 'frame':
+            continue
+        index = record['frame'] - 1
+        if index >= last:
+            break
+        if index >= first:
+            tracks[index] = {track['id']: track['bbox'] for track in record['tracks']}
+    return tracks
+
+
+def init_segment_worker(threads):
+    """Give every segment worker its share of the cores instead of all of them"""
+    cv2.setNumThreads(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+
+def analyze_segment(args, segment, segment_dir):
+    """Worker: analyze frames [start, end) of the video into segment_dir (results, evidence, evidence events, log)"""
+    os.makedirs(segment_dir, exist_ok=True)
+    segment_args = copy.copy(args)
+    segment_args.output = os.path.join(segment_dir, 'analysis.jsonl')
+    segment_args.start_frame = segment['start']
+    segment_args.max_frames = segment['end'] - segment['start']
+    segment_args.metrics = None
+    if args.trajectories:
+        segment_args.trajectories = os.path.join(segment_dir, 'trajectories.npz')
+
+    with open(os.path.join(segment_dir, 'log.txt'), 'w') as log, contextlib.redirect_stdout(log):
+        # Evidence files are announced in the segment's own events file; the merge decides which ones to keep
+        events_path = None if args.no_evidence else os.path.join(segment_dir, 'events.jsonl')
+        event_bus = create_event_bus(jsonl_path=events_path)
+        try:
+            tracker = create_analysis_tracker(segment_args, output_dir=segment_dir, event_bus=event_bus)
+            summary = run_analysis(segment_args, tracker)
+        finally:
+            event_bus.close()
+    if summary is None:
+        raise RuntimeError(f"Segment {segment['index']} failed, see {segment_dir}/log.txt")
+    del summary['events']
+    summary['worker'] = os.getpid()
+    return summary
+
+
+def merge_segment_evidence(stitcher, segment, segment_dir, output_dir):
+    """Move the evidence of violations that started in the segment's core to output_dir under global IDs.
+
+    Evidence of violations that started in the overlap belongs to the
+    neighbouring segment, which recorded it with full pre-roll, and is deleted.
+    Returns the evidence records of the kept files.
+    """
+    events_path = os.path.join(segment_dir, 'events.jsonl')
+    if not os.path.exists(events_path):
+        return []
+    kept = []
+    for event in read_jsonl(events_path):
+        if event['type'] not in ('screenshot_saved', 'clip_written'):
+            continue
+        start_frame = event.get('start_frame', event['frame'])
+        if not segment['core_start'] <= start_frame - 1 < segment['core_end']:
+            if os.path.exists(event['path']):
+                os.remove(event['path'])
+            continue
+
+        player_id = stitcher.global_id(segment['index'], event['player'])
+        name = os.path.basename(event['path'])
+        name = f"player_{player_id}_" + name[len(f"player_{event['player']}_"):]
+        kind_dir = os.path.join(output_dir, os.path.basename(os.path.dirname(event['path'])))
+        os.makedirs(kind_dir, exist_ok=True)
+        path = os.path.join(kind_dir, name)
+        shutil.move(event['path'], path)
+
+        record = {'type': event['type'], 'player': player_id, 'start_frame': start_frame, 'path': path}
+        if 'frames' in event:
+            record['frames'] = event['frames']
+        kept.append(record)
+    return kept
+
+
+def segment_trajectories(stitcher, segment, segment_dir):
+    """Trajectory rows of the segment's core frames under global player IDs"""
+    columns = load_trajectories(os.path.join(segment_dir, 'trajectories.npz'))
+    del columns['foot_sources']
+    frames = columns['frame'] - 1
+    keep = (frames >= segment['core_start']) & (frames < segment['core_end'])
+    columns = {name: column[keep] for name, column in columns.items()}
+    track_ids, inverse = np.unique(columns['track'], return_inverse=True)
+    global_ids = np.array([stitcher.global_id(segment['index'], int(track_id)) for track_id in track_ids],
+                          dtype=columns['track'].dtype)
+    columns['track'] = global_ids[inverse]
+    return columns
+
+
+def merge_segments(args, segments, segment_dirs, summaries, fps, start_time, output_dir='violations'):
+    """Stitch the segment results into one JSONL file: every frame from the segment whose core it is in,
+    player IDs matched across the seams, violation events recomputed over the whole video"""
+    config = get_segment_config()
+    stitcher = SegmentStitcher(config['match_iou'], config['match_frames'])
+    active_violations = {}
+    events, evidence, trajectories = [], [], []
+    frames = last_frame = 0
+
+    with open(args.output, 'w') as out:
+        def emit(record):
+            out.write(json.dumps(record) + "\n")
+
+        tail = {}  # Tracks of the previous segment in the frames it shares with the current one
+        for segment, segment_dir in zip(segments, segment_dirs):
+            index = segment['index']
+            path = os.path.join(segment_dir, 'analysis.jsonl')
+            if index > 0:
+                head = segment_tracks(path, segment['start'], segments[index - 1]['end'])
+                stitcher.link(index, tail, head)
+            next_start = segments[index + 1]['start'] if index + 1 < len(segments) else None
+
+            tail = {}
+            for record in read_jsonl(path):
+                if record['type'] != 'frame':
+                    continue
+                frame_index = record['frame'] - 1
+                if next_start is not None and frame_index >= next_start:
+                    tail[frame_index] = {track['id']: track['bbox'] for track in record['tracks']}
+                if not segment['core_start'] <= frame_index < segment['core_end']:
+                    continue
+
+                for track in record['tracks']:
+                    track['id'] = stitcher.global_id(index, track['id'])
+                violations = {stitcher.global_id(index, player_id) for player_id in record['violations']}
+                record['violations'] = sorted(violations)
+                for event in violation_changes(active_violations, violations, record['frame'], fps):
+                    events.append(event)
+                    emit(event)
+                emit(record)
+                frames += 1
+                last_frame = record['frame']
+
+            if args.trajectories:
+                trajectories.append(segment_trajectories(stitcher, segment, segment_dir))
+            if not args.no_evidence:
+                for record in merge_segment_evidence(stitcher, segment, segment_dir, output_dir):
+                    evidence.append(record)
+                    emit(record)
+
+        for event in open_violation_ends(active_violations, last_frame, fps):
+            events.append(event)
+            emit(event)
+        if trajectories:
+            save_trajectories(args.trajectories, {name: np.concatenate([part[name] for part in trajectories])
+                                                  for name in trajectories[0]})
+
+        processed = sum(summary['frames'] for summary in summaries)
+        detection = {key: sum(summary['detection'][key] for summary in summaries)
+                     for key in ('detected_frames', 'predicted_frames', 'forced_frames')}
+        detection['stride'] = summaries[0]['detection']['stride']
+        elapsed = time.perf_counter() - start_time
+        summary = {
+            'type': 'summary',
+            'video': args.video,
+            'frames': frames,
+            'seconds': round(elapsed, 3),
+            'fps': round(frames / elapsed, 2) if elapsed > 0 else 0.0,
+            'processed_frames': processed,  # Including the overlaps analyzed twice
+            'decode_ms_per_frame': round(sum(s['decode_ms_per_frame'] * s['frames'] for s in summaries)
+                                         / max(1, processed), 3),
+            'process_ms_per_frame': round(sum(s['process_ms_per_frame'] * s['frames'] for s in summaries)
+                                          / max(1, processed), 3),
+            'violation_events': sum(1 for e in events if e['type'] == 'violation_start'),
+            'players_seen': stitcher.get_stats()['players'],
+            'evidence_files': len(evidence),
+            'detection': detection,
+            'workers': len({summary['worker'] for summary in summaries}),
+            'segments': [dict(segment, fps=summary['fps'], seconds=summary['seconds'])
+                         for segment, summary in zip(segments, summaries)],
+            'seams': stitcher.get_stats()['seams']
+        }
+        emit(summary)
+
+    summary['events'] = events
+    return summary
+
+
+def run_segmented(args):
+    """Analyze a long video as overlapping segments in a process pool (one model per worker) and stitch them"""
+    config = get_segment_config()
+    video_path = args.video or get_player_tracking_video()
+    cap = cv2.VideoCapture(video_path)
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    cap.release()
+    if total_frames <= 0:
+        print(f"Error: Could not read the frame count of {video_path}")
+        return None
+    if args.max_frames:
+        total_frames = min(total_frames, args.max_frames)
+
+    # Segments shorter than SEGMENT_MIN_SECONDS would spend most of their time on the overlaps
+    count = min(args.segments, max(1, int(total_frames / (config['min_seconds'] * fps))))
+    overlap = int(round(config['overlap_seconds'] * fps))
+    segments = plan_segments(total_frames, count, overlap)
+    workers = min(args.workers or config['workers'] or max(1, (os.cpu_count() or 1) // 4), len(segments))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    work_dir = f"{os.path.splitext(args.output)[0]}_segments"
+    segment_dirs = [os.path.join(work_dir, f"segment_{segment['index']:03d}") for segment in segments]
+    print(f"🧩 {total_frames} frames in {len(segments)} segments of ~{total_frames // len(segments)} frames "
+          f"(+{overlap} overlap), {workers} workers x {threads} threads")
+
+    start_time = time.perf_counter()
+    summaries = [None] * len(segments)
+    if workers == 1:
+        for segment, segment_dir in zip(segments, segment_dirs):
+            summaries[segment['index']] = analyze_segment(args, segment, segment_dir)
+            print(f"✅ Segment {segment['index']} done ({summaries[segment['index']]['fps']:.1f} fps)")
+    else:
+        # Spawned workers load their own model (fork would share the parent's torch/MediaPipe threads)
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=init_segment_worker,
+                                 initargs=(threads,)) as pool:
+            futures = {pool.submit(analyze_segment, args, segment, segment_dir): segment['index']
+                       for segment, segment_dir in zip(segments, segment_dirs)}
+            for future in futures:
+                index = futures[future]
+                summaries[index] = future.result()
+                print(f"✅ Segment {index} done ({summaries[index]['fps']:.1f} fps)")
+
+    summary = merge_segments(args, segments, segment_dirs, summaries, fps, start_time)
+    shutil.rmtree(work_dir)
+    return summary
+
+
+def main():
+    args = parse_args()
+    if args.segments:
+        if args.record_cache or args.replay or args.annotated_video or args.start_frame:
+            print("Error: --segments cannot be combined with the detection cache, --annotated-video or --start-frame")
+            return
+        if args.compare_stride or args.compare_pose_gate:
+            print("Error: --segments cannot be combined with the comparison runs")
+            return
+    if args.compare_stride:
+        run_stride_comparison(args)
+        return
+    if args.compare_pose_gate:
+        run_pose_gate_comparison(args)
+        return
+
+    summary = run_segmented(args) if args.segments else run_analysis(args)
+    if summary is None:
+        return
+
+    print("=" * 50)
+    print(f"Processed {summary['frames']} frames in {summary['seconds']:.1f}s "
+          f"→ {summary['fps']:.1f} frames per second")
+    print(f"Decode {summary['decode_ms_per_frame']:.1f} ms/frame, "
+          f"processing {summary['process_ms_per_frame']:.1f} ms/frame")
+    print(f"Violations: {summary['violation_events']}, players seen: {summary['players_seen']}")
+    if 'segments' in summary:
+        matched = sum(seam['matched'] for seam in summary['seams'])
+        print(f"Segments: {len(summary['segments'])} on {summary['workers']} workers, "
+              f"{summary['processed_frames']} frames analyzed incl. overlaps, "
+              f"{matched} tracks stitched across {len(summary['seams'])} seams, "
+              f"{summary['evidence_files']} evidence files kept")
+    stats = summary['detection']
+    if stats['predicted_frames']:
+        print(f"Detection stride {stats['stride']}: {stats['detected_frames']} detected, "
+              f"{stats['predicted_frames']} predicted, {stats['forced_frames']} forced near the boundary")
+    if 'roi' in summary:
+        roi = summary['roi']
+        print(f"ROI detection: {roi['tiles']} tiles, {roi['full_frames']} full-frame passes, "
+              f"{100 * roi['pixel_ratio']:.0f}% of frame pixels, {100 * roi['network_pixel_ratio']:.0f}% of network pixels")
+    if 'pose_gate' in summary:
+        gate = summary['pose_gate']
+        print(f"Pose gating: {gate['pose_calls']} pose calls for {gate['players']} players "
+              f"({100 * gate['pose_ratio']:.0f}%), {gate['capped']} skipped by the per-frame cap")
+    if 'timing' in summary:
+        print("Stage timings (ms):        p50      p95      p99")
+        for name, stage in summary['timing'].items():
+            print(f"  {name:22} {stage['p50_ms']:8.2f} {stage['p95_ms']:8.2f} {stage['p99_ms']:8.2f}")
+    print(f"Results written to {args.output}")
+    if args.annotated_video:
+        print(f"Annotated video written to {args.annotated_video}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Detector backend comparison: latency and accuracy of torch / onnx / openvino (FP32 and int8) on a sample video.
+
+Every backend runs person detection on the same frames. Accuracy is measured
+against the PyTorch FP32 detections (no labels needed): boxes are matched at
+IoU >= --match-iou, giving precision/recall/F1, the mean IoU of matched boxes
+and the foot-point (bbox bottom center) error the boundary check depends on.
+
+Usage: python benchmarks/backend_benchmark.py [--video PATH] [--frames 300] [--backends torch onnx openvino]
+                                              [--int8] [--calibration DIR_OR_VIDEO] [--output report.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from modules.detector_backend import BACKENDS, create_backend
+from video_config import get_detector_config
+
+
+def load_video_frames(video_path, count):
+    """First count frames of the video"""
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def run_detector(model, frames, imgsz, conf, warmup):
+    """Per-frame latencies (seconds) and person boxes (N, 4) of every frame"""
+    for frame in frames[:warmup]:
+        model.predict(frame, imgsz=imgsz, classes=[0], conf=conf, verbose=False)
+    latencies, boxes = [], []
+    for frame in frames:
+        start = time.perf_counter()
+        results = model.predict(frame, imgsz=imgsz, classes=[0], conf=conf, verbose=False)
+        latencies.append(time.perf_counter() - start)
+        boxes.append(results[0].boxes.xyxy.cpu().numpy().reshape(-1, 4))
+    return latencies, boxes
+
+
+def iou_matrix(a, b):
+    """Pairwise IoU of (N, 4) and (M, 4) xyxy boxes"""
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+
+def match_boxes(reference, candidate, min_iou):
+    """Greedy one-to-one matches (highest IoU first), return [(ref_index, cand_index, iou)]"""
+    if len(reference) == 0 or len(candidate) == 0:
+        return []
+    ious = iou_matrix(reference, candidate)
+    matches = []
+    used_ref, used_cand = set(), set()
+    for flat in np.argsort(-ious, axis=None):
+        i, j = np.unravel_index(flat, ious.shape)
+        if ious[i, j] < min_iou:
+            break
+        if i in used_ref or j in used_cand:
+            continue
+        used_ref.add(i)
+        used_cand.add(j)
+        matches.append((i, j, float(ious[i, j])))
+    return matches
+
+
+def accuracy(reference_boxes, candidate_boxes, min_iou):
+    """Agreement of a backend's detections with the reference detections over all frames"""
+    matched = ref_total = cand_total = 0
+    ious, foot_errors = [], []
+    for reference, candidate in zip(reference_boxes, candidate_boxes):
+        ref_total += len(reference)
+        cand_total += len(candidate)
+        for i, j, iou in match_boxes(reference, candidate, min_iou):
+            matched += 1
+            ious.append(iou)
+            ref_foot = np.array([(reference[i, 0] + reference[i, 2]) / 2, reference[i, 3]])
+            cand_foot = np.array([(candidate[j, 0] + candidate[j, 2]) / 2, candidate[j, 3]])
+            foot_errors.append(float(np.linalg.norm(ref_foot - cand_foot)))
+    precision = matched / cand_total if cand_total else 1.0
+    recall = matched / ref_total if ref_total else 1.0
+    return {
+        'precision': round(precision, 4),
+        'recall': round(recall, 4),
+        'f1': round(2 * precision * recall / (precision + recall), 4) if precision + recall else 0.0,
+        'mean_iou': round(float(np.mean(ious)), 4) if ious else None,
+        'foot_error_px_median': round(float(np.median(foot_errors)), 2) if foot_errors else None,
+        'foot_error_px_p95': round(float(np.percentile(foot_errors, 95)), 2) if foot_errors else None,
+        'detections': cand_total
+    }
+
+
+def environment():
+    """Where the numbers were measured, with the versions of the installed runtimes"""
+    runtimes = {}
+    for module_name in ('torch', 'onnxruntime', 'openvino'):
+        try:
+            runtimes[module_name] = __import__(module_name).__version__
+        except (ImportError, AttributeError):
+            runtimes[module_name] = None
+    return dict({
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count()
+    }, **runtimes)
+
+
+def parse_args(argv=None):
+    detector_config = get_detector_config()
+    parser = argparse.ArgumentParser(description="Compare detector backends on a sample video")
+    parser.add_argument('--video', default=None, help="Sample video (default: tracking video from video_config)")
+    parser.add_argument('--frames', type=int, default=300, help="Frames to run")
+    parser.add_argument('--warmup', type=int, default=10, help="Untimed frames per backend")
+    parser.add_argument('--backends', nargs='+', choices=sorted(BACKENDS), default=['torch', 'onnx', 'openvino'])
+    parser.add_argument('--int8', action='store_true', help="Also run int8 variants of onnx/openvino")
+    parser.add_argument('--weights', default=detector_config['weights'])
+    parser.add_argument('--imgsz', type=int, default=detector_config['imgsz'])
+    parser.add_argument('--conf', type=float, default=0.5, help="Confidence threshold (tracker default)")
+    parser.add_argument('--match-iou', type=float, default=0.5, help="IoU for a box to count as the same detection")
+    parser.add_argument('--calibration', default=detector_config['calibration'],
+                        help="Directory of frames or a video for int8 calibration")
+    parser.add_argument('--calibration-frames', type=int, default=detector_config['calibration_frames'])
+    parser.add_argument('--export-dir', default=detector_config['export_dir'])
+    parser.add_argument('--output', default=None, help="Save the report as JSON here")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    from ultralytics import YOLO
+
+    video_path = args.video or get_detector_config()['calibration']
+    frames = load_video_frames(video_path, args.frames)
+    if not frames:
+        print(f"❌ Could not read frames from {video_path}")
+        return 1
+    print(f"🎞️ {len(frames)} frames of {video_path} at imgsz {args.imgsz}")
+
+    variants = [(name, False) for name in args.backends]
+    if args.int8:
+        variants += [(name, True) for name in args.backends if name != 'torch']
+
+    # The PyTorch FP32 model is the accuracy reference (and the speed baseline)
+    reference_latencies, reference_boxes = run_detector(YOLO(args.weights, task='detect'), frames, args.imgsz,
+                                                        args.conf, args.warmup)
+    baseline_ms = 1000.0 * float(np.median(reference_latencies))
+
+    results = {}
+    for name, int8 in variants:
+        backend = create_backend(name, weights=args.weights, imgsz=args.imgsz, int8=int8,
+                                 calibration=args.calibration, calibration_frames=args.calibration_frames,
+                                 export_dir=args.export_dir)
+        if name == 'torch':
+            latencies, boxes = reference_latencies, reference_boxes
+        else:
+            try:
+                model = YOLO(backend.prepare(), task='detect')
+            except Exception as e:
+                print(f"⚠️ Skipping {backend.label}: {e}")
+                continue
+            latencies, boxes = run_detector(model, frames, args.imgsz, args.conf, args.warmup)
+
+        ms = np.asarray(latencies) * 1000.0
+        results[backend.label] = dict({
+            'model': backend.model_path(),
+            'median_ms': round(float(np.median(ms)), 2),
+            'p95_ms': round(float(np.percentile(ms, 95)), 2),
+            'fps': round(1000.0 / float(np.median(ms)), 1),
+            'speedup': round(baseline_ms / float(np.median(ms)), 2)
+        }, **accuracy(reference_boxes, boxes, args.match_iou))
+        print(f"⏱️ {backend.label:14} {results[backend.label]['median_ms']:8.2f} ms")
+
+    print(f"\n{'backend':14} {'median ms':>9} {'p95 ms':>7} {'fps':>6} {'speedup':>7} {'recall':>6} "
+          f"{'prec':>6} {'IoU':>5} {'foot px':>7}")
+    for label, r in results.items():
+        iou = f"{r['mean_iou']:5.3f}" if r['mean_iou'] is not None else f"{'-':>5}"
+        foot = f"{r['foot_error_px_median']:7.2f}" if r['foot_error_px_median'] is not None else f"{'-':>7}"
+        print(f"{label:14} {r['median_ms']:9.2f} {r['p95_ms']:7.2f} {r['fps']:6.1f} {r['speedup']:6.2f}x "
+              f"{r['recall']:6.3f} {r['precision']:6.3f} {iou} {foot}")
+
+    if args.output:
+        report = {
+            'environment': environment(),
+            'settings': {key: getattr(args, key) for key in ('frames', 'weights', 'imgsz', 'conf', 'match_iou',
+                                                             'calibration', 'calibration_frames')},
+            'video': video_path,
+            'reference': 'torch',
+            'results': results
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report saved to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Component micro-benchmarks on synthetic scenes (no YOLO weights or video needed).
+
+Times the tracker's per-frame components for 2 to 200 players:
+  is_point_below_boundary  one call per foot          check_feet            all feet at once
+  get_stable_id            one call per detection     associate_detections  all detections at once
+  handle_violations        violation bookkeeping      process_frame         whole frame with the stub detector
+Pose is off (rectangles have no skeleton), so feet come from the boxes.
+
+Results are saved as JSON; with --baseline every median is compared against
+an earlier run and slowdowns beyond --threshold are flagged (exit code 1).
+
+Usage: python benchmarks/component_benchmark.py [--players 2 10 50 200] [--frames 120]
+                                                [--output results.json] [--baseline baseline.json]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from player_tracker import PlayerTracker, create_renderer, frame_overlay
+from synthetic_scene import SyntheticScene, StubDetector
+
+COMPONENTS = ('is_point_below_boundary', 'check_feet', 'get_stable_id', 'associate_detections',
+              'handle_violations', 'process_frame')
+DEFAULT_PLAYERS = [2, 5, 10, 20, 50, 100, 200]
+
+# Medians below this many milliseconds apart are timer noise, never a regression
+MIN_REGRESSION_MS = 0.02
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the tracker's per-frame logging while timing"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def make_tracker(scene, detector, config_path, annotate=False):
+    """PlayerTracker on the scene's boundary with the stub detector and pose disabled"""
+    with quiet():
+        tracker = PlayerTracker(annotate=annotate, record_evidence=False, config_path=config_path,
+                                yolo_model=detector, detection_stride=1, roi_detection=False)
+        tracker.skeleton_tracker.close()
+        tracker.skeleton_tracker.mediapipe_working = False
+        tracker.scale_boundary_points(1.0, (scene.width, scene.height))
+    return tracker
+
+
+def summarize(samples, players):
+    """Timing statistics of per-frame samples (seconds)"""
+    ms = np.asarray(samples) * 1000.0
+    return {
+        'median_ms': round(float(np.median(ms)), 4),
+        'p95_ms': round(float(np.percentile(ms, 95)), 4),
+        'mean_ms': round(float(ms.mean()), 4),
+        'per_player_us': round(1000.0 * float(np.median(ms)) / players, 3),
+        'frames': len(ms)
+    }
+
+
+def bench_boundary(scene, detector, config_path, frames, warmup, batched):
+    """is_point_below_boundary per foot, or check_feet for all feet of a frame"""
+    tracker = make_tracker(scene, detector, config_path)
+    samples = []
+    with quiet():
+        for frame_index in range(warmup + frames):
+            tracker.frame_count = frame_index + 1
+            feet = [tuple(int(v) for v in foot) for foot in scene.truth(frame_index)['foot']]
+            start = time.perf_counter()
+            if batched:
+                tracker.check_feet(feet)
+            else:
+                for foot in feet:
+                    tracker.is_point_below_boundary(foot)
+            if frame_index >= warmup:
+                samples.append(time.perf_counter() - start)
+        tracker.close()
+    return samples, {}
+
+
+def bench_association(scene, detector, config_path, frames, warmup, batched):
+    """get_stable_id per detection, or associate_detections for all detections of a frame"""
+    tracker = make_tracker(scene, detector, config_path)
+    blank = np.zeros((scene.height, scene.width, 3), dtype=np.uint8)
+    samples = []
+    with quiet():
+        for frame_index in range(warmup + frames):
+            tracker.frame_count = frame_index + 1
+            detector.set_frame(frame_index)
+            detections = detector.detect_players(blank)
+            start = time.perf_counter()
+            if batched:
+                tracker.associate_detections(detections)
+            else:
+                for det in detections:
+                    tracker.get_stable_id(det['center'], det['bbox'], det['yolo_id'])
+            if frame_index >= warmup:
+                samples.append(time.perf_counter() - start)
+            tracker.cleanup_old_players()
+        tracker.close()
+    return samples, {'stable_ids': tracker.next_stable_id - 1}
+
+
+def bench_handle_violations(scene, detector, config_path, frames, warmup):
+    """Violation start/continue/end bookkeeping with the ground-truth violations of every frame"""
+    tracker = make_tracker(scene, detector, config_path)
+    samples = []
+    with quiet():
+        for frame_index in range(warmup + frames):
+            tracker.frame_count = frame_index + 1
+            truth = scene.truth(frame_index)
+            violations = set(int(i) for i in truth['ids'][truth['violation']])
+            start = time.perf_counter()
+            tracker.handle_violations(None, violations, None)
+            if frame_index >= warmup:
+                samples.append(time.perf_counter() - start)
+        tracker.close()
+    return samples, {}
+
+
+def bench_process_frame(scene, detector, config_path, frames, warmup, annotate):
+    """Whole process_frame with the stub detector; also scores violations against the ground truth"""
+    tracker = make_tracker(scene, detector, config_path, annotate=annotate)
+    renderer = create_renderer(tracker, enabled=False) if annotate else None
+    samples = []
+    agree = checked = 0
+    with quiet():
+        for frame_index in range(warmup + frames):
+            truth = scene.truth(frame_index)
+            frame = scene.render(frame_index, truth)
+            detector.set_frame(frame_index)
+            start = time.perf_counter()
+            _, violations = tracker.process_frame(frame)
+            if renderer is not None:
+                renderer.compose(frame, frame_overlay(tracker, violations))
+            if frame_index < warmup:
+                continue
+            samples.append(time.perf_counter() - start)
+
+            expected = dict(zip(truth['ids'].tolist(), truth['violation'].tolist()))
+            for player in tracker.frame_players:
+                checked += 1
+                agree += player['violation'] == expected.get(player['yolo_id'])
+        tracker.close()
+    return samples, {'violation_accuracy': round(agree / checked, 4) if checked else None}
+
+
+def run_benchmarks(args):
+    """Run every selected component for every player count, return the results dict"""
+    results = {component: {} for component in args.components}
+    with tempfile.TemporaryDirectory() as tmp:
+        for players in args.players:
+            scene = SyntheticScene(num_players=players, width=args.width, height=args.height,
+                                   crossing_fraction=args.crossing, seed=args.seed)
+            detector = StubDetector(scene, jitter=args.jitter, miss_rate=args.miss_rate, seed=args.seed)
+            config_path = scene.write_config(os.path.join(tmp, f'config_{players}.json'))
+
+            runs = {
+                'is_point_below_boundary': lambda: bench_boundary(scene, detector, config_path, args.frames,
+                                                                  args.warmup, batched=False),
+                'check_feet': lambda: bench_boundary(scene, detector, config_path, args.frames, args.warmup,
+                                                     batched=True),
+                'get_stable_id': lambda: bench_association(scene, detector, config_path, args.frames, args.warmup,
+                                                           batched=False),
+                'associate_detections': lambda: bench_association(scene, detector, config_path, args.frames,
+                                                                  args.warmup, batched=True),
+                'handle_violations': lambda: bench_handle_violations(scene, detector, config_path, args.frames,
+                                                                     args.warmup),
+                'process_frame': lambda: bench_process_frame(scene, detector, config_path, args.frames,
+                                                             args.warmup, annotate=args.annotate)
+            }
+            for component in args.components:
+                samples, extra = runs[component]()
+                results[component][str(players)] = dict(summarize(samples, players), **extra)
+                print(f"⏱️ {component:24} {players:4d} players: {results[component][str(players)]['median_ms']:9.3f} ms")
+    return results
+
+
+def environment():
+    """Where the numbers were measured"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def compare_to_baseline(current, baseline, threshold):
+    """Compare medians (and violation accuracy) with a baseline run, return the list of regressions"""
+    regressions = []
+    print(f"\n{'component':24} {'players':>7} {'baseline ms':>12} {'current ms':>11} {'change':>8}")
+    for component, by_players in current['results'].items():
+        for players, stats in by_players.items():
+            base = baseline.get('results', {}).get(component, {}).get(players)
+            if base is None:
+                continue
+            change = stats['median_ms'] / base['median_ms'] - 1.0 if base['median_ms'] > 0 else 0.0
+            flag = ''
+            if change > threshold and stats['median_ms'] - base['median_ms'] > MIN_REGRESSION_MS:
+                flag = '  ❌ slower'
+                regressions.append(f"{component} @ {players} players: {base['median_ms']:.3f} -> "
+                                   f"{stats['median_ms']:.3f} ms ({100 * change:+.0f}%)")
+            elif change < -threshold:
+                flag = '  ✅ faster'
+            print(f"{component:24} {players:>7} {base['median_ms']:12.3f} {stats['median_ms']:11.3f} "
+                  f"{100 * change:+7.0f}%{flag}")
+
+            if stats.get('violation_accuracy') is not None and base.get('violation_accuracy') is not None:
+                if stats['violation_accuracy'] < base['violation_accuracy'] - 0.005:
+                    regressions.append(f"{component} @ {players} players: violation accuracy "
+                                       f"{base['violation_accuracy']:.4f} -> {stats['violation_accuracy']:.4f}")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of the tracker components on synthetic scenes")
+    parser.add_argument('--players', type=int, nargs='+', default=DEFAULT_PLAYERS, help="Player counts to run")
+    parser.add_argument('--components', nargs='+', choices=COMPONENTS, default=list(COMPONENTS))
+    parser.add_argument('--frames', type=int, default=120, help="Timed frames per run")
+    parser.add_argument('--warmup', type=int, default=10, help="Untimed frames before timing")
+    parser.add_argument('--width', type=int, default=1280)
+    parser.add_argument('--height', type=int, default=720)
+    parser.add_argument('--crossing', type=float, default=0.3, help="Fraction of players crossing the boundary")
+    parser.add_argument('--jitter', type=float, default=2.0, help="Stub detector box jitter in pixels")
+    parser.add_argument('--miss-rate', type=float, default=0.0, help="Stub detector miss probability")
+    parser.add_argument('--annotate', action='store_true', help="Also composite the display overlay after process_frame")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help="Save results as JSON here")
+    parser.add_argument('--baseline', default=None, help="Earlier results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Relative slowdown flagged as regression")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print(f"📐 {args.width}x{args.height} scenes, {args.frames} frames, players {args.players}")
+
+    current = {
+        'environment': environment(),
+        'settings': {key: getattr(args, key) for key in ('players', 'frames', 'warmup', 'width', 'height',
+                                                         'crossing', 'jitter', 'miss_rate', 'annotate', 'seed')},
+        'results': run_benchmarks(args)
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+        print(f"💾 Results saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(current, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) vs {args.baseline}:")
+            for regression in regressions:
+                print(f"   {regression}")
+            return 1
+        print(f"\n✅ No regressions vs {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Preprocessing benchmark: resize work per frame before and after the single-resize path.
+
+Before: decoded frame -> display width (INTER_AREA) -> YOLO letterbox to imgsz (INTER_LINEAR).
+After:  one INTER_AREA downscale of the decoded frame to imgsz (plus the display
+        resize when it is shown/recorded), YOLO letterbox only pads.
+Both paths also convert the player crops for pose (from the display or native frame).
+
+Usage: python benchmarks/preprocess_benchmark.py [--video PATH] [--frames 200] [--imgsz 640]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modules.frame_preprocessor import FramePreprocessor, INTERPOLATIONS, transform_boxes
+
+
+def letterbox(image, imgsz, stride=32):
+    """Same resize + minimal padding as ultralytics' LetterBox(auto=True) in predict()"""
+    height, width = image.shape[:2]
+    ratio = min(imgsz / height, imgsz / width)
+    new_w, new_h = int(round(width * ratio)), int(round(height * ratio))
+    resized_pixels = 0
+    if (new_w, new_h) != (width, height):
+        image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+        resized_pixels = width * height
+    pad_w, pad_h = (imgsz - new_w) % stride, (imgsz - new_h) % stride
+    image = cv2.copyMakeBorder(image, pad_h // 2, pad_h - pad_h // 2, pad_w // 2, pad_w - pad_w // 2,
+                               cv2.BORDER_CONSTANT, value=(114, 114, 114))
+    return image, resized_pixels
+
+
+def load_frames(video_path, count, width, height):
+    """Decoded frames of a video, or synthetic noise frames of the given size"""
+    if video_path:
+        cap = cv2.VideoCapture(video_path)
+        frames = []
+        while len(frames) < count:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        cap.release()
+        if frames:
+            return frames
+        print(f"⚠️ Could not read {video_path}, using synthetic frames")
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    return [np.roll(base, i * 7, axis=1) for i in range(min(count, 30))] * (count // min(count, 30) + 1)
+
+
+def player_boxes(display_size, count):
+    """Evenly spread synthetic player boxes in display coordinates"""
+    width, height = display_size
+    xs = np.linspace(40, width - 120, count).astype(int)
+    return [(x, height // 3, x + 70, height // 3 + 200) for x in xs]
+
+
+def crop_pixels(image, boxes):
+    """Crop and color-convert every player box (what pose detection does), return pixels converted"""
+    pixels = 0
+    for x1, y1, x2, y2 in boxes:
+        crop = image[max(0, y1 - 20):y2 + 20, max(0, x1 - 20):x2 + 20]
+        cv2.cvtColor(crop, cv2.COLOR_BGR2RGB)
+        pixels += crop.shape[0] * crop.shape[1]
+    return pixels
+
+
+def run_before(frames, width, imgsz, players):
+    resize_time = crop_time = 0.0
+    resized = converted = 0
+    for frame in frames:
+        start = time.perf_counter()
+        scale = width / float(frame.shape[1])
+        display = cv2.resize(frame, (width, int(frame.shape[0] * scale)), interpolation=cv2.INTER_AREA)
+        _, letterbox_pixels = letterbox(display, imgsz)
+        resize_time += time.perf_counter() - start
+        resized += frame.shape[0] * frame.shape[1] + letterbox_pixels
+
+        start = time.perf_counter()
+        converted += crop_pixels(display, player_boxes((display.shape[1], display.shape[0]), players))
+        crop_time += time.perf_counter() - start
+    return resize_time, resized, crop_time, converted
+
+
+def run_after(frames, width, imgsz, players, need_display, pose_source, interpolation='area'):
+    preprocessor = FramePreprocessor(display_width=width, detector_imgsz=imgsz,
+                                     interpolation=INTERPOLATIONS[interpolation])
+    resize_time = crop_time = 0.0
+    resized = converted = 0
+    for frame in frames:
+        start = time.perf_counter()
+        prepared = preprocessor.prepare(frame, need_display)
+        _, letterbox_pixels = letterbox(prepared.detector, imgsz)
+        resize_time += time.perf_counter() - start
+        resized += letterbox_pixels
+
+        start = time.perf_counter()
+        boxes = player_boxes(prepared.display_size, players)
+        if pose_source == 'native':
+            native = transform_boxes(prepared.display_to_native, boxes).round().astype(int)
+            converted += crop_pixels(prepared.native, [tuple(b) for b in native])
+        else:
+            converted += crop_pixels(prepared.display, boxes)
+        crop_time += time.perf_counter() - start
+    return resize_time, resized + preprocessor.resized_pixels, crop_time, converted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the single-resize preprocessing path")
+    parser.add_argument('--video', default=None, help="Video to read frames from (default: synthetic 1920x1080)")
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--width', type=int, default=1280, help="Display width")
+    parser.add_argument('--imgsz', type=int, default=640, help="Detector input size")
+    parser.add_argument('--players', type=int, default=10, help="Player crops per frame")
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.frames, 1920, 1080)[:args.frames]
+    h, w = frames[0].shape[:2]
+    print(f"📐 {len(frames)} frames of {w}x{h}, display width {args.width}, imgsz {args.imgsz}, "
+          f"{args.players} players")
+
+    runs = [
+        ("before (resize + letterbox)", run_before(frames, args.width, args.imgsz, args.players)),
+        ("after, displayed", run_after(frames, args.width, args.imgsz, args.players, True, 'display')),
+        ("after, displayed, linear", run_after(frames, args.width, args.imgsz, args.players, True, 'display', 'linear')),
+        ("after, headless, display pose", run_after(frames, args.width, args.imgsz, args.players, False, 'display')),
+        ("after, headless, native pose", run_after(frames, args.width, args.imgsz, args.players, False, 'native')),
+    ]
+
+    print(f"{'path':32} {'resize ms/frame':>16} {'Mpx resized/frame':>18} {'crop ms/frame':>14} {'Mpx crops/frame':>16}")
+    for name, (resize_time, resized, crop_time, converted) in runs:
+        n = len(frames)
+        print(f"{name:32} {1000 * resize_time / n:16.2f} {resized / n / 1e6:18.2f} "
+              f"{1000 * crop_time / n:14.2f} {converted / n / 1e6:16.3f}")
+
+
+if __name__ == "__main__":
+    main()
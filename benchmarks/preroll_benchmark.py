@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Pre-roll buffer benchmark: resident memory and cost of a raw vs JPEG/PNG-encoded frame ring.
+
+Fills a ring sized for --preroll seconds (plus the evidence writer queue)
+with frames of a video, or of a textured synthetic court, pushed at --fps
+like the tracking loop does, and reports the memory it holds, the time
+push() takes on the tracking thread, the encoder time per frame, the decode
+time per frame when a clip is written and the PSNR of the decoded frames
+against the originals. --unpaced pushes as fast as possible (push then
+includes waiting for the encoders).
+
+Usage: python benchmarks/preroll_benchmark.py [--video PATH] [--preroll 10] [--frames 400]
+                                              [--encodings raw jpeg png] [--quality 90] [--png-compression 1]
+                                              [--threads 2]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from modules.frame_ring import create_frame_ring
+from synthetic_scene import SyntheticScene
+
+
+def load_frames(video_path, count, width):
+    """Frames of the video resized to width, or a synthetic court with camera-like noise"""
+    frames = []
+    if video_path:
+        cap = cv2.VideoCapture(video_path)
+        while len(frames) < count:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            height = int(frame.shape[0] * width / float(frame.shape[1]))
+            frames.append(cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA))
+        cap.release()
+        if frames:
+            return frames
+        print(f"⚠️ Could not read {video_path}, using synthetic frames")
+
+    scene = SyntheticScene(num_players=10, width=width, height=width * 9 // 16)
+    rng = np.random.default_rng(0)
+    noise = cv2.GaussianBlur(rng.normal(0, 6, (scene.height, scene.width, 3)).astype(np.float32), (3, 3), 0)
+    for index in range(count):
+        frame = scene.render(index).astype(np.float32) + np.roll(noise, index * 3, axis=0)
+        frames.append(np.clip(frame, 0, 255).astype(np.uint8))
+    return frames
+
+
+def psnr(a, b):
+    mse = np.mean((a.astype(np.float32) - b.astype(np.float32)) ** 2)
+    return float('inf') if mse == 0 else 10 * np.log10(255.0 ** 2 / mse)
+
+
+def run(frames, capacity, encoding, quality, png_compression, threads, interval):
+    """Push the frames every interval seconds into a ring, return its statistics"""
+    ring = create_frame_ring(capacity, encoding, quality, threads, png_compression)
+    push_ms = []
+    next_push = time.perf_counter()
+    for frame in frames:
+        time.sleep(max(0.0, next_push - time.perf_counter()))
+        next_push += interval
+        start = time.perf_counter()
+        ring.push(frame)
+        push_ms.append(1000 * (time.perf_counter() - start))
+    ring.get(ring.latest_index)  # Waits until everything is encoded
+
+    # A clip's pre-roll as the evidence writer reads it
+    first = max(ring.oldest_index, ring.latest_index - 89)
+    start = time.perf_counter()
+    decoded = [ring.get(index).copy() for index in range(first, ring.latest_index + 1)]
+    decode_ms = 1000 * (time.perf_counter() - start) / len(decoded)
+    quality_db = min(psnr(frame, frames[index]) for frame, index in zip(decoded, range(first, ring.latest_index + 1)))
+
+    stats = ring.get_stats()
+    ring.close()
+    return {
+        'resident_mb': stats['resident_mb'],
+        'push_p50_ms': float(np.median(push_ms)),
+        'push_p95_ms': float(np.percentile(push_ms, 95)),
+        'encode_ms': stats.get('encode_ms', 0.0),
+        'decode_ms': decode_ms,
+        'psnr_db': quality_db
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare raw and encoded pre-roll frame rings")
+    parser.add_argument('--video', default=None, help="Sample video (default: synthetic court)")
+    parser.add_argument('--width', type=int, default=1280)
+    parser.add_argument('--fps', type=float, default=30.0)
+    parser.add_argument('--preroll', type=float, default=10.0, help="Pre-roll seconds the ring must hold")
+    parser.add_argument('--queue-size', type=int, default=32, help="Evidence writer queue (extra ring slots)")
+    parser.add_argument('--frames', type=int, default=400, help="Frames pushed (at least the ring capacity)")
+    parser.add_argument('--encodings', nargs='+', choices=('raw', 'jpeg', 'png'), default=['raw', 'jpeg', 'png'])
+    parser.add_argument('--quality', type=int, default=90, help="JPEG quality")
+    parser.add_argument('--png-compression', type=int, default=1, help="PNG compression level (0-9)")
+    parser.add_argument('--threads', type=int, default=2, help="Encoder threads")
+    parser.add_argument('--unpaced', action='store_true', help="Push frames back to back instead of at --fps")
+    args = parser.parse_args(argv)
+
+    capacity = int(round(args.preroll * args.fps)) + args.queue_size + 1
+    frames = load_frames(args.video, max(args.frames, capacity), args.width)
+    print(f"🎞️ Ring of {capacity} slots ({args.preroll:.0f}s pre-roll) of {frames[0].shape}, {len(frames)} frames pushed")
+
+    print(f"\n{'ring':6} {'memory MB':>10} {'push p50':>9} {'push p95':>9} {'encode ms':>10} {'decode ms':>10} {'PSNR dB':>8}")
+    for encoding in args.encodings:
+        r = run(frames, capacity, encoding, args.quality, args.png_compression, args.threads,
+                0.0 if args.unpaced else 1.0 / args.fps)
+        print(f"{encoding:6} {r['resident_mb']:10.1f} {r['push_p50_ms']:9.3f} {r['push_p95_ms']:9.3f} "
+              f"{r['encode_ms']:10.2f} {r['decode_ms']:10.2f} {r['psnr_db']:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Time-to-first-processed-frame: cold interpreter vs. warm in-process launcher.
+
+cold  a fresh interpreter (what main.py's old os.system launch did) imports the
+      tracker, loads YOLO/MediaPipe, opens the video and processes one frame
+warm  the same inside this process after the model registry was warmed,
+      i.e. a second tool run from main.py
+
+Needs yolov8n.pt and the tracking video (or --video).
+
+Usage: python benchmarks/startup_benchmark.py [--video path] [--runs 3]
+"""
+
+import argparse
+import contextlib
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+
+def first_processed_frame(video_path=None):
+    """Build a PlayerTracker, open the video and process its first frame"""
+    from player_tracker import PlayerTracker, create_preprocessor, decode_frame, open_tracking_video
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        tracker = PlayerTracker()
+        cap = open_tracking_video(tracker, video_path)
+        if cap is None:
+            tracker.close()
+            return False
+        frame, prepared = decode_frame(cap, create_preprocessor())
+        if frame is not None:
+            tracker.process_frame(frame, prepared=prepared)
+        cap.release()
+        tracker.close()
+    return frame is not None
+
+
+def run_cold(video_path, runs):
+    """Seconds from interpreter start to the first processed frame, one fresh process per run"""
+    command = [sys.executable, os.path.abspath(__file__), '--child']
+    if video_path:
+        command += ['--video', video_path]
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f"❌ Cold run failed:\n{result.stderr.strip()[-2000:]}")
+            return None
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def run_warm(video_path, runs):
+    """Seconds to the first processed frame inside this process once the registry is warm"""
+    from modules.model_registry import get_model_registry
+
+    get_model_registry().warmup()
+    if not first_processed_frame(video_path):  # Imports the tracker modules like the launcher's first run
+        print("❌ Warm run could not process a frame")
+        return None
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        first_processed_frame(video_path)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time-to-first-processed-frame, cold vs. warm")
+    parser.add_argument('--video', help="Video to open (default: tracking video from video_config)")
+    parser.add_argument('--runs', type=int, default=3, help="Runs per mode")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        os.chdir(ROOT)
+        sys.exit(0 if first_processed_frame(args.video) else 1)
+
+    os.chdir(ROOT)  # config.json and yolov8n.pt are looked up in the repository root
+    print(f"Measuring time to first processed frame ({args.runs} runs each)...")
+    cold = run_cold(args.video, args.runs)
+    warm = run_warm(args.video, args.runs)
+    if not cold or not warm:
+        sys.exit(1)
+
+    cold_median = statistics.median(cold)
+    warm_median = statistics.median(warm)
+    print(f"{'mode':6} {'median s':>9} {'min s':>7} {'max s':>7}")
+    print(f"{'cold':6} {cold_median:9.2f} {min(cold):7.2f} {max(cold):7.2f}")
+    print(f"{'warm':6} {warm_median:9.2f} {min(warm):7.2f} {max(warm):7.2f}")
+    print(f"Warm launcher is {cold_median / warm_median:.1f}x faster to the first frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Synthetic kabadi scenes and a deterministic stub detector for benchmarks.
+
+SyntheticScene moves player rectangles over a court with a boundary line;
+a configurable fraction of them step back and forth across it, so every
+frame has ground-truth boxes, feet and violations. StubDetector answers
+yolo_model.track() / YOLODetector.detect_players() from that ground truth,
+so the tracker runs without YOLO weights or a video.
+"""
+
+import json
+
+import cv2
+import numpy as np
+
+
+class SyntheticScene:
+    def __init__(self, num_players=10, width=1280, height=720, crossing_fraction=0.3, boundary_y=0.62,
+                 boundary_tilt=0.05, period=90, seed=0):
+        """Players moving over a width x height court with a boundary line.
+
+        The boundary runs from boundary_y * height on the left, tilted by
+        boundary_tilt * height to the right. crossing_fraction of the players
+        oscillate across it with a period of period frames; the rest stay above it.
+        """
+        self.num_players = num_players
+        self.width = width
+        self.height = height
+        self.period = period
+
+        left = boundary_y * height
+        right = left + boundary_tilt * height
+        self.boundary_points = [[int(x), int(round(left + (right - left) * x / width))]
+                                for x in np.linspace(0, width, 5)]
+        self.boundary_x = np.array([p[0] for p in self.boundary_points], dtype=np.float64)
+        self.boundary_yv = np.array([p[1] for p in self.boundary_points], dtype=np.float64)
+
+        rng = np.random.default_rng(seed)
+        self.ids = np.arange(1, num_players + 1)
+        self.start_x = rng.uniform(0.05, 0.95, num_players) * width
+        self.speed_x = rng.uniform(-3.0, 3.0, num_players)
+        self.phase = rng.uniform(0, 2 * np.pi, num_players)
+        self.crossing = rng.random(num_players) < crossing_fraction
+
+        # Crossing players oscillate around the line, the others stay well above it
+        self.base_y = np.where(self.crossing, 0.0, -rng.uniform(60, 0.4 * height, num_players))
+        self.amplitude = np.where(self.crossing, rng.uniform(25, 60, num_players), rng.uniform(5, 30, num_players))
+        self.colors = rng.integers(40, 255, (num_players, 3))
+
+    def boundary_at(self, xs):
+        """Boundary y at every x (end values held outside the line)"""
+        return np.interp(xs, self.boundary_x, self.boundary_yv)
+
+    def write_config(self, path):
+        """Write a config.json with this scene's boundary (scene pixels = original video coordinates)"""
+        with open(path, 'w') as f:
+            json.dump({'boundary_points': self.boundary_points}, f, indent=2)
+        return path
+
+    def truth(self, frame_index):
+        """Ground truth of a frame: dict of arrays 'ids', 'bbox' (N, 4), 'foot' (N, 2) and 'violation' (N,)"""
+        t = float(frame_index)
+
+        # Horizontal movement bounces off the court edges
+        span = self.width * 0.9
+        travel = np.mod(self.start_x - self.width * 0.05 + self.speed_x * t, 2 * span)
+        xs = self.width * 0.05 + np.where(travel > span, 2 * span - travel, travel)
+
+        line_y = self.boundary_at(xs)
+        foot_y = line_y + self.base_y + self.amplitude * np.sin(2 * np.pi * t / self.period + self.phase)
+        foot_y = np.clip(foot_y, 40, self.height - 1)
+
+        # Players further down the court (closer to the camera) appear bigger
+        box_h = (0.12 + 0.12 * foot_y / self.height) * self.height
+        box_w = 0.4 * box_h
+        bbox = np.stack([xs - box_w / 2, foot_y - box_h, xs + box_w / 2, foot_y], axis=1)
+        bbox = np.clip(bbox, 0, [self.width, self.height, self.width, self.height]).round().astype(np.int64)
+
+        feet = np.stack([(bbox[:, 0] + bbox[:, 2]) // 2, bbox[:, 3]], axis=1)
+        return {
+            'ids': self.ids,
+            'bbox': bbox,
+            'foot': feet,
+            'violation': feet[:, 1] > self.boundary_at(feet[:, 0])
+        }
+
+    def render(self, frame_index, truth=None):
+        """BGR image of a frame: court, boundary line and filled player rectangles"""
+        truth = truth if truth is not None else self.truth(frame_index)
+        image = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        image[:] = (60, 110, 70)
+        cv2.polylines(image, [np.array(self.boundary_points, np.int32)], False, (230, 230, 230), 3)
+        for (x1, y1, x2, y2), color in zip(truth['bbox'], self.colors):
+            cv2.rectangle(image, (int(x1), int(y1)), (int(x2), int(y2)), tuple(int(c) for c in color), -1)
+        return image
+
+
+class _Tensor:
+    def __init__(self, array):
+        """Numpy array with the torch tensor methods the tracker calls on YOLO results"""
+        self.array = np.asarray(array)
+
+    def __len__(self):
+        return len(self.array)
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.array
+
+    def int(self):
+        return _Tensor(self.array.astype(np.int64))
+
+    def float(self):
+        return _Tensor(self.array.astype(np.float32))
+
+    def tolist(self):
+        return self.array.tolist()
+
+
+class _Boxes:
+    def __init__(self, xyxy, ids, confs):
+        """Shaped like ultralytics Boxes of model.track() (id is None without detections)"""
+        self.xyxy = _Tensor(np.asarray(xyxy, dtype=np.float32).reshape(-1, 4))
+        self.conf = _Tensor(np.asarray(confs, dtype=np.float32))
+        self.cls = _Tensor(np.zeros(len(self.conf), dtype=np.float32))
+        self.id = _Tensor(np.asarray(ids, dtype=np.float32)) if len(ids) else None
+
+    def __len__(self):
+        return len(self.conf)
+
+
+class _Result:
+    def __init__(self, boxes):
+        self.boxes = boxes
+
+
+class StubDetector:
+    def __init__(self, scene, jitter=2.0, miss_rate=0.0, seed=0):
+        """Deterministic stand-in for the YOLO model and YOLODetector.
+
+        Detections are the scene's ground-truth boxes of the frame set with
+        set_frame(), with the ground-truth player number as track ID, jittered by
+        up to jitter pixels and dropped with probability miss_rate. Jitter and
+        misses depend only on seed and the frame index, so every run is identical.
+        """
+        self.scene = scene
+        self.jitter = jitter
+        self.miss_rate = miss_rate
+        self.seed = seed
+        self.frame_index = 0
+        self.calls = 0
+
+    def set_frame(self, frame_index):
+        """Frame whose ground truth the next calls return"""
+        self.frame_index = frame_index
+
+    def boxes(self, image_shape):
+        """(xyxy, ids, confidences) of the current frame scaled to an image of this shape"""
+        truth = self.scene.truth(self.frame_index)
+        rng = np.random.default_rng((self.seed, self.frame_index))
+        keep = rng.random(len(truth['ids'])) >= self.miss_rate
+        noise = rng.uniform(-self.jitter, self.jitter, truth['bbox'].shape)
+        confs = rng.uniform(0.6, 0.95, len(truth['ids']))
+
+        scale_x = image_shape[1] / float(self.scene.width)
+        scale_y = image_shape[0] / float(self.scene.height)
+        xyxy = (truth['bbox'] + noise) * [scale_x, scale_y, scale_x, scale_y]
+        return xyxy[keep], truth['ids'][keep], confs[keep]
+
+    def track(self, source, persist=True, classes=None, conf=0.25, iou=0.7, tracker=None, imgsz=None, **kwargs):
+        """Same call and result shape as ultralytics YOLO.track() on one image"""
+        self.calls += 1
+        xyxy, ids, confs = self.boxes(source.shape)
+        keep = confs >= conf
+        return [_Result(_Boxes(xyxy[keep], ids[keep], confs[keep]))]
+
+    def detect_players(self, frame, conf_threshold=0.5):
+        """Same result as YOLODetector.detect_players()"""
+        from modules.yolo_detector import boxes_to_detections
+
+        self.calls += 1
+        xyxy, ids, confs = self.boxes(frame.shape)
+        return boxes_to_detections(xyxy, ids, confs, frame.shape, conf_threshold)
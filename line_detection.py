@@ -15,6 +15,8 @@ mouse_x, mouse_y = 0, 0
 hough_lines = []
 selected_line_idx = -1
 back_pressed = False
+setup_frame = None  # Original-resolution frame the line is drawn on
+REFERENCE_FRAME_PATH = "boundary_reference.jpg"  # Saved next to config.json for boundary drift tracking
 
 def detect_hough_lines(image):
     try:
@@ -260,7 +262,19 @@ def save_line():
         # Convert display coordinates back to original video coordinates
         real_points = [(int(p[0] / scale_factor), int(p[1] / scale_factor)) for p in points]
     
-    data = {"boundary_points": real_points, "method": detection_method}
+    # Keep other settings (e.g. named court lines) already in config.json
+    data = {}
+    if os.path.exists("config.json"):
+        try:
+            with open("config.json", "r") as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"WARNING: Could not read existing config.json: {e}")
+    data.update({"boundary_points": real_points, "method": detection_method})
+    
+    # The setup frame lets the tracker re-register the boundary when the camera moves
+    if setup_frame is not None and cv2.imwrite(REFERENCE_FRAME_PATH, setup_frame):
+        data["reference_frame"] = REFERENCE_FRAME_PATH
     with open("config.json", "w") as f:
         json.dump(data, f)
     
@@ -271,7 +285,7 @@ def save_line():
     exit()
 
 def start_detection(method):
-    global detection_method, mode, img_display, img_clean, hough_lines, selected_line_idx, back_pressed
+    global detection_method, mode, img_display, img_clean, hough_lines, selected_line_idx, back_pressed, setup_frame
     
     detection_method = method
     mode = "DRAWING" if method != "HOUGH" else "HOUGH_SELECT"
@@ -285,6 +299,7 @@ def start_detection(method):
     if not ret:
         print(f"Error: Could not load video from {video_path}")
         return False
+    setup_frame = frame
     
     target_width = 1280  # Standard display width
     orig_h, orig_w = frame.shape[:2]
@@ -368,8 +383,19 @@ class LineDetectionGUI:
         self.root.mainloop()
 
 def main():
+    global points, selected_line_idx
+    # Module state survives between runs when the launcher calls main() in-process
+    points = []
+    selected_line_idx = -1
     gui = LineDetectionGUI()
-    gui.run()
+    try:
+        gui.run()
+    finally:
+        # save_line() exits from inside mainloop; close the Tk window either way
+        try:
+            gui.root.destroy()
+        except tk.TclError:
+            pass
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -2,34 +2,58 @@
 """
 Kabadi Player Tracking System - Main Entry Point
 Run this file to start the complete tracking system
+
+Tools run inside this process: YOLO and MediaPipe are loaded and warmed once
+in the background while the menu is shown, and each tool module is imported
+only when it is chosen.
 """
 
-import os
+import importlib
 import sys
+import time
+
+from modules.model_registry import get_model_registry
+
+TOOLS = {
+    "1": ("line_detection", "Line Detection", "This will help you set boundary lines for violation detection"),
+    "2": ("player_tracker", "Player Tracking", "Make sure you have set boundary lines first (option 1)")
+}
+
+
+def run_tool(module_name):
+    """Import a tool module on first use and run its main() in this process"""
+    start = time.perf_counter()
+    try:
+        importlib.import_module(module_name).main()
+    except SystemExit:
+        pass  # Tools may exit() when done; return to the menu instead
+    except KeyboardInterrupt:
+        print("\nInterrupted")
+    except Exception as e:
+        print(f"ERROR: {module_name} failed: {e}")
+    print(f"Finished in {time.perf_counter() - start:.1f}s")
+
 
 def main():
-    print("KABADI PLAYER TRACKING SYSTEM")
-    print("=" * 50)
-    print("Choose an option:")
-    print("1. Set Boundary Lines (Line Detection)")
-    print("2. Start Player Tracking")
-    print("3. Exit")
-    print("=" * 50)
+    get_model_registry().warmup_async()
     
     while True:
+        print("KABADI PLAYER TRACKING SYSTEM")
+        print("=" * 50)
+        print("Choose an option:")
+        print("1. Set Boundary Lines (Line Detection)")
+        print("2. Start Player Tracking")
+        print("3. Exit")
+        print("=" * 50)
+        
         choice = input("Enter your choice (1-3): ").strip()
         
-        if choice == "1":
-            print("\nStarting Line Detection...")
-            print("This will help you set boundary lines for violation detection")
-            os.system("python line_detection.py")
-            break
-            
-        elif choice == "2":
-            print("\nStarting Player Tracking...")
-            print("Make sure you have set boundary lines first (option 1)")
-            os.system("python player_tracker.py")
-            break
+        if choice in TOOLS:
+            module_name, title, hint = TOOLS[choice]
+            print(f"\nStarting {title}...")
+            print(hint)
+            run_tool(module_name)
+            print()
             
         elif choice == "3":
             print("\nGoodbye!")
@@ -39,4 +63,4 @@ def main():
             print("Invalid choice. Please enter 1-3.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
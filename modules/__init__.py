@@ -1,21 +1,58 @@
 # Modular Player Tracking System
 # This package contains modular components for player detection and tracking
 
+import importlib
+
 __version__ = "1.0.0"
 __author__ = "Kabadi Tracking System"
 
-from .yolo_detector import YOLODetector
-from .skeleton_tracker import SkeletonTracker
-from .player_id_manager import PlayerIDManager
-from .boundary_detector import BoundaryDetector
-from .violation_recorder import ViolationRecorder
-from .kalman_tracker import KalmanTracker
-
-__all__ = [
-    'YOLODetector',
-    'SkeletonTracker', 
-    'PlayerIDManager',
-    'BoundaryDetector',
-    'ViolationRecorder',
-    'KalmanTracker'
-]
\ No newline at end of file
+# Public name -> submodule. Submodules are imported on first access, so importing one
+# lightweight module does not pull in ultralytics/torch or mediapipe.
+_EXPORTS = {
+    'YOLODetector': 'yolo_detector',
+    'StreamTracker': 'yolo_detector',
+    'SkeletonTracker': 'skeleton_tracker',
+    'PlayerIDManager': 'player_id_manager',
+    'BoundaryDetector': 'boundary_detector',
+    'ViolationRecorder': 'violation_recorder',
+    'KalmanTracker': 'kalman_tracker',
+    'KalmanBank': 'kalman_tracker',
+    'FramePipeline': 'frame_pipeline',
+    'PoseWorkerPool': 'pose_worker_pool',
+    'FrameRing': 'frame_ring',
+    'EncodedFrameRing': 'frame_ring',
+    'EvidenceWriter': 'evidence_writer',
+    'CourtModel': 'court_model',
+    'BoundaryDriftTracker': 'boundary_drift',
+    'TrackAssociator': 'track_associator',
+    'StreamScheduler': 'stream_scheduler',
+    'SegmentStitcher': 'segment_stitcher',
+    'TrajectoryStore': 'trajectory_store',
+    'DetectionStride': 'detection_stride',
+    'BoundaryROIDetector': 'roi_detector',
+    'FramePreprocessor': 'frame_preprocessor',
+    'DetectionCache': 'detection_cache',
+    'StageTimer': 'stage_timer',
+    'PoseGate': 'pose_gate',
+    'DisplayRenderer': 'display_renderer',
+    'EventBus': 'event_bus',
+    'create_event_bus': 'event_bus',
+    'LandmarkerPool': 'landmarker_pool',
+    'create_backend': 'detector_backend',
+    'ModelRegistry': 'model_registry',
+    'get_model_registry': 'model_registry'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -1,85 +1,57 @@
-import json
 import numpy as np
 import cv2
+from .court_model import CourtModel, BOUNDARY_LINE
 
 class BoundaryDetector:
     def __init__(self):
         self.boundary_points = []
         self.original_boundary_points = []
+        self.court = CourtModel()
         
     def load_boundary_config(self, config_path='config.json'):
-        """Load boundary points from config file"""
+        """Load boundary points (and any named court lines) from config file"""
         try:
-            with open(config_path, 'r') as f:
-                config = json.load(f)
-                self.original_boundary_points = config['boundary_points']
-                print(f"✅ Loaded {len(self.original_boundary_points)} boundary points")
-                return True
+            self.court.load_config(config_path)
+            self.original_boundary_points = self.court.lines[BOUNDARY_LINE]['points']
+            print(f"✅ Loaded {len(self.original_boundary_points)} boundary points")
+            return True
         except Exception as e:
             print(f"❌ Error loading boundary points: {e}")
             return False
     
-    def scale_boundary_points(self, scale_factor):
-        """Scale boundary points for display resolution"""
+    def scale_boundary_points(self, scale_factor, frame_size=None):
+        """Scale boundary points for display resolution and precompile the court lines"""
         self.boundary_points = []
         for point in self.original_boundary_points:
             scaled_x = int(point[0] * scale_factor)
             scaled_y = int(point[1] * scale_factor)
             self.boundary_points.append([scaled_x, scaled_y])
+        
+        if self.court.lines:
+            self.court.scale_factor = scale_factor
+            self.court.transform = None
+            if frame_size is None:
+                # Cover every scaled court point when the frame size is not known
+                all_points = [p for name in self.court.line_names for p in self.court.scaled_points(name)]
+                frame_size = (max(p[0] for p in all_points) + 1, max(p[1] for p in all_points) + 1)
+            self.court.compile(scale_factor, frame_size)
+    
+    def classify_points(self, points):
+        """Court line bitflags for many points at once (see CourtModel.classify)"""
+        return self.court.classify(points)
     
     def is_point_below_boundary(self, point, debug=False):
-        """Check if point violates boundary with improved logic and debugging"""
+        """Check if point violates boundary using the precompiled court lines"""
         if len(self.boundary_points) < 2:
             if debug:
                 print(f"⚠️ No boundary points available")
             return False
-            
-        x, y = point
-        
-        # Sort boundary points by x-coordinate for proper interpolation
-        sorted_points = sorted(self.boundary_points, key=lambda p: p[0])
-        
-        # Find boundary y-coordinate at given x
-        min_x = sorted_points[0][0]
-        max_x = sorted_points[-1][0]
-        
-        boundary_y = None
-        
-        if x < min_x:
-            # Extrapolate from first point
-            boundary_y = sorted_points[0][1]
-            if debug:
-                print(f"🔍 Point ({x},{y}) left of boundary, using y={boundary_y}")
-        elif x > max_x:
-            # Extrapolate from last point
-            boundary_y = sorted_points[-1][1]
-            if debug:
-                print(f"🔍 Point ({x},{y}) right of boundary, using y={boundary_y}")
-        else:
-            # Interpolate between boundary points
-            for i in range(len(sorted_points) - 1):
-                x1, y1 = sorted_points[i]
-                x2, y2 = sorted_points[i + 1]
-                
-                if x1 <= x <= x2:
-                    if x2 != x1:
-                        boundary_y = y1 + (y2 - y1) * (x - x1) / (x2 - x1)
-                    else:
-                        boundary_y = y1
-                    
-                    if debug:
-                        print(f"🔍 Interpolated between ({x1},{y1}) and ({x2},{y2}): boundary_y={boundary_y:.1f}")
-                    break
-        
-        if boundary_y is None:
-            if debug:
-                print(f"❌ Could not determine boundary_y for point ({x},{y})")
-            return False
         
-        # Check violation: foot below boundary line (higher y value)
-        violation = y > boundary_y
+        x, y = point
+        violation = bool(self.court.is_beyond([point], BOUNDARY_LINE)[0])
         
         if debug:
+            boundary_y = self.court.line_position(BOUNDARY_LINE, x)
             print(f"🎯 Point ({x},{y}) vs boundary_y={boundary_y:.1f} → violation={violation}")
         
         return violation
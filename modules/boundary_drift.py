@@ -0,0 +1,238 @@
+import math
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from .frame_preprocessor import scale_matrix
+
+# Drift states reported by BoundaryDriftTracker
+ALIGNED = 'aligned'  # Camera motion measured and corrected (or none)
+TOO_LARGE = 'too_large'  # Camera moved more than can be corrected, boundary needs to be set up again
+LOST = 'lost'  # Registration failed several times in a row, the boundary cannot be verified
+
+
+class BoundaryDriftTracker:
+    def __init__(self, interval=30, budget_ms=1.0, work_width=480, method='orb', max_shift=0.08, max_rotation=5.0,
+                 min_update=2.0, min_inliers=25, lost_after=5, points=None):
+        """Background re-registration of the camera against the frame the court lines were set up on.
+
+        Every interval frames the tracking loop submit()s a small grayscale copy
+        of the frame; a worker thread estimates the camera motion since the
+        setup frame (ORB features + RANSAC, or ECC) as a similarity transform in
+        original video coordinates and, when the boundary moved by at least
+        min_update pixels, compiles a copy of the court lines warped by it.
+        The tracking loop picks finished results up with poll(). The average
+        CPU time per frame (estimation, compile and the copy taken on the
+        tracking thread) is kept under budget_ms by stretching the interval.
+        Motion moving the points by more than max_shift of the frame width or
+        rotating by more than max_rotation degrees is not corrected (TOO_LARGE),
+        and lost_after failed registrations in a row report LOST.
+        """
+        if method not in ('orb', 'ecc'):
+            raise ValueError(f"Unknown drift registration method '{method}', expected 'orb' or 'ecc'")
+        self.interval = interval
+        self.budget_ms = budget_ms
+        self.work_width = work_width
+        self.method = method
+        self.max_shift = max_shift
+        self.max_rotation = max_rotation
+        self.min_update = min_update
+        self.min_inliers = min_inliers
+        self.lost_after = lost_after
+        self.points = None if points is None else np.asarray(points, dtype=np.float64).reshape(-1, 2)
+
+        self.orb = cv2.ORB_create(nfeatures=500, fastThreshold=12)
+        self.matcher = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True)
+        self.reference = None  # (small image, keypoints, descriptors, native -> small matrix, native width)
+        self.applied = np.eye(3)  # Drift of the last result handed out for correction
+        self.ecc_warp = np.eye(2, 3, dtype=np.float32)  # Last ECC estimate (starting point of the next)
+
+        self.state = ALIGNED
+        self.failures = 0
+        self.last_submit = None
+        self.cost_ms = 0.0  # Smoothed CPU time of one registration
+        self.registrations = 0
+        self.corrections = 0
+        self.pending = None  # Submitted job not taken by the worker yet
+        self.result = None  # Finished result not polled yet
+        self.busy = False
+        self.closed = False
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self._run, name='boundary-drift', daemon=True)
+        self.thread.start()
+
+    @property
+    def current_interval(self):
+        """Frames between registrations: interval, stretched to keep the cost per frame within budget"""
+        if self.budget_ms <= 0:
+            return self.interval
+        return max(self.interval, int(math.ceil(self.cost_ms / self.budget_ms)))
+
+    def shrink(self, image, native_to_image):
+        """Grayscale image at work_width and the matrix mapping original video coordinates onto it"""
+        height, width = image.shape[:2]
+        factor = self.work_width / float(width)
+        size = (self.work_width, int(round(height * factor)))
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        small = cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+        return small, scale_matrix(factor) @ native_to_image
+
+    def set_reference(self, image, native_to_image=None):
+        """Frame the court lines were set up on (the saved setup frame, else the first submitted frame)"""
+        self._set_reference(*self.shrink(image, np.eye(3) if native_to_image is None else native_to_image))
+
+    def _set_reference(self, small, to_small):
+        keypoints, descriptors = self.orb.detectAndCompute(small, None)
+        self.reference = (small, keypoints, descriptors, to_small, small.shape[1] / to_small[0, 0])
+
+    def is_due(self, frame_count):
+        """True if a new registration should be submitted for this frame"""
+        if self.busy or self.pending is not None:
+            return False
+        return self.last_submit is None or frame_count - self.last_submit >= self.current_interval
+
+    def submit(self, frame_count, image, native_to_image, court=None, base=None, frame_size=None):
+        """Queue the registration of a frame (copied here, processed on the worker thread).
+
+        A copy of court (its lines, uncompiled) is compiled with base @ drift for
+        frame_size when the correction changes. Both copies count as submit time.
+        """
+        start = time.perf_counter()
+        small, to_small = self.shrink(image, native_to_image)
+        court = court.clone() if court is not None else None
+        job = {'frame': frame_count, 'image': small, 'to_small': to_small, 'court': court, 'base': base,
+               'frame_size': frame_size, 'submit_ms': 1000 * (time.perf_counter() - start)}
+        with self.condition:
+            self.pending = job
+            self.last_submit = frame_count
+            self.condition.notify_all()
+
+    def poll(self):
+        """Latest finished result (dict) or None"""
+        if self.result is None:
+            return None
+        with self.condition:
+            result, self.result = self.result, None
+        return result
+
+    def estimate(self, small, to_small):
+        """Drift matrix (original video coordinates, setup frame -> this frame) and inlier count, or (None, n)"""
+        ref_small, ref_keypoints, ref_descriptors, ref_to_small, _ = self.reference
+        if self.method == 'ecc':
+            warp = self.ecc_warp.copy()
+            try:
+                _, warp = cv2.findTransformECC(ref_small, small, warp, cv2.MOTION_EUCLIDEAN,
+                                               (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 50, 1e-4), None, 5)
+            except cv2.error:
+                return None, 0
+            self.ecc_warp = warp
+            matrix, inliers = warp.astype(np.float64), self.min_inliers
+        else:
+            keypoints, descriptors = self.orb.detectAndCompute(small, None)
+            if descriptors is None or ref_descriptors is None:
+                return None, 0
+            matches = self.matcher.match(ref_descriptors, descriptors)
+            if len(matches) < self.min_inliers:
+                return None, len(matches)
+            ref_points = np.float32([ref_keypoints[m.queryIdx].pt for m in matches])
+            points = np.float32([keypoints[m.trainIdx].pt for m in matches])
+            matrix, mask = cv2.estimateAffinePartial2D(ref_points, points, method=cv2.RANSAC,
+                                                       ransacReprojThreshold=2.0)
+            inliers = int(mask.sum()) if mask is not None else 0
+            if matrix is None or inliers < self.min_inliers:
+                return None, inliers
+        small_drift = np.vstack([matrix, [0.0, 0.0, 1.0]])
+        return np.linalg.inv(to_small) @ small_drift @ ref_to_small, inliers
+
+    def measure(self, drift):
+        """Largest displacement of the tracked points (frame corners without points) and rotation in degrees"""
+        points = self.points
+        if points is None or len(points) == 0:
+            width = self.reference[4]
+            height = width * self.reference[0].shape[0] / self.reference[0].shape[1]
+            points = np.array([[0, 0], [width, 0], [0, height], [width, height]], dtype=np.float64)
+        moved = points @ drift[:2, :2].T + drift[:2, 2]
+        rotation = math.degrees(math.atan2(drift[1, 0], drift[0, 0]))
+        return float(np.linalg.norm(moved - points, axis=1).max()), rotation, moved
+
+    def register(self, job):
+        """Estimate the drift of a submitted frame and decide whether to correct it"""
+        if self.reference is None:
+            # No saved setup frame: the first frame is the reference
+            self._set_reference(job['image'], job['to_small'])
+            return None
+        drift, inliers = self.estimate(job['image'], job['to_small'])
+        result = {'frame': job['frame'], 'inliers': inliers, 'drift': None, 'court': None}
+        if drift is None:
+            self.failures += 1
+            if self.failures >= self.lost_after:
+                self.state = LOST
+            result.update(state=self.state, shift_px=None, rotation_deg=None)
+            return result
+
+        self.failures = 0
+        shift, rotation, moved = self.measure(drift)
+        result.update(shift_px=round(shift, 2), rotation_deg=round(rotation, 3))
+        if shift > self.max_shift * self.reference[4] or abs(rotation) > self.max_rotation:
+            self.state = TOO_LARGE
+            result['state'] = self.state
+            return result
+
+        self.state = ALIGNED
+        result['state'] = self.state
+        _, _, applied = self.measure(self.applied)
+        if np.linalg.norm(moved - applied, axis=1).max() >= self.min_update:
+            # Only a change of the correction is handed out (and compiled), not every jitter
+            self.applied = drift
+            self.corrections += 1
+            result['drift'] = drift
+            if job['court'] is not None:
+                job['court'].compile(job['base'][0, 0], job['frame_size'], job['base'] @ drift)
+                result.update(court=job['court'], base=job['base'], frame_size=job['frame_size'])
+        return result
+
+    def _run(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending is not None or self.closed)
+                if self.closed:
+                    return
+                job, self.pending = self.pending, None
+                self.busy = True
+            start = time.thread_time()
+            try:
+                result = self.register(job)
+            except Exception as e:
+                print(f"❌ Boundary drift registration error: {e}")
+                result = None
+            cost_ms = 1000 * (time.thread_time() - start) + job['submit_ms']
+            self.cost_ms = cost_ms if self.registrations == 0 else 0.8 * self.cost_ms + 0.2 * cost_ms
+            self.registrations += 1
+            with self.condition:
+                if result is not None:
+                    result['cost_ms'] = round(cost_ms, 2)
+                    previous = self.result
+                    if previous is not None and result['drift'] is None and previous['drift'] is not None:
+                        # Keep a correction the tracking loop has not picked up yet
+                        for key in ('drift', 'court', 'base', 'frame_size'):
+                            result[key] = previous.get(key)
+                    self.result = result
+                self.busy = False
+
+    def get_stats(self):
+        return {
+            'state': self.state,
+            'registrations': self.registrations,
+            'corrections': self.corrections,
+            'interval': self.current_interval,
+            'cost_ms': round(self.cost_ms, 2),
+            'cost_per_frame_ms': round(self.cost_ms / self.current_interval, 3)
+        }
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.thread.join()
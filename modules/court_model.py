@@ -0,0 +1,194 @@
+import json
+import os
+
+import numpy as np
+
+# Which side of a line is flagged: below/above use the line's y at each column,
+# left/right use the line's x at each row (lobby side lines)
+LINE_SIDES = ('below', 'above', 'left', 'right')
+
+# Name of the line loaded from "boundary_points" (the violation line)
+BOUNDARY_LINE = 'boundary'
+
+
+def interpolate_line(coords, line_a, line_b):
+    """Line value at every coordinate, same arithmetic as the original per-point check.
+
+    line_a/line_b are the sorted point coordinates along and across the line;
+    outside the line the end values are held (of the first point at either
+    end, like the original check when several points share the end coordinate).
+    """
+    coords = np.asarray(coords, dtype=np.int64)
+    values = np.empty(len(coords), dtype=np.float64)
+    values[coords < line_a[0]] = line_b[0]
+    values[coords > line_a[-1]] = line_b[list(line_a).index(line_a[-1])]
+    # Later segments first so the first bracketing segment wins at shared points
+    for i in reversed(range(len(line_a) - 1)):
+        a1, b1, a2, b2 = line_a[i], line_b[i], line_a[i + 1], line_b[i + 1]
+        inside = (coords >= a1) & (coords <= a2)
+        if a2 != a1:
+            values[inside] = b1 + (b2 - b1) * (coords[inside] - a1) / (a2 - a1)
+        else:
+            values[inside] = b1
+    return values
+
+
+class CourtModel:
+    def __init__(self):
+        """Named court lines compiled into a per-pixel bitflag map for batched foot checks"""
+        self.lines = {}       # name: {'points': [[x, y], ...], 'side': ...} in original video coordinates
+        self.line_names = []  # Bit i of a flag belongs to line_names[i]
+        self.scale_factor = 1.0
+        self.transform = None   # 3x3 affine matrix from config (native video) to frame coordinates
+        self.frame_size = None  # (width, height) the flag map was compiled for
+        self.flag_map = None    # (height + 1, width + 1) array of line bitflags
+        self.tables = {}        # name: (axis, thresholds) per-column or per-row lookup table
+        self.reference_frame = None  # Setup frame the lines were drawn on (path), if saved with the config
+
+    def add_line(self, name, points, side='below'):
+        """Add a named line (original video coordinates)"""
+        if side not in LINE_SIDES:
+            raise ValueError(f"Unknown side '{side}' for court line {name}")
+        if name not in self.lines:
+            self.line_names.append(name)
+        self.lines[name] = {'points': [list(p) for p in points], 'side': side}
+        self.flag_map = None
+
+    def load_config(self, config_path='config.json'):
+        """Load the boundary line and optional named court lines from config file"""
+        with open(config_path, 'r') as f:
+            config = json.load(f)
+
+        self.lines = {}
+        self.line_names = []
+        self.add_line(BOUNDARY_LINE, config['boundary_points'], 'below')
+
+        # "court_lines": {"baulk_line": {"points": [[x, y], ...], "side": "below"}, ...}
+        for name, line in config.get('court_lines', {}).items():
+            self.add_line(name, line['points'], line.get('side', 'below'))
+
+        # Relative to the config file
+        self.reference_frame = config.get('reference_frame')
+        if self.reference_frame:
+            self.reference_frame = os.path.join(os.path.dirname(config_path), self.reference_frame)
+        return True
+
+    def clone(self):
+        """Uncompiled copy with the same lines (e.g. to compile for another transform off the tracking thread)"""
+        court = CourtModel()
+        for name in self.line_names:
+            court.add_line(name, self.lines[name]['points'], self.lines[name]['side'])
+        court.reference_frame = self.reference_frame
+        return court
+
+    def line_flag(self, name):
+        """Bitflag of a line in classify() results"""
+        return 1 << self.line_names.index(name)
+
+    def frame_transform(self):
+        """Matrix mapping config coordinates to frame coordinates (uniform scale_factor if none is set)"""
+        if self.transform is not None:
+            return self.transform
+        return np.array([[self.scale_factor, 0.0, 0.0], [0.0, self.scale_factor, 0.0], [0.0, 0.0, 1.0]])
+
+    def scaled_points(self, name):
+        """Line points mapped to the current frame resolution"""
+        matrix = self.frame_transform()
+        points = np.asarray(self.lines[name]['points'], dtype=np.float64).reshape(-1, 2)
+        mapped = points @ matrix[:2, :2].T + matrix[:2, 2]
+        return [[int(x), int(y)] for x, y in mapped]
+
+    def compile(self, scale_factor, frame_size, transform=None):
+        """Precompute lookup tables and the per-pixel bitflag map for a (width, height) frame.
+        
+        transform optionally maps config coordinates to frame coordinates
+        (otherwise they are scaled by scale_factor).
+        """
+        self.scale_factor = scale_factor
+        self.transform = transform
+        self.frame_size = tuple(frame_size)
+        width, height = self.frame_size
+
+        if len(self.line_names) > 32:
+            raise ValueError("CourtModel supports at most 32 lines")
+        dtype = np.uint8 if len(self.line_names) <= 8 else np.uint16 if len(self.line_names) <= 16 else np.uint32
+
+        # Map covers coordinates 0..width and 0..height inclusive (bbox bottoms sit on the frame edge)
+        xs = np.arange(width + 1)
+        ys = np.arange(height + 1)
+        self.flag_map = np.zeros((height + 1, width + 1), dtype=dtype)
+        self.tables = {}
+
+        for bit, name in enumerate(self.line_names):
+            points = self.scaled_points(name)
+            side = self.lines[name]['side']
+            if len(points) < 2:
+                continue
+
+            if side in ('below', 'above'):
+                # Boundary y at every column, end values held outside the line
+                ordered = sorted(points, key=lambda p: p[0])
+                thresholds = interpolate_line(xs, [p[0] for p in ordered], [p[1] for p in ordered])
+                self.tables[name] = ('column', thresholds)
+                mask = ys[:, None] > thresholds[None, :] if side == 'below' else ys[:, None] < thresholds[None, :]
+            else:
+                # Boundary x at every row for side lines
+                ordered = sorted(points, key=lambda p: p[1])
+                thresholds = interpolate_line(ys, [p[1] for p in ordered], [p[0] for p in ordered])
+                self.tables[name] = ('row', thresholds)
+                mask = xs[None, :] < thresholds[:, None] if side == 'left' else xs[None, :] > thresholds[:, None]
+
+            self.flag_map |= mask.astype(dtype) << dtype(bit)
+
+    def ensure_compiled(self, frame_shape):
+        """Recompile if the flag map does not match the frame size"""
+        frame_size = (frame_shape[1], frame_shape[0])
+        if self.flag_map is None or self.frame_size != frame_size:
+            self.compile(self.scale_factor, frame_size, self.transform)
+
+    def classify(self, points):
+        """Return the line bitflags of every (x, y) point with one indexing operation"""
+        if self.flag_map is None or len(points) == 0:
+            return np.zeros(len(points), dtype=np.uint32)
+        points = np.asarray(points, dtype=np.int64).reshape(-1, 2)
+        width, height = self.frame_size
+        # Points outside the frame take the flags of the nearest edge pixel
+        xs = np.clip(points[:, 0], 0, width)
+        ys = np.clip(points[:, 1], 0, height)
+        return self.flag_map[ys, xs]
+
+    def is_beyond(self, points, name=BOUNDARY_LINE):
+        """Boolean array: which points are on the flagged side of the named line"""
+        if name not in self.lines:
+            return np.zeros(len(points), dtype=bool)
+        return (self.classify(points) & self.line_flag(name)) != 0
+
+    def line_position(self, name, coordinate):
+        """Line y at column x (or x at row y for side lines), None if not compiled"""
+        if name not in self.tables:
+            return None
+        axis, thresholds = self.tables[name]
+        limit = len(thresholds) - 1
+        return float(thresholds[int(np.clip(coordinate, 0, limit))])
+
+    def signed_distance(self, points, name=BOUNDARY_LINE):
+        """Pixel distance of every point to the named line, positive on the flagged side.
+
+        Measured along the line's axis (vertical for below/above lines,
+        horizontal for side lines); None if the line is not compiled.
+        """
+        if name not in self.tables:
+            return None
+        points = np.asarray(points, dtype=np.int64).reshape(-1, 2)
+        axis, thresholds = self.tables[name]
+        limit = len(thresholds) - 1
+        side = self.lines[name]['side']
+        if axis == 'column':
+            values = thresholds[np.clip(points[:, 0], 0, limit)]
+            return points[:, 1] - values if side == 'below' else values - points[:, 1]
+        values = thresholds[np.clip(points[:, 1], 0, limit)]
+        return values - points[:, 0] if side == 'left' else points[:, 0] - values
+
+    def flag_names(self, flags):
+        """Names of the lines set in a bitflag value"""
+        return [name for bit, name in enumerate(self.line_names) if flags & (1 << bit)]
@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+# One row per detection: display-space bbox and foot, ByteTrack ID, confidence
+# and the row of its pose landmarks in poses.bin (-1 = no pose)
+DETECTION_DTYPE = np.dtype([
+    ('bbox', '<i4', (4,)),
+    ('yolo_id', '<i4'),
+    ('conf', '<f4'),
+    ('foot', '<i4', (2,)),
+    ('pose', '<i4')
+])
+NUM_LANDMARKS = 33
+POSE_DTYPE = np.dtype(('<f4', (NUM_LANDMARKS, 3)))  # x, y (display pixels), visibility
+
+FINGERPRINT_CHUNK = 4 * 1024 * 1024
+
+
+def video_fingerprint(video_path):
+    """Content hash of a video from its size and first/middle/last 4 MB (fast on multi-GB files)"""
+    size = os.path.getsize(video_path)
+    digest = hashlib.sha1(str(size).encode())
+    with open(video_path, 'rb') as f:
+        for offset in sorted({0, max(0, size // 2 - FINGERPRINT_CHUNK // 2), max(0, size - FINGERPRINT_CHUNK)}):
+            f.seek(offset)
+            digest.update(f.read(FINGERPRINT_CHUNK))
+    return digest.hexdigest()
+
+
+class DetectionCache:
+    def __init__(self, cache_dir):
+        """On-disk detections, tracker IDs and pose landmarks of every frame of a video.
+
+        Rows are appended to raw little-endian files while recording
+        (detections.bin, poses.bin, frames.bin with each frame's first row) and
+        read back through numpy memmaps, so replay touches only the frames it
+        reads. meta.json holds the key and is marked complete only after the
+        last frame was written.
+        """
+        self.cache_dir = cache_dir
+        self.key = None
+        self.meta = None
+        self.files = None
+        self.detection_rows = 0
+        self.pose_rows = 0
+        self.num_frames = 0
+        self.frames = None
+        self.detections = None
+        self.poses = None
+
+    @staticmethod
+    def key_for(video_path, settings):
+        """Cache key of a video and the detection settings (model, thresholds, resolution, ...)"""
+        return {'video': video_fingerprint(video_path), 'settings': settings}
+
+    @classmethod
+    def for_video(cls, video_path, settings, root='detection_cache'):
+        """Cache directory of this video + settings combination"""
+        key = cls.key_for(video_path, settings)
+        key_hash = hashlib.sha1(json.dumps(key, sort_keys=True).encode()).hexdigest()[:12]
+        stem = os.path.splitext(os.path.basename(video_path))[0]
+        cache = cls(os.path.join(root, f"{stem}_{key_hash}"))
+        cache.key = key
+        return cache
+
+    def _path(self, name):
+        return os.path.join(self.cache_dir, name)
+
+    def _key_changes(self, stored):
+        """Names of what differs between the stored key and this cache's key ('video' or setting names)"""
+        key = json.loads(json.dumps(self.key, sort_keys=True))  # As stored: JSON turns tuples into lists
+        stored = stored or {}
+        if stored == key:
+            return []
+        changed = ['video'] if stored.get('video') != key['video'] else []
+        settings, stored_settings = key['settings'], stored.get('settings') or {}
+        return changed + sorted(name for name in set(settings) | set(stored_settings)
+                                if settings.get(name) != stored_settings.get(name))
+
+    def matches(self):
+        """True if a finished recording made with this cache's key exists in the cache directory"""
+        try:
+            with open(self._path('meta.json'), 'r') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return meta.get('complete', False) and (self.key is None or not self._key_changes(meta.get('key')))
+
+    def is_complete(self):
+        """True if a finished recording exists in the cache directory"""
+        try:
+            with open(self._path('meta.json'), 'r') as f:
+                return json.load(f).get('complete', False)
+        except (OSError, ValueError):
+            return False
+
+    # Recording
+
+    def start_recording(self, native_size, display_size, fps=30.0):
+        """Start a new recording (any previous contents are replaced)"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.meta = {
+            'key': self.key,
+            'native_size': list(native_size),
+            'display_size': list(display_size),
+            'fps': fps,
+            'complete': False
+        }
+        with open(self._path('meta.json'), 'w') as f:
+            json.dump(self.meta, f, indent=2)
+        self.files = {name: open(self._path(f"{name}.bin"), 'wb') for name in ('frames', 'detections', 'poses')}
+        self.detection_rows = 0
+        self.pose_rows = 0
+        self.num_frames = 0
+
+    def record_frame(self, detections, poses):
+        """Append one frame: detection dicts and the matching pose results (same order)"""
+        rows = np.zeros(len(detections), dtype=DETECTION_DTYPE)
+        landmarks = []
+        for row, det, pose in zip(rows, detections, poses):
+            row['bbox'] = det['bbox']
+            row['yolo_id'] = det['yolo_id']
+            row['conf'] = det['confidence']
+            row['foot'] = pose['foot']
+            row['pose'] = -1
+            if pose['landmarks']:
+                row['pose'] = self.pose_rows + len(landmarks)
+                landmarks.append(pose['landmarks'][:NUM_LANDMARKS])
+
+        self.files['frames'].write(np.int64(self.detection_rows).tobytes())
+        self.files['detections'].write(rows.tobytes())
+        if landmarks:
+            self.files['poses'].write(np.asarray(landmarks, dtype=np.float32).astype('<f4').tobytes())
+        self.detection_rows += len(rows)
+        self.pose_rows += len(landmarks)
+        self.num_frames += 1
+
+    def finish(self):
+        """Close the files and mark the recording complete"""
+        if self.files is None:
+            return
+        self.files['frames'].write(np.int64(self.detection_rows).tobytes())  # End offset of the last frame
+        for f in self.files.values():
+            f.close()
+        self.files = None
+        self.meta.update({'complete': True, 'frames': self.num_frames,
+                          'detections': self.detection_rows, 'poses': self.pose_rows})
+        with open(self._path('meta.json'), 'w') as f:
+            json.dump(self.meta, f, indent=2)
+        print(f"💾 Detection cache written: {self.cache_dir} ({self.num_frames} frames, "
+              f"{self.detection_rows} detections, {self.pose_rows} poses)")
+
+    # Replay
+
+    def _memmap(self, name, dtype, count):
+        if count == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(self._path(f"{name}.bin"), dtype=dtype, mode='r', shape=(count,))
+
+    def load(self, force=False):
+        """Memory-map a complete recording.
+
+        If a key is set, the recording must have been made with the same key
+        (video and detection settings); with force=True a mismatch only warns.
+        """
+        with open(self._path('meta.json'), 'r') as f:
+            self.meta = json.load(f)
+        if not self.meta.get('complete'):
+            raise ValueError(f"Detection cache {self.cache_dir} is incomplete")
+        changed = self._key_changes(self.meta.get('key')) if self.key is not None else []
+        if changed:
+            message = f"Detection cache {self.cache_dir} was recorded with a different {', '.join(changed)}"
+            if not force:
+                raise ValueError(message)
+            print(f"⚠️ {message} - replaying it anyway (forced)")
+        self.frames = self._memmap('frames', np.dtype('<i8'), self.meta['frames'] + 1)
+        self.detections = self._memmap('detections', DETECTION_DTYPE, self.meta['detections'])
+        self.poses = self._memmap('poses', POSE_DTYPE, self.meta['poses'])
+        return self
+
+    @property
+    def frame_count(self):
+        return self.meta['frames']
+
+    @property
+    def display_size(self):
+        return tuple(self.meta['display_size'])
+
+    @property
+    def native_size(self):
+        return tuple(self.meta['native_size'])
+
+    @property
+    def fps(self):
+        return self.meta.get('fps', 30.0)
+
+    def frame(self, frame_index):
+        """Detection dicts and pose results of a frame, as produced by the live pipeline"""
+        rows = self.detections[self.frames[frame_index]:self.frames[frame_index + 1]]
+        detections, poses = [], []
+        for row in rows:
+            x1, y1, x2, y2 = (int(v) for v in row['bbox'])
+            detections.append({
+                'bbox': (x1, y1, x2, y2),
+                'center': (int((x1 + x2) / 2), int((y1 + y2) / 2)),
+                'yolo_id': int(row['yolo_id']),
+                'confidence': float(row['conf'])
+            })
+            landmarks = None
+            if row['pose'] >= 0:
+                landmarks = [(int(x), int(y), float(v)) for x, y, v in self.poses[row['pose']]]
+            poses.append({
+                'foot': (int(row['foot'][0]), int(row['foot'][1])),
+                'skeleton': landmarks is not None,
+                'landmarks': landmarks
+            })
+        return detections, poses
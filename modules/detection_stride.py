@@ -0,0 +1,70 @@
+import math
+
+
+class DetectionStride:
+    def __init__(self, stride=1, adaptive=False, max_stride=4, boundary_margin=40, target_fps=30.0):
+        """Decide on which frames the full YOLO detection runs.
+
+        Detection runs every stride-th frame; frames in between use Kalman
+        predictions. With adaptive=True the stride follows the measured
+        processing time so the average frame fits the 1/target_fps budget.
+        Detection is always forced when a predicted foot point is within
+        boundary_margin pixels of the boundary (or beyond it).
+        """
+        self.stride = max(1, int(stride))
+        self.adaptive = adaptive
+        self.max_stride = max(1, int(max_stride))
+        self.boundary_margin = boundary_margin
+        self.frame_budget = 1.0 / target_fps
+        self.last_detection_frame = None
+        self.detect_time = None   # Smoothed seconds per detected frame
+        self.predict_time = None  # Smoothed seconds per predicted frame
+        self.detected_frames = 0
+        self.predicted_frames = 0
+        self.forced_frames = 0
+
+    @property
+    def enabled(self):
+        return self.adaptive or self.stride > 1
+
+    def is_due(self, frame_count):
+        """True if the stride calls for a full detection on this frame"""
+        return (not self.enabled or self.last_detection_frame is None or
+                frame_count - self.last_detection_frame >= self.stride)
+
+    def near_boundary(self, distances):
+        """True if any signed boundary distance is within the safety margin"""
+        return distances is not None and len(distances) > 0 and distances.max() > -self.boundary_margin
+
+    def record(self, frame_count, detected, seconds, forced=False):
+        """Record how a frame was processed and adapt the stride to the measured time"""
+        if detected:
+            self.last_detection_frame = frame_count
+            self.detected_frames += 1
+            self.forced_frames += int(forced)
+            self.detect_time = seconds if self.detect_time is None else 0.9 * self.detect_time + 0.1 * seconds
+        else:
+            self.predicted_frames += 1
+            self.predict_time = seconds if self.predict_time is None else 0.9 * self.predict_time + 0.1 * seconds
+
+        if self.adaptive and self.detect_time is not None:
+            self.stride = self._adaptive_stride()
+
+    def _adaptive_stride(self):
+        """Smallest stride whose average frame time (detect + predicted frames) fits the budget"""
+        predict_time = self.predict_time if self.predict_time is not None else 0.0
+        if self.detect_time <= self.frame_budget:
+            return 1
+        if predict_time >= self.frame_budget:
+            return self.max_stride
+        stride = math.ceil((self.detect_time - predict_time) / (self.frame_budget - predict_time))
+        return min(self.max_stride, max(1, stride))
+
+    def get_stats(self):
+        """Detected/predicted/forced frame counts and the current stride"""
+        return {
+            'stride': self.stride,
+            'detected_frames': self.detected_frames,
+            'predicted_frames': self.predicted_frames,
+            'forced_frames': self.forced_frames
+        }
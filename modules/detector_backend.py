@@ -0,0 +1,221 @@
+import os
+import shutil
+
+import cv2
+import numpy as np
+
+# Image files accepted in a calibration directory
+CALIBRATION_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def letterbox_square(image, imgsz):
+    """Resize keeping the aspect ratio and pad to imgsz x imgsz (ultralytics' LetterBox for exported models)"""
+    height, width = image.shape[:2]
+    ratio = min(imgsz / height, imgsz / width)
+    new_w, new_h = int(round(width * ratio)), int(round(height * ratio))
+    if (new_w, new_h) != (width, height):
+        image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    pad_w, pad_h = imgsz - new_w, imgsz - new_h
+    return cv2.copyMakeBorder(image, pad_h // 2, pad_h - pad_h // 2, pad_w // 2, pad_w - pad_w // 2,
+                              cv2.BORDER_CONSTANT, value=(114, 114, 114))
+
+
+def to_network_input(image, imgsz):
+    """BGR frame -> (1, 3, imgsz, imgsz) float32 RGB in [0, 1], as YOLO is fed"""
+    image = letterbox_square(image, imgsz)
+    image = image[:, :, ::-1].transpose(2, 0, 1)
+    return np.ascontiguousarray(image, dtype=np.float32)[None] / 255.0
+
+
+def load_calibration_frames(source, count=300):
+    """Up to count BGR frames from a directory of images or evenly spaced from a video"""
+    if source and os.path.isdir(source):
+        names = sorted(name for name in os.listdir(source) if name.lower().endswith(CALIBRATION_EXTENSIONS))
+        step = max(1, len(names) // count) if count else 1
+        frames = [cv2.imread(os.path.join(source, name)) for name in names[::step][:count]]
+        return [frame for frame in frames if frame is not None]
+
+    cap = cv2.VideoCapture(source) if source else None
+    if cap is None or not cap.isOpened():
+        return []
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or count
+    frames = []
+    for index in np.linspace(0, max(0, total - 1), num=min(count, total)).astype(int):
+        cap.set(cv2.CAP_PROP_POS_FRAMES, int(index))
+        ret, frame = cap.read()
+        if ret:
+            frames.append(frame)
+    cap.release()
+    return frames
+
+
+class DetectorBackend:
+    def __init__(self, weights='yolov8n.pt', imgsz=640, int8=False, calibration=None, calibration_frames=300,
+                 export_dir='models'):
+        """How the detector's YOLO model is stored and executed.
+
+        model_path() is what YOLO() loads: the PyTorch weights or an exported
+        model, which ultralytics runs through the matching runtime with the same
+        predict()/track() API, so the tracking code does not change. Exports are
+        created on first use and reused from export_dir afterwards. With int8 the
+        exported model is quantized on calibration_frames frames of calibration
+        (a directory of images or a video of our own courts).
+        """
+        self.weights = weights
+        self.imgsz = imgsz
+        self.int8 = int8
+        self.calibration = calibration
+        self.calibration_frames = calibration_frames
+        self.export_dir = export_dir
+
+    @property
+    def stem(self):
+        return os.path.splitext(os.path.basename(self.weights))[0]
+
+    @property
+    def label(self):
+        return f"{self.name}-int8" if self.int8 else self.name
+
+    def model_path(self):
+        """File or directory YOLO() loads for this backend"""
+        raise NotImplementedError
+
+    def export(self):
+        """Create the model at model_path()"""
+        raise NotImplementedError
+
+    def prepare(self):
+        """Export the model unless it exists, return model_path()"""
+        path = self.model_path()
+        if not os.path.exists(path):
+            print(f"📦 Exporting {self.weights} for {self.label} to {path}...")
+            self.export()
+        return path
+
+    def load_calibration(self):
+        """Calibration frames as network inputs (FileNotFoundError if there are none)"""
+        frames = load_calibration_frames(self.calibration, self.calibration_frames)
+        if not frames:
+            raise FileNotFoundError(f"No calibration frames found in {self.calibration}")
+        print(f"📏 Calibrating int8 on {len(frames)} frames from {self.calibration}")
+        return [to_network_input(frame, self.imgsz) for frame in frames]
+
+    def export_with_ultralytics(self, export_format):
+        """Export the FP32 model with ultralytics (dynamic input size for ROI tiles and batches), return its path"""
+        from ultralytics import YOLO
+
+        os.makedirs(self.export_dir, exist_ok=True)
+        exported = YOLO(self.weights).export(format=export_format, imgsz=self.imgsz, dynamic=True)
+        return str(exported)
+
+    @staticmethod
+    def move_export(exported, target):
+        """Move an ultralytics export (written next to the weights) into export_dir"""
+        if os.path.abspath(exported) != os.path.abspath(target):
+            shutil.move(exported, target)
+
+
+class TorchBackend(DetectorBackend):
+    """The PyTorch weights as they are (int8 is not supported on this path)"""
+    name = 'torch'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.int8:
+            print("⚠️ int8 is not available for the torch backend, using FP32")
+            self.int8 = False
+
+    def model_path(self):
+        return self.weights
+
+    def prepare(self):
+        return self.weights  # ultralytics downloads missing official weights itself
+
+
+class ONNXBackend(DetectorBackend):
+    """ONNX Runtime (CPUExecutionProvider); int8 via static QDQ quantization"""
+    name = 'onnx'
+
+    def model_path(self):
+        suffix = '_int8' if self.int8 else ''
+        return os.path.join(self.export_dir, f"{self.stem}{suffix}.onnx")
+
+    def fp32_path(self):
+        return os.path.join(self.export_dir, f"{self.stem}.onnx")
+
+    def export(self):
+        if not os.path.exists(self.fp32_path()):
+            self.move_export(self.export_with_ultralytics('onnx'), self.fp32_path())
+        if self.int8:
+            self.quantize(self.fp32_path(), self.model_path())
+
+    def quantize(self, source_path, target_path):
+        """Static int8 quantization calibrated on our frames; keeps the metadata ultralytics reads"""
+        import onnx
+        from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+
+        class FrameReader(CalibrationDataReader):
+            def __init__(self, inputs, input_name):
+                self.batches = iter([{input_name: batch} for batch in inputs])
+
+            def get_next(self):
+                return next(self.batches, None)
+
+        source = onnx.load(source_path)
+        reader = FrameReader(self.load_calibration(), source.graph.input[0].name)
+        quantize_static(source_path, target_path, reader, quant_format=QuantFormat.QDQ,
+                        activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8, per_channel=True)
+
+        # Class names, stride and imgsz live in the model metadata
+        quantized = onnx.load(target_path)
+        del quantized.metadata_props[:]
+        quantized.metadata_props.extend(source.metadata_props)
+        onnx.save(quantized, target_path)
+
+
+class OpenVINOBackend(DetectorBackend):
+    """OpenVINO IR on the CPU plugin; int8 via NNCF post-training quantization"""
+    name = 'openvino'
+
+    def model_path(self):
+        suffix = '_int8' if self.int8 else ''
+        return os.path.join(self.export_dir, f"{self.stem}{suffix}_openvino_model")
+
+    def fp32_path(self):
+        return os.path.join(self.export_dir, f"{self.stem}_openvino_model")
+
+    def export(self):
+        if not os.path.exists(self.fp32_path()):
+            self.move_export(self.export_with_ultralytics('openvino'), self.fp32_path())
+        if self.int8:
+            self.quantize(self.fp32_path(), self.model_path())
+
+    def quantize(self, source_dir, target_dir):
+        """NNCF int8 quantization calibrated on our frames, saved in the same layout as the FP32 export"""
+        import nncf
+        import openvino.runtime as ov
+
+        xml_path = os.path.join(source_dir, f"{self.stem}.xml")
+        model = ov.Core().read_model(xml_path)
+        # Keep the box decoding and class sigmoids of the detection head in FP32 (large accuracy loss in int8)
+        ignored = nncf.IgnoredScope(types=['Multiply', 'Subtract', 'Sigmoid'])
+        quantized = nncf.quantize(model, nncf.Dataset(self.load_calibration()), preset=nncf.QuantizationPreset.MIXED,
+                                  ignored_scope=ignored)
+
+        os.makedirs(target_dir, exist_ok=True)
+        ov.serialize(quantized, os.path.join(target_dir, f"{self.stem}.xml"))
+        shutil.copy(os.path.join(source_dir, 'metadata.yaml'), os.path.join(target_dir, 'metadata.yaml'))
+
+
+BACKENDS = {
+    'torch': TorchBackend,
+    'onnx': ONNXBackend,
+    'openvino': OpenVINOBackend
+}
+
+
+def create_backend(backend='torch', **kwargs):
+    """DetectorBackend by name ('torch', 'onnx' or 'openvino')"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown detector backend '{backend}', expected one of {sorted(BACKENDS)}")
+    return BACKENDS[backend](**kwargs)
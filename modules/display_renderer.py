@@ -0,0 +1,194 @@
+import os
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from .stage_timer import StageTimer
+
+
+def display_available():
+    """False on a Linux box without an X11/Wayland display (servers, containers)"""
+    if sys.platform.startswith('linux'):
+        return bool(os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+    return True
+
+
+class StaticLayer:
+    def __init__(self, tile=16):
+        """Pre-rendered overlay parts that only change with their key (e.g. the boundary and panel boxes).
+
+        The layer is drawn once on two blank canvases (black and white); pixels
+        that differ from the canvas color in either one were drawn, which also
+        catches black fills. Runs of fully drawn tile x tile blocks (panel boxes)
+        are copied as slices, the remaining drawn pixels (lines, text) by index,
+        so applying the layer costs about as much as its drawn area.
+        """
+        self.tile = tile
+        self.key = None
+        self.blocks = []  # (rows slice, cols slice, pixels) of fully drawn tile runs
+        self.indices = self.values = None  # Drawn pixels outside the blocks (flat index, 3-byte pixel)
+        self.renders = 0
+
+    def update(self, key, shape, draw_fn):
+        """Redraw the layer with draw_fn(canvas) if the key or frame shape changed"""
+        key = (shape, key)
+        if key == self.key:
+            return
+        black = np.zeros(shape, dtype=np.uint8)
+        white = np.full(shape, 255, dtype=np.uint8)
+        draw_fn(black)
+        draw_fn(white)
+        mask = black.any(axis=2) | (white != 255).any(axis=2)
+
+        self.key = key
+        self.renders += 1
+        self.blocks = []
+        tile = self.tile
+        height, width = mask.shape
+        rows, cols = height // tile, width // tile
+        full = mask[:rows * tile, :cols * tile].reshape(rows, tile, cols, tile).all(axis=(1, 3))
+        for row in np.flatnonzero(full.any(axis=1)):
+            # Runs of consecutive full tiles in this tile row
+            edges = np.diff(np.concatenate(([0], full[row].astype(np.int8), [0])))
+            for first, last in zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)):
+                block = (slice(row * tile, (row + 1) * tile), slice(first * tile, last * tile))
+                self.blocks.append(block + (black[block].copy(),))
+                mask[block] = False
+        self.indices = np.flatnonzero(mask)
+        self.values = np.ascontiguousarray(black.reshape(-1, shape[2])[self.indices]).view(f'V{shape[2]}').ravel()
+
+    def apply(self, frame):
+        """Copy the drawn pixels onto frame"""
+        for rows, cols, pixels in self.blocks:
+            frame[rows, cols] = pixels
+        if self.indices is not None and len(self.indices):
+            if frame.flags.c_contiguous:
+                # One 3-byte element per pixel: a single put instead of per-channel fancy indexing
+                np.put(frame.reshape(-1).view(self.values.dtype), self.indices, self.values)
+            else:
+                rows, cols = np.divmod(self.indices, frame.shape[1])
+                frame[rows, cols] = self.values.view(np.uint8).reshape(-1, frame.shape[2])
+        return frame
+
+
+class DisplayRenderer:
+    def __init__(self, draw_static, draw_dynamic, window_name='Player Tracking', refresh_hz=60, enabled=True,
+                 timer=None):
+        """Composites and shows annotated frames, decoupled from the analysis loop.
+
+        draw_static(canvas) draws the parts that only change with overlay['static_key']
+        (cached in a StaticLayer); draw_dynamic(frame, overlay) draws the per-frame
+        annotations from track metadata. The analysis loop submit()s its clean
+        frame with the overlay and moves on; run() drives the window on the
+        calling (main) thread at up to refresh_hz, showing the latest submitted
+        frame and skipping ones that were superseded before they were shown.
+        Without an attached window (disabled or no display) nothing is composited
+        or shown and the analysis runs directly.
+        """
+        self.draw_static = draw_static
+        self.draw_dynamic = draw_dynamic
+        self.window_name = window_name
+        self.refresh_interval = 1.0 / refresh_hz
+        self.attached = enabled and display_available()
+        self.timer = timer or StageTimer()
+
+        self.static = StaticLayer()
+        self.condition = threading.Condition()
+        self.pending = None  # Latest (frame, overlay) not shown yet
+        self.quit_requested = False
+        self.submitted = 0
+        self.shown = 0
+        self.skipped = 0
+
+    @property
+    def keep_running(self):
+        """False once 'q' was pressed in the window"""
+        return not self.quit_requested
+
+    def compose(self, frame, overlay):
+        """Draw the static layer and the frame's dynamic annotations onto frame"""
+        self.static.update(overlay['static_key'], frame.shape, self.draw_static)
+        self.static.apply(frame)
+        self.draw_dynamic(frame, overlay)
+        return frame
+
+    def submit(self, frame, overlay):
+        """Hand a frame to the display (the renderer owns it from now on); no-op without a window"""
+        if not self.attached:
+            return
+        with self.condition:
+            if self.pending is not None:
+                self.skipped += 1
+            self.pending = (frame, overlay)
+            self.submitted += 1
+            self.condition.notify()
+
+    def _take(self, timeout):
+        """Latest submitted frame, waiting up to timeout for one (None if there is none)"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.pending is not None, timeout=timeout)
+            item, self.pending = self.pending, None
+        return item
+
+    def run(self, work_fn):
+        """Run work_fn() (the analysis loop) on a worker thread while this thread drives the window"""
+        if not self.attached:
+            work_fn()
+            return
+
+        errors = []
+
+        def work():
+            try:
+                work_fn()
+            except BaseException as e:
+                errors.append(e)
+
+        worker = threading.Thread(target=work, name='analysis', daemon=True)
+        worker.start()
+        try:
+            self._display_loop(worker)
+        finally:
+            # Window closed with 'q' or this thread interrupted: the analysis loop stops too
+            self.quit_requested = True
+            worker.join()
+            cv2.destroyWindow(self.window_name)
+        if errors:
+            raise errors[0]
+
+    def _display_loop(self, worker):
+        """Show the latest frame at most every refresh interval until the worker ends or 'q' is pressed"""
+        cv2.namedWindow(self.window_name, cv2.WINDOW_NORMAL)
+        next_show = time.monotonic()
+        while True:
+            # waitKey both paces the loop and keeps the window responsive
+            delay_ms = max(1, int(1000 * (next_show - time.monotonic())))
+            if cv2.waitKey(delay_ms) & 0xFF == ord('q'):
+                self.quit_requested = True
+                return
+
+            item = self._take(self.refresh_interval)
+            if item is None:
+                if not worker.is_alive():
+                    return
+                continue
+
+            frame, overlay = item
+            with self.timer.stage('draw'):
+                self.compose(frame, overlay)
+            with self.timer.stage('display'):
+                cv2.imshow(self.window_name, frame)
+            self.timer.end_frame()
+            self.shown += 1
+            next_show = time.monotonic() + self.refresh_interval
+
+    def get_stats(self):
+        return {
+            'submitted': self.submitted,
+            'shown': self.shown,
+            'skipped': self.skipped,
+            'static_renders': self.static.renders
+        }
@@ -0,0 +1,333 @@
+import base64
+import hashlib
+import itertools
+import json
+import os
+import queue
+import socket
+import threading
+import time
+
+# Magic GUID of the WebSocket opening handshake (RFC 6455)
+WEBSOCKET_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+
+class JSONLSink:
+    def __init__(self, path):
+        """Append every event as one JSON line (flushed per event so tail -f sees it at once)"""
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(path, 'a')
+
+    def emit(self, line):
+        self.file.write(line + "\n")
+        self.file.flush()
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.file.close()
+
+
+class _Client:
+    def __init__(self, conn, address):
+        """Connected subscriber with the bytes not yet accepted by its socket"""
+        self.conn = conn
+        self.address = address
+        self.outbox = bytearray()
+
+
+class BroadcastSink:
+    kind = 'socket'
+
+    def __init__(self, address, client_buffer=1 << 20):
+        """Push events to every connected client of a local server socket, newline-delimited JSON.
+
+        address is a Unix socket path or a (host, port) tuple. Clients are
+        written with non-blocking sends; whatever a client does not accept yet
+        waits in its outbox, and a client whose outbox grows beyond
+        client_buffer bytes is disconnected instead of slowing anyone down.
+        """
+        self.address = address
+        self.client_buffer = client_buffer
+        self.clients = []
+        self.lock = threading.Lock()
+        self.disconnected_slow = 0
+        self.closed = False
+
+        if isinstance(address, str):
+            if os.path.exists(address):
+                os.unlink(address)  # Stale socket of an earlier run
+            self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(address)
+        self.server.listen(16)
+        self.server.settimeout(0.5)
+        self.accept_thread = threading.Thread(target=self._accept_loop, name='event-accept', daemon=True)
+        self.accept_thread.start()
+        print(f"📡 Event {self.kind} server listening on {self.describe()}")
+
+    def describe(self):
+        if isinstance(self.address, str):
+            return self.address
+        return f"{self.address[0]}:{self.server.getsockname()[1]}"
+
+    def handshake(self, conn):
+        """Protocol handshake of a new client, False to reject it (plain sockets have none)"""
+        return True
+
+    def encode(self, line):
+        return line.encode('utf-8') + b"\n"
+
+    def _accept_loop(self):
+        """Accept clients; each handshake runs on its own short-lived thread, never on the publishing path"""
+        while not self.closed:
+            try:
+                conn, address = self.server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            # A slow or idle client only holds up its own handshake, not other subscribers
+            threading.Thread(target=self._admit, args=(conn, address), name='event-handshake', daemon=True).start()
+
+    def _admit(self, conn, address):
+        """Handshake with a new client and add it to the subscribers (rejected after 2 s without an answer)"""
+        try:
+            conn.settimeout(2.0)
+            if not self.handshake(conn):
+                conn.close()
+                return
+            conn.setblocking(False)
+        except OSError:
+            conn.close()
+            return
+        with self.lock:
+            if self.closed:
+                conn.close()
+                return
+            self.clients.append(_Client(conn, address))
+
+    def _send(self, client):
+        """Send as much of the client's outbox as its socket takes, False if the client is gone"""
+        try:
+            while client.outbox:
+                sent = client.conn.send(client.outbox)
+                del client.outbox[:sent]
+        except (BlockingIOError, InterruptedError):
+            pass
+        except OSError:
+            return False
+        return True
+
+    def _broadcast(self, data):
+        with self.lock:
+            clients = list(self.clients)
+        dropped = []
+        for client in clients:
+            if data:
+                client.outbox += data
+            if len(client.outbox) > self.client_buffer:
+                self.disconnected_slow += 1
+                print(f"⚠️ Event client {client.address or 'local'} too slow - disconnected")
+                dropped.append(client)
+            elif not self._send(client):
+                dropped.append(client)
+        if dropped:
+            with self.lock:
+                self.clients = [client for client in self.clients if client not in dropped]
+            for client in dropped:
+                client.conn.close()
+
+    def emit(self, line):
+        self._broadcast(self.encode(line))
+
+    def flush(self):
+        """Retry pending outboxes (called when no events arrive)"""
+        self._broadcast(b"")
+
+    def close(self):
+        self.closed = True
+        self.server.close()
+        self.accept_thread.join()
+        with self.lock:
+            for client in self.clients:
+                client.conn.close()
+            self.clients = []
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+
+
+class WebSocketSink(BroadcastSink):
+    """Push server for browsers/tablets: minimal RFC 6455 server sending every event as a text frame"""
+    kind = 'WebSocket'
+
+    def handshake(self, conn):
+        """Answer a valid opening handshake (GET upgrade to WebSocket version 13) with 101, reject anything else"""
+        request = b""
+        while b"\r\n\r\n" not in request:
+            chunk = conn.recv(4096)
+            if not chunk or len(request) > 16384:
+                return False
+            request += chunk
+        head, _, rest = request.partition(b"\r\n\r\n")
+        lines = head.decode('latin-1').split("\r\n")
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        request_line = lines[0].split(' ')
+        method, version = (request_line[0], request_line[2]) if len(request_line) == 3 else ('', '')
+        upgrade = headers.get('upgrade', '').lower() == 'websocket' and \
+            'upgrade' in [token.strip().lower() for token in headers.get('connection', '').split(',')]
+        key = headers.get('sec-websocket-key', '')
+        try:
+            valid_key = len(base64.b64decode(key, validate=True)) == 16
+        except ValueError:
+            valid_key = False
+        # Nothing may follow the request before the server switched protocols
+        if method != 'GET' or version != 'HTTP/1.1' or not upgrade or not valid_key or rest:
+            conn.sendall(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+            return False
+        if headers.get('sec-websocket-version') != '13':
+            conn.sendall(b"HTTP/1.1 426 Upgrade Required\r\nSec-WebSocket-Version: 13\r\n"
+                         b"Content-Length: 0\r\n\r\n")
+            return False
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode('ascii')).digest()).decode('ascii')
+        conn.sendall(("HTTP/1.1 101 Switching Protocols\r\n"
+                      "Upgrade: websocket\r\n"
+                      "Connection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode('ascii'))
+        return True
+
+    def encode(self, line):
+        """Unmasked, unfragmented text frame (server-to-client frames are never masked)"""
+        payload = line.encode('utf-8')
+        length = len(payload)
+        if length < 126:
+            header = bytes([0x81, length])
+        elif length < 1 << 16:
+            header = bytes([0x81, 126]) + length.to_bytes(2, 'big')
+        else:
+            header = bytes([0x81, 127]) + length.to_bytes(8, 'big')
+        return header + payload
+
+
+class _SinkWorker:
+    def __init__(self, sink, queue_size):
+        """Thread feeding one sink from its own bounded queue (a slow sink only delays itself)"""
+        self.sink = sink
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.thread = threading.Thread(target=self._run, name=f'event-{type(sink).__name__}', daemon=True)
+        self.thread.start()
+
+    def offer(self, line):
+        """Queue an event without waiting, dropping it when the sink is behind"""
+        try:
+            self.queue.put_nowait(line)
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped % 100 == 1:
+                print(f"⚠️ {type(self.sink).__name__} behind - dropped {self.dropped} events so far")
+
+    def _run(self):
+        while True:
+            try:
+                line = self.queue.get(timeout=0.1)
+            except queue.Empty:
+                self.sink.flush()
+                continue
+            if line is None:
+                break
+            try:
+                self.sink.emit(line)
+            except Exception as e:
+                print(f"❌ Event sink error ({type(self.sink).__name__}): {e}")
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+        self.sink.close()
+
+
+class EventBus:
+    def __init__(self, sinks=(), queue_size=1024, fields=None):
+        """In-process publisher of structured tracking events to pluggable sinks.
+
+        publish() stamps an event with a sequence number and wall-clock time,
+        serializes it once and offers it to every sink's bounded queue without
+        waiting; each sink runs on its own thread, and events for a sink that
+        falls behind are dropped (and counted) rather than stalling tracking.
+        With no sinks, publish() returns at once. fields are added to every
+        event (e.g. the stream name).
+        """
+        self.workers = [_SinkWorker(sink, queue_size) for sink in sinks]
+        self.fields = dict(fields or {})
+        self.sequence = itertools.count(1)
+        self.published = 0
+        self.closed = False
+
+    @property
+    def enabled(self):
+        return bool(self.workers) and not self.closed
+
+    def add_sink(self, sink, queue_size=1024):
+        self.workers.append(_SinkWorker(sink, queue_size))
+
+    def publish(self, event_type, **fields):
+        """Send an event {'type', 'seq', 'time', **fields} to every sink (thread-safe, never blocks)"""
+        if not self.enabled:
+            return
+        event = {'type': event_type, 'seq': next(self.sequence), 'time': round(time.time(), 3)}
+        event.update(self.fields)
+        event.update(fields)
+        line = json.dumps(event, default=str)
+        self.published += 1
+        for worker in self.workers:
+            worker.offer(line)
+
+    def get_stats(self):
+        return {
+            'published': self.published,
+            'dropped': {type(worker.sink).__name__: worker.dropped for worker in self.workers},
+            'slow_clients_disconnected': sum(getattr(worker.sink, 'disconnected_slow', 0) for worker in self.workers)
+        }
+
+    def close(self):
+        """Deliver queued events and close every sink"""
+        if self.closed:
+            return
+        self.closed = True
+        for worker in self.workers:
+            worker.close()
+
+
+def parse_socket_address(address):
+    """'tcp://host:port' or 'host:port' -> (host, port), anything else is a Unix socket path"""
+    if address.startswith('tcp://'):
+        address = address[len('tcp://'):]
+    elif address.startswith('unix://'):
+        return address[len('unix://'):]
+    host, separator, port = address.rpartition(':')
+    if separator and port.isdigit():
+        return (host or '127.0.0.1', int(port))
+    return address
+
+
+def create_event_bus(jsonl_path=None, socket_address=None, websocket_port=None, websocket_host='127.0.0.1',
+                     queue_size=1024, client_buffer=1 << 20):
+    """EventBus with the configured sinks (an empty, free bus when none is configured)"""
+    sinks = []
+    if jsonl_path:
+        sinks.append(JSONLSink(jsonl_path))
+    if socket_address:
+        sinks.append(BroadcastSink(parse_socket_address(socket_address), client_buffer=client_buffer))
+    if websocket_port is not None:
+        sinks.append(WebSocketSink((websocket_host, websocket_port), client_buffer=client_buffer))
+    return EventBus(sinks, queue_size=queue_size)
@@ -0,0 +1,182 @@
+import queue
+import threading
+
+import cv2
+
+# Queue policies when the writer falls behind
+BLOCK = 'block'  # Tracking loop waits for space in the queue
+DROP = 'drop'    # Streamed clip frames are dropped (screenshots and clip open/close never are)
+
+
+class EvidenceWriter:
+    def __init__(self, frame_ring, codec='mp4v', fps=30.0, jpeg_quality=95,
+                 queue_size=32, drop_policy=BLOCK, asynchronous=True, annotate=None,
+                 on_saved=None, max_clip_frames=None):
+        """Write violation screenshots and clips from the shared frame ring.
+
+        Clips are opened when a violation starts and frames are streamed to the
+        file as they arrive. A clip takes at most max_clip_frames frames after
+        its pre-roll (None: no limit); later frames are not written. With
+        asynchronous=True, JPEG/video encoding happens on a background thread
+        fed by a bounded queue. Every frame handed to the
+        writer is pinned in the ring until it has been written. With
+        annotate(frame, meta), frames pushed with metadata are annotated on a copy
+        just before they are written, so only frames that become evidence are drawn.
+        on_saved(kind, tag, path, frames) is called (on the writer thread) once a
+        'screenshot' or 'clip' is on disk; tag is the screenshot tag or clip_id.
+        """
+        if drop_policy not in (BLOCK, DROP):
+            raise ValueError(f"Unknown evidence drop policy: {drop_policy}")
+
+        self.frame_ring = frame_ring
+        self.fourcc = cv2.VideoWriter_fourcc(*codec)
+        self.fps = fps
+        self.jpeg_quality = jpeg_quality
+        self.drop_policy = drop_policy
+        self.asynchronous = asynchronous
+        self.annotate = annotate
+        self.on_saved = on_saved
+        self.max_clip_frames = max_clip_frames
+
+        self.clips = {}  # clip_id: {'path', 'writer', 'frames'}, only touched by the writer thread
+        self.streamed = {}  # clip_id: {'path', 'frames' after the pre-roll, 'cut' by the cap}, only touched by the caller
+        self.dropped_frames = 0
+        self.jobs = queue.Queue(maxsize=queue_size)
+        self.thread = None
+        if asynchronous:
+            self.thread = threading.Thread(target=self._run, name='evidence-writer', daemon=True)
+            self.thread.start()
+
+    def _submit(self, job, droppable=False):
+        """Hand a job to the writer thread (or run it inline when synchronous)"""
+        if not self.asynchronous:
+            self._execute(job)
+            return True
+
+        if droppable and self.drop_policy == DROP:
+            try:
+                self.jobs.put_nowait(job)
+                return True
+            except queue.Full:
+                self.dropped_frames += 1
+                if self.dropped_frames % 30 == 1:
+                    print(f"⚠️ Evidence writer behind - dropped {self.dropped_frames} clip frames so far")
+                return False
+
+        self.jobs.put(job)
+        return True
+
+    def save_screenshot(self, path, frame_index, tag=None):
+        """Encode and save the ring frame as a JPEG screenshot"""
+        self.frame_ring.pin(frame_index)
+        self._submit(('screenshot', path, frame_index, tag))
+
+    def open_clip(self, clip_id, path, first_index, last_index):
+        """Start a clip with the ring frames first_index..last_index (pre-roll + current frame)"""
+        self.streamed[clip_id] = {'path': path, 'frames': 1, 'cut': 0}
+        self.frame_ring.pin(first_index, last_index)
+        self._submit(('open', clip_id, path))
+        self._submit(('frames', clip_id, first_index, last_index))
+
+    def append_frame(self, clip_id, frame_index):
+        """Stream one more ring frame to an open clip, return False if it was dropped or the clip is full"""
+        clip = self.streamed.get(clip_id)
+        if clip is None:
+            return False
+        if self.max_clip_frames is not None and clip['frames'] >= self.max_clip_frames:
+            clip['cut'] += 1
+            return False
+        self.frame_ring.pin(frame_index)
+        if not self._submit(('frames', clip_id, frame_index, frame_index), droppable=True):
+            self.frame_ring.unpin(frame_index)
+            return False
+        clip['frames'] += 1
+        return True
+
+    def close_clip(self, clip_id):
+        """Finish a clip once all its queued frames are written"""
+        clip = self.streamed.pop(clip_id, None)
+        if clip is not None and clip['cut']:
+            print(f"✂️ {clip['path']} capped at {self.max_clip_frames} frames after the pre-roll "
+                  f"({clip['cut']} later frames not written)")
+        self._submit(('close', clip_id))
+
+    def _frame(self, index):
+        """Ring frame as written: annotated from its metadata if there is an annotate function"""
+        frame = self.frame_ring.get(index)
+        if self.annotate is None:
+            return frame
+        meta = self.frame_ring.get_meta(index)
+        if meta is None:
+            return frame
+        return self.annotate(frame if self.frame_ring.returns_copies else frame.copy(), meta)
+
+    def _execute(self, job):
+        """Run one job on the writer thread"""
+        kind = job[0]
+        if kind == 'screenshot':
+            _, path, frame_index, tag = job
+            try:
+                cv2.imwrite(path, self._frame(frame_index), [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+                print(f"📸 Screenshot saved: {path}")
+            finally:
+                self.frame_ring.unpin(frame_index)
+            if self.on_saved is not None:
+                self.on_saved('screenshot', tag, path, 1)
+
+        elif kind == 'open':
+            _, clip_id, path = job
+            self.clips[clip_id] = {'path': path, 'writer': None, 'frames': 0}
+
+        elif kind == 'frames':
+            _, clip_id, first_index, last_index = job
+            clip = self.clips.get(clip_id)
+            next_index = first_index
+            try:
+                if clip is not None:
+                    for index in range(first_index, last_index + 1):
+                        frame = self._frame(index)
+                        if clip['writer'] is None:
+                            h, w = frame.shape[:2]
+                            clip['writer'] = cv2.VideoWriter(clip['path'], self.fourcc, self.fps, (w, h))
+                        clip['writer'].write(frame)
+                        clip['frames'] += 1
+                        # Release each written frame at once, so a long pre-roll does not hold the ring
+                        self.frame_ring.unpin(index)
+                        next_index = index + 1
+            finally:
+                if next_index <= last_index:
+                    self.frame_ring.unpin(next_index, last_index)
+
+        elif kind == 'close':
+            _, clip_id = job
+            clip = self.clips.pop(clip_id, None)
+            if clip is not None and clip['writer'] is not None:
+                clip['writer'].release()
+                duration = clip['frames'] / self.fps
+                print(f"🎥 Video saved: {clip['path']} ({duration:.1f}s, {clip['frames']} frames)")
+                if self.on_saved is not None:
+                    self.on_saved('clip', clip_id, clip['path'], clip['frames'])
+
+    def _run(self):
+        """Writer thread: execute jobs in order until close() sends None"""
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            try:
+                self._execute(job)
+            except Exception as e:
+                print(f"❌ Evidence writer error: {e}")
+
+    def close(self):
+        """Flush every queued job, finish open clips and stop the writer thread"""
+        if self.thread is not None:
+            self.jobs.put(None)
+            self.thread.join()
+            self.thread = None
+        for clip_id in list(self.clips):
+            self._execute(('close', clip_id))
+        if self.dropped_frames:
+            print(f"⚠️ Evidence writer dropped {self.dropped_frames} clip frames in total")
+
@@ -0,0 +1,163 @@
+import queue
+import threading
+import time
+
+# Marker passed down the queues when a stage has no more frames
+_END = object()
+
+
+class FramePipeline:
+    def __init__(self, decode_fn, analyze_fn, render_fn, queue_size=8, report_interval=120):
+        """Three-stage decode / analyze / render pipeline connected by bounded queues.
+
+        decode_fn() returns the next item or None at end of stream, analyze_fn(item)
+        returns the analyzed result and render_fn(result) returns False to stop.
+        Decode and analyze run on worker threads, render runs on the calling thread.
+        render_fn must not touch OpenCV windows itself: the tracker calls run()
+        from DisplayRenderer's worker thread and hands frames to the renderer,
+        which drives the window.
+        """
+        self.decode_fn = decode_fn
+        self.analyze_fn = analyze_fn
+        self.render_fn = render_fn
+        self.queue_size = queue_size
+        self.report_interval = report_interval
+
+        self.decoded_queue = queue.Queue(maxsize=queue_size)
+        self.analyzed_queue = queue.Queue(maxsize=queue_size)
+        self.stop_event = threading.Event()
+        self.errors = []
+
+        # Per-stage statistics
+        self.stage_names = ('decode', 'analyze', 'render')
+        self.busy_time = {name: 0.0 for name in self.stage_names}
+        self.depth_sum = {'decode->analyze': 0, 'analyze->render': 0}
+        self.depth_max = {'decode->analyze': 0, 'analyze->render': 0}
+        self.frames_rendered = 0
+        self.start_time = None
+
+    def _put(self, q, item):
+        """Put item on a bounded queue, giving up if the pipeline is stopping"""
+        while not self.stop_event.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q):
+        """Get next item from a queue, returning _END if the pipeline is stopping"""
+        while not self.stop_event.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _decode_loop(self):
+        """Decode stage: read frames and tag them with a sequence number"""
+        sequence = 0
+        try:
+            while not self.stop_event.is_set():
+                start = time.perf_counter()
+                item = self.decode_fn()
+                self.busy_time['decode'] += time.perf_counter() - start
+                if item is None:
+                    break
+                if not self._put(self.decoded_queue, (sequence, item)):
+                    return
+                sequence += 1
+        except Exception as e:
+            self.errors.append(e)
+        self._put(self.decoded_queue, _END)
+
+    def _analyze_loop(self):
+        """Analyze stage: run detection and tracking in decode order"""
+        try:
+            while True:
+                entry = self._get(self.decoded_queue)
+                if entry is _END:
+                    break
+                sequence, item = entry
+                start = time.perf_counter()
+                result = self.analyze_fn(item)
+                self.busy_time['analyze'] += time.perf_counter() - start
+                if not self._put(self.analyzed_queue, (sequence, result)):
+                    return
+        except Exception as e:
+            self.errors.append(e)
+        self._put(self.analyzed_queue, _END)
+
+    def _sample_queue_depths(self):
+        """Record current queue depths for the bottleneck report"""
+        for name, q in (('decode->analyze', self.decoded_queue), ('analyze->render', self.analyzed_queue)):
+            depth = q.qsize()
+            self.depth_sum[name] += depth
+            self.depth_max[name] = max(self.depth_max[name], depth)
+
+    def get_stats(self):
+        """Return average/max queue depth, per-stage busy time and throughput"""
+        frames = max(1, self.frames_rendered)
+        elapsed = time.perf_counter() - self.start_time if self.start_time else 0.0
+        return {
+            'frames': self.frames_rendered,
+            'fps': self.frames_rendered / elapsed if elapsed > 0 else 0.0,
+            'queue_avg': {name: total / frames for name, total in self.depth_sum.items()},
+            'queue_max': dict(self.depth_max),
+            'busy_ms_per_frame': {name: 1000.0 * t / frames for name, t in self.busy_time.items()},
+        }
+
+    def report(self):
+        """Print queue depths and the stage that is currently limiting throughput"""
+        stats = self.get_stats()
+        busy = stats['busy_ms_per_frame']
+        bottleneck = max(busy, key=busy.get)
+        queues = ", ".join(f"{name} avg {stats['queue_avg'][name]:.1f}/{self.queue_size} (max {stats['queue_max'][name]})"
+                           for name in self.depth_sum)
+        stages = ", ".join(f"{name} {busy[name]:.1f}ms" for name in self.stage_names)
+        print(f"📊 Pipeline @ {stats['frames']} frames: {stats['fps']:.1f} fps | queues: {queues} | "
+              f"busy/frame: {stages} | bottleneck: {bottleneck}")
+
+    def run(self):
+        """Run the pipeline until the stream ends or render_fn returns False"""
+        self.start_time = time.perf_counter()
+        workers = [
+            threading.Thread(target=self._decode_loop, name='pipeline-decode', daemon=True),
+            threading.Thread(target=self._analyze_loop, name='pipeline-analyze', daemon=True),
+        ]
+        for worker in workers:
+            worker.start()
+
+        expected_sequence = 0
+        try:
+            while True:
+                entry = self._get(self.analyzed_queue)
+                if entry is _END:
+                    break
+                sequence, result = entry
+                if sequence != expected_sequence:
+                    raise RuntimeError(f"Pipeline frame order broken: got {sequence}, expected {expected_sequence}")
+                expected_sequence += 1
+
+                self._sample_queue_depths()
+                start = time.perf_counter()
+                keep_going = self.render_fn(result)
+                self.busy_time['render'] += time.perf_counter() - start
+                self.frames_rendered += 1
+
+                if self.report_interval and self.frames_rendered % self.report_interval == 0:
+                    self.report()
+                if keep_going is False:
+                    break
+        finally:
+            self.stop_event.set()
+            for worker in workers:
+                worker.join()
+
+        if self.errors:
+            raise self.errors[0]
+
+        if not self.report_interval or self.frames_rendered % self.report_interval != 0:
+            self.report()
+        return self.get_stats()
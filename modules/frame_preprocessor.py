@@ -0,0 +1,117 @@
+import time
+
+import cv2
+import numpy as np
+
+# Resize interpolation by name (video_config.RESIZE_INTERPOLATION)
+INTERPOLATIONS = {
+    'area': cv2.INTER_AREA,      # Best quality for downscaling, slow for non-integer ratios
+    'linear': cv2.INTER_LINEAR,  # Several times faster, slight aliasing
+    'nearest': cv2.INTER_NEAREST
+}
+
+
+def scale_matrix(sx, sy=None, tx=0.0, ty=0.0):
+    """3x3 affine matrix scaling by (sx, sy) then translating by (tx, ty)"""
+    sy = sx if sy is None else sy
+    return np.array([[sx, 0.0, tx], [0.0, sy, ty], [0.0, 0.0, 1.0]], dtype=np.float64)
+
+
+def transform_points(matrix, points):
+    """Apply a 3x3 affine matrix to (N, 2) points, return float64 (N, 2)"""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    return points @ matrix[:2, :2].T + matrix[:2, 2]
+
+
+def transform_boxes(matrix, boxes):
+    """Apply a 3x3 affine (scale + translation) matrix to (N, 4) x1, y1, x2, y2 boxes"""
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    return transform_points(matrix, boxes.reshape(-1, 2)).reshape(-1, 4)
+
+
+class PreparedFrame:
+    def __init__(self, native, detector, display_size, native_to_display, native_to_detector, interpolation,
+                 display=None):
+        """One decoded frame, its detector image and the transforms between coordinate spaces.
+
+        Spaces: native (decoded frame), display (processing resolution where the
+        court lines are compiled and players are drawn) and detector (the image
+        handed to YOLO). Unless given, the display image is only resized on first access.
+        """
+        self.native = native
+        self.detector = detector
+        self.display_size = display_size  # (width, height)
+        self.native_to_display = native_to_display
+        self.native_to_detector = native_to_detector
+        self.detector_to_display = native_to_display @ np.linalg.inv(native_to_detector)
+        self.display_to_native = np.linalg.inv(native_to_display)
+        self.interpolation = interpolation
+        self.resize_seconds = 0.0
+        self._display = display
+
+    @property
+    def display_shape(self):
+        return (self.display_size[1], self.display_size[0], self.native.shape[2])
+
+    @property
+    def detector_imgsz(self):
+        return max(self.detector.shape[:2])
+
+    @property
+    def display(self):
+        """Display-resolution frame (resized from the native frame once, on demand)"""
+        if self._display is None:
+            start = time.perf_counter()
+            if self.display_size == (self.native.shape[1], self.native.shape[0]):
+                self._display = self.native
+            else:
+                self._display = cv2.resize(self.native, self.display_size, interpolation=self.interpolation)
+            self.resize_seconds += time.perf_counter() - start
+        return self._display
+
+
+class FramePreprocessor:
+    def __init__(self, display_width=1280, detector_imgsz=640, interpolation=cv2.INTER_AREA):
+        """Single-resize preprocessing: the detector image is downscaled exactly once,
+        from the decoded frame to detector_imgsz on its long side, so YOLO's
+        letterbox only pads it.
+
+        The display frame is resized separately when it is needed (shown or
+        recorded); otherwise it is never resized unless something asks for it.
+        """
+        self.display_width = display_width
+        self.detector_imgsz = detector_imgsz
+        self.interpolation = interpolation
+        self.frames = 0
+        self.resize_seconds = 0.0
+        self.resized_pixels = 0  # Source pixels read by resizes
+
+    def _resize(self, image, size):
+        """Resize (or pass through) an image and account for the work"""
+        if size == (image.shape[1], image.shape[0]):
+            return image
+        self.resized_pixels += image.shape[0] * image.shape[1]
+        return cv2.resize(image, size, interpolation=self.interpolation)
+
+    def prepare(self, frame, need_display=True):
+        """Build the PreparedFrame of a decoded frame"""
+        start = time.perf_counter()
+        height, width = frame.shape[:2]
+        display_scale = self.display_width / float(width)
+        display_size = (self.display_width, int(height * display_scale))
+        native_to_display = scale_matrix(display_scale)
+
+        detector_scale = self.detector_imgsz / float(max(height, width))
+        detector_size = (max(1, round(width * detector_scale)), max(1, round(height * detector_scale)))
+
+        detector = self._resize(frame, detector_size)
+        display = self._resize(frame, display_size) if need_display else None
+
+        # Per-axis scales of the actual (rounded) sizes keep the transforms exact
+        native_to_detector = scale_matrix(detector_size[0] / float(width), detector_size[1] / float(height))
+        prepared = PreparedFrame(frame, detector, display_size, native_to_display, native_to_detector,
+                                 self.interpolation, display)
+
+        self.resize_seconds += time.perf_counter() - start
+        self.frames += 1
+        return prepared
@@ -0,0 +1,251 @@
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+
+# Encoded frame formats of EncodedFrameRing: (file extension, quality parameter, valid range)
+ENCODINGS = {
+    'jpeg': ('.jpg', cv2.IMWRITE_JPEG_QUALITY, (0, 100)),
+    'png': ('.png', cv2.IMWRITE_PNG_COMPRESSION, (0, 9))
+}
+
+
+class FrameRing:
+    returns_copies = False  # get() returns a view into the ring
+
+    def __init__(self, capacity, overrun_timeout=5.0):
+        """Preallocated ring of frames shared by the pre-roll buffer and all violation clips.
+
+        Frames are addressed by a global, ever-increasing frame index and may carry
+        metadata (e.g. the overlay to draw when the frame becomes evidence). Violation
+        records pin the index ranges they still need, and a pinned slot is never
+        overwritten: push() waits up to overrun_timeout seconds for a background
+        writer to release the slot before giving up.
+        """
+        self.capacity = capacity
+        self.frames = None  # (capacity, h, w, 3) array, allocated on first push
+        self.slot_index = np.full(capacity, -1, dtype=np.int64)  # Frame index held by each slot
+        self.pins = np.zeros(capacity, dtype=np.int32)  # Pin count per slot
+        self.meta = [None] * capacity  # Metadata pushed with each slot's frame
+        self.next_index = 0
+        self.overrun_timeout = overrun_timeout
+        self.condition = threading.Condition()
+
+    @property
+    def latest_index(self):
+        """Index of the most recently pushed frame (-1 if empty)"""
+        return self.next_index - 1
+
+    @property
+    def oldest_index(self):
+        """Oldest frame index still held by the ring"""
+        return max(0, self.next_index - self.capacity)
+
+    def _allocate(self, frame):
+        """Allocate storage for frames shaped like the given one"""
+        if self.frames is not None and self.pins.any():
+            raise BufferError("frame size changed while frames are pinned")
+        self.frames = np.empty((self.capacity,) + frame.shape, dtype=frame.dtype)
+        self.slot_index.fill(-1)
+        print(f"🎞️ Frame ring allocated: {self.capacity} x {frame.shape} "
+              f"({self.frames.nbytes / (1024 * 1024):.0f} MB)")
+
+    def push(self, frame, meta=None):
+        """Copy frame (and keep meta) into the next slot and return its frame index"""
+        if self.frames is None or self.frames.shape[1:] != frame.shape or self.frames.dtype != frame.dtype:
+            self._allocate(frame)
+
+        slot = self.next_index % self.capacity
+        with self.condition:
+            # Backpressure: wait for the evidence writer to release the oldest slot
+            if not self.condition.wait_for(lambda: self.pins[slot] == 0, timeout=self.overrun_timeout):
+                raise BufferError(f"frame ring overrun: frame {self.slot_index[slot]} is still pinned")
+
+            np.copyto(self.frames[slot], frame)
+            self.meta[slot] = meta
+            self.slot_index[slot] = self.next_index
+            self.next_index += 1
+            return self.next_index - 1
+
+    def contains(self, index):
+        """True if the frame with this index is still held by the ring"""
+        return 0 <= index and self.slot_index[index % self.capacity] == index
+
+    def get(self, index):
+        """Return a view of the stored frame (valid while pinned or until overwritten)"""
+        if not self.contains(index):
+            raise IndexError(f"frame {index} is no longer in the ring")
+        return self.frames[index % self.capacity]
+
+    def get_meta(self, index):
+        """Metadata pushed with the frame (same lifetime as get())"""
+        if not self.contains(index):
+            raise IndexError(f"frame {index} is no longer in the ring")
+        return self.meta[index % self.capacity]
+
+    def pin(self, first, last=None):
+        """Keep frames first..last (inclusive) from being overwritten"""
+        last = first if last is None else last
+        if last - first + 1 > self.capacity:
+            raise BufferError(f"cannot pin {last - first + 1} frames in a ring of {self.capacity}")
+        with self.condition:
+            self.pins[np.arange(first, last + 1) % self.capacity] += 1
+
+    def unpin(self, first, last=None):
+        """Release frames first..last (inclusive) pinned earlier"""
+        last = first if last is None else last
+        with self.condition:
+            self.pins[np.arange(first, last + 1) % self.capacity] -= 1
+            self.condition.notify_all()
+
+    def iter_frames(self, first, last):
+        """Yield stored frames first..last (inclusive) in order"""
+        for index in range(first, last + 1):
+            yield self.get(index)
+
+    def get_stats(self):
+        size = 0 if self.frames is None else self.frames.nbytes
+        return {'format': 'raw', 'frames': min(self.next_index, self.capacity), 'resident_mb': size / (1024 * 1024)}
+
+    def close(self):
+        pass
+
+
+class EncodedFrameRing(FrameRing):
+    returns_copies = True  # get() decodes into a new array
+
+    def __init__(self, capacity, encoding='jpeg', quality=90, png_compression=1, staging=8, threads=1,
+                 overrun_timeout=5.0):
+        """FrameRing that keeps its frames JPEG/PNG-encoded, for long pre-roll windows.
+
+        push() only copies the frame into one of staging raw buffers; encoder
+        threads compress it into the frame's slot and free the buffer (push waits
+        for a free one if encoding falls behind). get() decodes the frame, waiting
+        for its encoding if needed, so frames are only decoded when they are
+        written as evidence. quality is the JPEG quality (0-100), png_compression
+        the PNG compression level (0-9, low levels are much faster to encode).
+        """
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown frame ring encoding '{encoding}', expected one of {sorted(ENCODINGS)}")
+        self.extension, quality_flag, (low, high) = ENCODINGS[encoding]
+        value = png_compression if encoding == 'png' else quality
+        if not low <= value <= high:
+            raise ValueError(f"{encoding.upper()} frame ring setting {value} is out of range {low}-{high}")
+        super().__init__(capacity, overrun_timeout)
+        self.encoding = encoding
+        self.params = [quality_flag, value]
+        self.data = [None] * capacity  # Encoded bytes per slot (None while the frame is being encoded)
+        self.encoded_bytes = 0
+        self.encode_time = 0.0
+        self.encoded_frames = 0
+
+        self.staging = staging
+        self.free_buffers = None  # Raw staging buffers, allocated on first push
+        self.staging_bytes = 0
+        self.pending = queue.Queue()
+        self.threads = [threading.Thread(target=self._encode_loop, name=f'ring-encoder-{i}', daemon=True)
+                        for i in range(threads)]
+        for thread in self.threads:
+            thread.start()
+
+    def _allocate(self, frame):
+        if self.pins.any() or (self.free_buffers is not None and len(self.free_buffers) < self.staging):
+            raise BufferError("frame size changed while frames are pinned or being encoded")
+        self.frames = np.empty((0,) + frame.shape, dtype=frame.dtype)  # Frame shape and dtype only
+        self.free_buffers = [np.empty_like(frame) for _ in range(self.staging)]
+        self.staging_bytes = self.staging * frame.nbytes
+        self.slot_index.fill(-1)
+        self.data = [None] * self.capacity
+        self.encoded_bytes = 0
+        print(f"🎞️ Frame ring allocated: {self.capacity} x {frame.shape} as {self.encoding.upper()} "
+              f"({self.staging} raw staging buffers, {self.staging * frame.nbytes / (1024 * 1024):.0f} MB)")
+
+    def push(self, frame, meta=None):
+        """Stage a copy of frame for encoding (and keep meta), return its frame index"""
+        if self.frames is None or self.frames.shape[1:] != frame.shape or self.frames.dtype != frame.dtype:
+            with self.condition:
+                self.condition.wait_for(lambda: len(self.free_buffers or ()) == self.staging or
+                                        self.free_buffers is None, timeout=self.overrun_timeout)
+            self._allocate(frame)
+
+        slot = self.next_index % self.capacity
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.pins[slot] == 0 and self.free_buffers,
+                                           timeout=self.overrun_timeout):
+                if self.pins[slot]:
+                    raise BufferError(f"frame ring overrun: frame {self.slot_index[slot]} is still pinned")
+                raise BufferError("frame ring encoder stalled: no free staging buffer")
+            buffer = self.free_buffers.pop()
+            if self.data[slot] is not None:
+                self.encoded_bytes -= len(self.data[slot])
+            self.data[slot] = None
+            self.meta[slot] = meta
+            self.slot_index[slot] = self.next_index
+            self.next_index += 1
+            index = self.next_index - 1
+
+        np.copyto(buffer, frame)
+        self.pending.put((index, buffer))
+        return index
+
+    def _encode_loop(self):
+        while True:
+            item = self.pending.get()
+            if item is None:
+                break
+            index, buffer = item
+            start = time.perf_counter()
+            ok, encoded = cv2.imencode(self.extension, buffer, self.params)
+            elapsed = time.perf_counter() - start
+            slot = index % self.capacity
+            with self.condition:
+                self.free_buffers.append(buffer)
+                if ok and self.slot_index[slot] == index:
+                    self.data[slot] = encoded
+                    self.encoded_bytes += len(encoded)
+                    self.encoded_frames += 1
+                    self.encode_time += elapsed
+                elif not ok:
+                    print(f"❌ Frame ring could not encode frame {index}")
+                self.condition.notify_all()
+
+    def get(self, index):
+        """Decode the stored frame (a new array), waiting for its encoding if it is still pending"""
+        slot = index % self.capacity
+        with self.condition:
+            if not self.contains(index):
+                raise IndexError(f"frame {index} is no longer in the ring")
+            if not self.condition.wait_for(lambda: self.data[slot] is not None or not self.contains(index),
+                                           timeout=self.overrun_timeout):
+                raise BufferError(f"frame {index} was not encoded in time")
+            if not self.contains(index):
+                raise IndexError(f"frame {index} is no longer in the ring")
+            encoded = self.data[slot]
+        return cv2.imdecode(encoded, cv2.IMREAD_UNCHANGED)
+
+    def get_stats(self):
+        stored = sum(data is not None for data in self.data)
+        return {
+            'format': self.encoding,
+            'frames': min(self.next_index, self.capacity),
+            'resident_mb': (self.encoded_bytes + self.staging_bytes) / (1024 * 1024),
+            'mean_frame_kb': self.encoded_bytes / max(1, stored) / 1024,
+            'encode_ms': 1000 * self.encode_time / max(1, self.encoded_frames)
+        }
+
+    def close(self):
+        """Stop the encoder threads (frames already staged are encoded first)"""
+        for _ in self.threads:
+            self.pending.put(None)
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+
+
+def create_frame_ring(capacity, encoding=None, quality=90, threads=1, png_compression=1):
+    """Raw FrameRing, or an EncodedFrameRing with encoding 'jpeg' or 'png'"""
+    if encoding in (None, 'raw'):
+        return FrameRing(capacity)
+    return EncodedFrameRing(capacity, encoding, quality, png_compression, threads=threads)
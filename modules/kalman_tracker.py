@@ -49,4 +49,98 @@ class KalmanTracker:
         
     def get_predicted_position(self):
         """Get last predicted position"""
-        return self.last_prediction
\ No newline at end of file
+        return self.last_prediction
+
+class KalmanBank:
+    def __init__(self, capacity=64, process_noise=0.03, measurement_noise=0.1):
+        """Constant-velocity Kalman filters of all tracks in stacked arrays.
+
+        Same model as KalmanTracker (state x, y, vx, vy; measurement x, y) but
+        every track is predicted/corrected in one batched operation. Slots are
+        reused when tracks are removed and the arrays only grow (doubling) when
+        all slots are taken.
+        """
+        self.process_noise = np.float32(process_noise)
+        self.measurement_noise = np.eye(2, dtype=np.float32) * measurement_noise
+        self.state = np.zeros((capacity, 4), dtype=np.float32)         # [x, y, vx, vy] per slot
+        self.covariance = np.zeros((capacity, 4, 4), dtype=np.float32)
+        self.slots = {}  # track_id -> slot
+        self.free_slots = list(range(capacity - 1, -1, -1))
+        self.used = 0    # Slots below this index have been handed out at least once
+        
+    def __len__(self):
+        return len(self.slots)
+    
+    def __contains__(self, track_id):
+        return track_id in self.slots
+    
+    def _grow(self):
+        """Double the capacity (only when every slot is taken)"""
+        capacity = len(self.state)
+        self.state = np.concatenate([self.state, np.zeros_like(self.state)])
+        self.covariance = np.concatenate([self.covariance, np.zeros_like(self.covariance)])
+        self.free_slots = list(range(2 * capacity - 1, capacity - 1, -1))
+    
+    def add(self, track_id, initial_position):
+        """Start a filter at the given position with zero velocity"""
+        if not self.free_slots:
+            self._grow()
+        slot = self.free_slots.pop()
+        self.slots[track_id] = slot
+        self.used = max(self.used, slot + 1)
+        
+        x, y = initial_position
+        self.state[slot] = (x, y, 0, 0)
+        self.covariance[slot] = np.eye(4, dtype=np.float32)
+    
+    def remove(self, track_id):
+        """Release the filter of a track"""
+        slot = self.slots.pop(track_id, None)
+        if slot is not None:
+            self.free_slots.append(slot)
+    
+    def predict(self, dt=1.0):
+        """Advance every filter by dt frames (dt > 1 when frames were skipped or dropped)"""
+        if not self.slots:
+            return
+        dt = np.float32(dt)
+        transition = np.array([
+            [1, 0, dt, 0],  # x = x + vx*dt
+            [0, 1, 0, dt],  # y = y + vy*dt
+            [0, 0, 1, 0],   # vx = vx
+            [0, 0, 0, 1]    # vy = vy
+        ], dtype=np.float32)
+        
+        # Unused slots are advanced too; that is cheaper than gathering the active ones
+        state = self.state[:self.used]
+        covariance = self.covariance[:self.used]
+        state[:] = state @ transition.T
+        covariance[:] = transition @ covariance @ transition.T
+        covariance += np.eye(4, dtype=np.float32) * (self.process_noise * dt)
+    
+    def correct(self, track_ids, measurements):
+        """Correct the filters of the given tracks with measured (x, y) positions"""
+        if len(track_ids) == 0:
+            return
+        slots = np.array([self.slots[track_id] for track_id in track_ids])
+        measurements = np.asarray(measurements, dtype=np.float32).reshape(-1, 2)
+        
+        state = self.state[slots]
+        covariance = self.covariance[slots]
+        
+        # Measurement matrix picks x, y: H P = first two rows, H P H^T = top-left 2x2
+        hp = covariance[:, :2, :]
+        innovation_cov = covariance[:, :2, :2] + self.measurement_noise
+        gain = np.linalg.solve(innovation_cov, hp).transpose(0, 2, 1)  # (n, 4, 2)
+        residual = measurements - state[:, :2]
+        
+        self.state[slots] = state + (gain @ residual[:, :, None])[:, :, 0]
+        self.covariance[slots] = covariance - gain @ hp
+    
+    def positions(self, track_ids):
+        """Current (predicted or corrected) integer positions of the given tracks"""
+        if len(track_ids) == 0:
+            return np.zeros((0, 2), dtype=np.int64)
+        slots = np.array([self.slots[track_id] for track_id in track_ids])
+        # Truncated like KalmanTracker.predict()'s int() so positions match the per-track filters
+        return self.state[slots, :2].astype(np.int64)
@@ -0,0 +1,79 @@
+from collections import OrderedDict
+
+
+class _Slot:
+    def __init__(self, landmarker):
+        """One VIDEO-mode landmarker and the last timestamp it was fed"""
+        self.landmarker = landmarker
+        self.last_timestamp = -1
+
+
+class LandmarkerPool:
+    def __init__(self, create_fn, capacity=12):
+        """VIDEO-mode pose landmarkers bound to stable player IDs, bounded by an LRU.
+
+        Each tracked player keeps its own landmarker, so MediaPipe can track the
+        landmarks from the previous crop instead of detecting the pose from
+        scratch, and smooths them over time. That tracking ROI and smoothing
+        state belongs to one person, so a landmarker is never handed to another
+        player: retired players' landmarkers are closed, and when all capacity
+        landmarkers are bound the least recently used player's is closed and a
+        fresh one is created for the new player.
+        """
+        self.create_fn = create_fn
+        self.capacity = capacity
+        self.bound = OrderedDict()  # player_id: _Slot, least recently used first
+        self.created = 0
+        self.evicted = 0
+
+    def acquire(self, player_id):
+        """Slot bound to a player (a new landmarker, evicting the least recently used one if needed)"""
+        slot = self.bound.get(player_id)
+        if slot is not None:
+            self.bound.move_to_end(player_id)
+            return slot
+
+        if len(self.bound) >= self.capacity:
+            _, evicted = self.bound.popitem(last=False)
+            self._close(evicted)
+            self.evicted += 1
+        slot = _Slot(self.create_fn())
+        self.created += 1
+        self.bound[player_id] = slot
+        return slot
+
+    def detect(self, player_id, image, timestamp_ms, detect_fn):
+        """Run detect_fn(landmarker, image, timestamp_ms) on the player's landmarker.
+
+        VIDEO mode requires strictly increasing timestamps per landmarker.
+        """
+        slot = self.acquire(player_id)
+        timestamp_ms = max(int(timestamp_ms), slot.last_timestamp + 1)
+        slot.last_timestamp = timestamp_ms
+        return detect_fn(slot.landmarker, image, timestamp_ms)
+
+    def release(self, player_ids):
+        """Close the landmarkers of retired players"""
+        for player_id in player_ids:
+            slot = self.bound.pop(player_id, None)
+            if slot is not None:
+                self._close(slot)
+
+    def _close(self, slot):
+        try:
+            slot.landmarker.close()
+        except Exception:
+            pass
+
+    def get_stats(self):
+        return {
+            'bound': len(self.bound),
+            'created': self.created,
+            'evicted': self.evicted
+        }
+
+    def close(self):
+        """Close every landmarker"""
+        for slot in self.bound.values():
+            self._close(slot)
+        self.bound.clear()
@@ -0,0 +1,110 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+
+class ModelRegistry:
+    def __init__(self):
+        """Process-wide cache of loaded models: every model is loaded and warmed once and then shared.
+
+        Loading (and the imports of ultralytics/torch and mediapipe behind it)
+        happens on first use or in warmup(), which the launcher runs on a
+        background thread while the menu is shown. Requests for a model that
+        is still loading wait for it instead of loading it again.
+        """
+        self.models = {}
+        self.load_seconds = {}  # key: seconds spent loading and warming
+        self.lock = threading.RLock()
+        self.warmup_thread = None
+
+    def yolo(self, weights='yolov8n.pt', imgsz=640, warm=True):
+        """Shared YOLO model (PyTorch weights or an exported model), warmed with one inference at imgsz"""
+        key = ('yolo', weights)
+        with self.lock:
+            if key not in self.models:
+                start = time.perf_counter()
+                from ultralytics import YOLO
+
+                model = YOLO(weights, task='detect')
+                if warm:
+                    # First inference builds the predictor and (on GPU) initialises CUDA
+                    model.predict(np.zeros((imgsz, imgsz, 3), dtype=np.uint8), imgsz=imgsz, verbose=False)
+                self.models[key] = model
+                self.load_seconds[key] = time.perf_counter() - start
+                print(f"🧠 Loaded {weights} in {self.load_seconds[key]:.2f}s")
+            return self.models[key]
+
+    def detector(self, config=None):
+        """Shared YOLO model of the configured detector backend (video_config's get_detector_config() by default).
+
+        Exports the model on first use; if that fails (e.g. the runtime is not
+        installed) the PyTorch weights are used instead.
+        """
+        from .detector_backend import create_backend
+
+        if config is None:
+            from video_config import get_detector_config
+            config = get_detector_config()
+        backend = create_backend(**config)
+        with self.lock:
+            try:
+                weights = backend.prepare()
+            except Exception as e:
+                print(f"WARNING: {backend.label} detector unavailable ({e}), using {backend.weights}")
+                weights = backend.weights
+            return self.yolo(weights, imgsz=backend.imgsz)
+
+    def pose_landmarker(self, model_path):
+        """Shared IMAGE-mode MediaPipe PoseLandmarker (stateless, so trackers can share it)"""
+        key = ('pose', model_path)
+        with self.lock:
+            if key not in self.models:
+                start = time.perf_counter()
+                from .skeleton_tracker import create_pose_landmarker, detect_crop_landmarks
+
+                landmarker = create_pose_landmarker(model_path)
+                detect_crop_landmarks(landmarker, np.zeros((256, 128, 3), dtype=np.uint8))  # Warm the graph
+                self.models[key] = landmarker
+                self.load_seconds[key] = time.perf_counter() - start
+                print(f"🧠 Loaded pose landmarker in {self.load_seconds[key]:.2f}s")
+            return self.models[key]
+
+    @staticmethod
+    def reset_tracking(model):
+        """Forget the ByteTrack state model.track(persist=True) keeps, so a new run starts with fresh IDs"""
+        # The trackers themselves are kept: track() only registers its callbacks while they are missing
+        predictor = getattr(model, 'predictor', None)
+        for tracker in getattr(predictor, 'trackers', []):
+            tracker.reset()
+
+    def warmup(self, detector_config=None, pose_model_path=None):
+        """Load and warm the detector and (if its model file exists) MediaPipe"""
+        try:
+            self.detector(detector_config)
+        except Exception as e:
+            print(f"WARNING: YOLO warmup failed: {e}")
+        if pose_model_path is None:
+            from .skeleton_tracker import get_pose_model_path
+            pose_model_path = get_pose_model_path()
+        if os.path.exists(pose_model_path):
+            try:
+                self.pose_landmarker(pose_model_path)
+            except Exception as e:
+                print(f"WARNING: MediaPipe warmup failed: {e}")
+
+    def warmup_async(self, **kwargs):
+        """Run warmup() on a background thread (models requested meanwhile wait for it)"""
+        if self.warmup_thread is None or not self.warmup_thread.is_alive():
+            self.warmup_thread = threading.Thread(target=self.warmup, kwargs=kwargs, name='model-warmup', daemon=True)
+            self.warmup_thread.start()
+        return self.warmup_thread
+
+
+_registry = ModelRegistry()
+
+
+def get_model_registry():
+    """The process-wide model registry"""
+    return _registry
@@ -0,0 +1,63 @@
+import numpy as np
+
+from .court_model import BOUNDARY_LINE
+
+
+class PoseGate:
+    def __init__(self, distance=80, max_poses=6):
+        """Run pose only for players whose feet may be close to the boundary.
+
+        A player is a candidate when its bbox-bottom point or its predicted foot
+        (the last pose foot carried along with the box) is within distance
+        pixels of the boundary. At most max_poses candidates per frame get pose,
+        closest first (0 = no cap); everyone else keeps the bbox foot.
+        """
+        self.distance = distance
+        self.max_poses = max_poses
+        self.frames = 0
+        self.players = 0
+        self.pose_calls = 0
+        self.capped = 0  # Candidates skipped because of max_poses
+
+    def select(self, court, bbox_feet, predicted_feet):
+        """Indices of the players that get pose, closest to the boundary first.
+
+        bbox_feet and predicted_feet are (N, 2) points; rows of predicted_feet
+        may be None for players without a previous pose foot.
+        """
+        count = len(bbox_feet)
+        self.frames += 1
+        self.players += count
+        if count == 0:
+            return []
+
+        distance = court.signed_distance(bbox_feet, BOUNDARY_LINE)
+        if distance is None:
+            # No compiled boundary to measure against: keep running pose for everyone
+            self.pose_calls += count
+            return list(range(count))
+        proximity = np.abs(distance).astype(np.float64)
+
+        has_prediction = [i for i, foot in enumerate(predicted_feet) if foot is not None]
+        if has_prediction:
+            predicted = court.signed_distance([predicted_feet[i] for i in has_prediction], BOUNDARY_LINE)
+            proximity[has_prediction] = np.minimum(proximity[has_prediction], np.abs(predicted))
+
+        candidates = np.flatnonzero(proximity <= self.distance)
+        candidates = candidates[np.argsort(proximity[candidates], kind='stable')]
+        if self.max_poses and len(candidates) > self.max_poses:
+            self.capped += len(candidates) - self.max_poses
+            candidates = candidates[:self.max_poses]
+
+        self.pose_calls += len(candidates)
+        return candidates.tolist()
+
+    def get_stats(self):
+        """Pose calls made vs. one per player and frame"""
+        return {
+            'frames': self.frames,
+            'players': self.players,
+            'pose_calls': self.pose_calls,
+            'capped': self.capped,
+            'pose_ratio': self.pose_calls / self.players if self.players else 1.0
+        }
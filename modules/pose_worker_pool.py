@@ -0,0 +1,200 @@
+import multiprocessing
+import time
+from multiprocessing.connection import wait
+
+# Seconds to wait for a worker to answer before treating it as hung
+RESULT_TIMEOUT = 10.0
+# Restarts of a crashed or hung worker before its crops fall back to bbox feet for good
+MAX_RESTARTS = 3
+
+
+def _pose_worker(model_path, task_queue, result_conn, running_mode='image', pool_size=12):
+    """Worker process: own PoseLandmarker, answers (job_id, index, crop, player_id, timestamp_ms) tasks.
+
+    In video mode the worker also holds the VIDEO-mode landmarkers of the players routed to it.
+    """
+    from modules.skeleton_tracker import create_pose_landmarker, detect_crop_landmarks
+    from modules.landmarker_pool import LandmarkerPool
+
+    try:
+        pose_landmarker = create_pose_landmarker(model_path)
+    except Exception as e:
+        result_conn.send(('error', None, str(e)))
+        return
+    landmarker_pool = None
+    if running_mode == 'video':
+        landmarker_pool = LandmarkerPool(lambda: create_pose_landmarker(model_path, 'video'), pool_size)
+    result_conn.send(('ready', None, None))
+
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        if task[0] == 'release':
+            if landmarker_pool is not None:
+                landmarker_pool.release(task[1])
+            continue
+        job_id, index, crop, player_id, timestamp_ms = task
+        try:
+            if landmarker_pool is not None and timestamp_ms is not None:
+                landmarks = landmarker_pool.detect(player_id, crop, timestamp_ms, detect_crop_landmarks)
+            else:
+                landmarks = detect_crop_landmarks(pose_landmarker, crop)
+        except Exception:
+            landmarks = None
+        result_conn.send((job_id, index, landmarks))
+
+    pose_landmarker.close()
+    if landmarker_pool is not None:
+        landmarker_pool.close()
+
+
+class PoseWorkerPool:
+    def __init__(self, num_workers, model_path, running_mode='image', pool_size=12):
+        """Pool of processes, each holding its own MediaPipe PoseLandmarker.
+
+        In video mode every player is pinned to one worker, which keeps that
+        player's VIDEO-mode landmarker (pool_size landmarkers per worker).
+        Every worker answers on its own pipe, so a crashed worker is noticed at
+        once (end of file) and cannot block the others. A worker that has not
+        answered within RESULT_TIMEOUT is hung and is terminated. Either way its
+        unanswered crops of the batch get no pose and it is restarted, up to
+        MAX_RESTARTS times before its crops get no pose for good.
+        """
+        # Spawn so workers don't inherit torch/YOLO state from the parent
+        self.context = multiprocessing.get_context('spawn')
+        self.worker_args = (model_path, running_mode, pool_size)
+        self.task_queues = []
+        self.result_conns = []
+        self.workers = []  # None for a worker that was given up on
+        self.restarts = [0] * num_workers
+        self.next_job_id = 0
+
+        for i in range(num_workers):
+            task_queue, result_conn, worker = self._start_worker(i)
+            self.task_queues.append(task_queue)
+            self.result_conns.append(result_conn)
+            self.workers.append(worker)
+
+        # Wait until every worker has loaded its model
+        for result_conn in self.result_conns:
+            try:
+                status, _, error = result_conn.recv()
+            except EOFError:
+                self.close()
+                raise RuntimeError("pose worker exited during start-up")
+            if status == 'error':
+                self.close()
+                raise RuntimeError(error)
+
+    def _start_worker(self, i):
+        model_path, running_mode, pool_size = self.worker_args
+        task_queue = self.context.Queue()
+        result_conn, worker_conn = self.context.Pipe(duplex=False)
+        worker = self.context.Process(target=_pose_worker,
+                                      args=(model_path, task_queue, worker_conn, running_mode, pool_size),
+                                      name=f'pose-worker-{i}', daemon=True)
+        worker.start()
+        worker_conn.close()  # Only the worker writes: its exit ends the pipe
+        return task_queue, result_conn, worker
+
+    def _restart(self, i, hung=False):
+        """Replace a dead or hung worker (fresh queue and pipe: the old ones may be left mid-message)"""
+        worker = self.workers[i]
+        if hung:
+            worker.terminate()
+            print(f"⚠️ Pose worker {i} hung (no answer in {RESULT_TIMEOUT:.0f}s), terminated", end='')
+        worker.join(timeout=1)
+        if not hung:
+            print(f"⚠️ Pose worker {i} died (exit code {worker.exitcode})", end='')
+        self.task_queues[i].cancel_join_thread()
+        self.result_conns[i].close()
+        if self.restarts[i] >= MAX_RESTARTS:
+            print(" - giving up, its players use the bbox foot")
+            self.workers[i] = None
+            return
+        self.restarts[i] += 1
+        print(f" - restarting ({self.restarts[i]}/{MAX_RESTARTS})")
+        self.task_queues[i], self.result_conns[i], self.workers[i] = self._start_worker(i)
+
+    def worker_for(self, player_id):
+        """Worker that holds a player's VIDEO-mode landmarker"""
+        return int(player_id) % len(self.task_queues)
+
+    def detect(self, crops, workers=None, player_ids=None, timestamp_ms=None):
+        """Detect landmarks for a batch of BGR crops in parallel, results in input order.
+
+        workers optionally gives the worker index for each crop; by default crops
+        are spread round-robin over the pool. With player_ids and timestamp_ms
+        (video mode) each crop goes to its player's worker and landmarker.
+        """
+        job_id = self.next_job_id
+        self.next_job_id += 1
+        if player_ids is not None and workers is None:
+            workers = [self.worker_for(player_id) for player_id in player_ids]
+
+        pending = {}  # worker -> crops it has not answered yet
+        for index, crop in enumerate(crops):
+            worker = workers[index] if workers is not None else index % len(self.task_queues)
+            if self.workers[worker] is None:
+                continue  # Given up on: no pose for this crop
+            player_id = player_ids[index] if player_ids is not None else None
+            self.task_queues[worker].put((job_id, index, crop, player_id, timestamp_ms))
+            pending[worker] = pending.get(worker, 0) + 1
+
+        results = [None] * len(crops)
+        deadline = time.monotonic() + RESULT_TIMEOUT
+        while pending:
+            conns = {self.result_conns[worker]: worker for worker in pending}
+            ready = wait(list(conns), timeout=max(0.0, deadline - time.monotonic()))
+            if not ready:
+                # Hung: its remaining crops of this batch get no pose, and it would stall every later batch
+                for worker in list(pending):
+                    del pending[worker]
+                    self._restart(worker, hung=True)
+                break
+            for conn in ready:
+                worker = conns[conn]
+                try:
+                    result_job, index, landmarks = conn.recv()
+                except (EOFError, OSError):
+                    # Crashed: its remaining crops of this batch get no pose
+                    del pending[worker]
+                    self._restart(worker)
+                    continue
+                if result_job != job_id:
+                    continue  # Late answer from an abandoned batch (or a restarted worker's start-up message)
+                results[index] = landmarks
+                pending[worker] -= 1
+                if pending[worker] == 0:
+                    del pending[worker]
+
+        return results
+
+    def release(self, player_ids):
+        """Free the VIDEO-mode landmarkers of retired players in their workers"""
+        by_worker = {}
+        for player_id in player_ids:
+            by_worker.setdefault(self.worker_for(player_id), []).append(player_id)
+        for worker, ids in by_worker.items():
+            if self.workers[worker] is not None:
+                self.task_queues[worker].put(('release', ids))
+
+    def close(self):
+        """Stop all worker processes"""
+        for task_queue in self.task_queues:
+            try:
+                task_queue.put(None)
+            except Exception:
+                pass
+        for worker in self.workers:
+            if worker is None:
+                continue
+            worker.join(timeout=2)
+            if worker.is_alive():
+                worker.terminate()
+        for result_conn in self.result_conns:
+            result_conn.close()
+        self.task_queues = []
+        self.result_conns = []
+        self.workers = []
@@ -0,0 +1,179 @@
+import numpy as np
+
+from .court_model import BOUNDARY_LINE
+from .yolo_detector import BoxArray
+
+
+def suppress_seam_duplicates(boxes, tiles, overlap_ratio=0.6):
+    """Drop boxes found again by a neighbouring tile.
+
+    A box is a duplicate when it overlaps a higher-confidence box from another
+    tile by more than overlap_ratio of the smaller box (a player cut by a tile
+    edge gives a truncated box, so plain IoU would miss it). Boxes of the same
+    tile were already deduplicated by YOLO's NMS.
+    """
+    if len(boxes) < 2:
+        return boxes
+    order = np.argsort(-boxes[:, 4], kind='stable')
+    boxes, tiles = boxes[order], tiles[order]
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    keep = np.ones(len(boxes), dtype=bool)
+    for i in range(len(boxes)):
+        if not keep[i]:
+            continue
+        rest = np.arange(i + 1, len(boxes))
+        rest = rest[keep[rest] & (tiles[rest] != tiles[i])]
+        if len(rest) == 0:
+            continue
+        overlap_x = np.clip(np.minimum(boxes[i, 2], boxes[rest, 2]) - np.maximum(boxes[i, 0], boxes[rest, 0]), 0, None)
+        overlap_y = np.clip(np.minimum(boxes[i, 3], boxes[rest, 3]) - np.maximum(boxes[i, 1], boxes[rest, 1]), 0, None)
+        min_area = np.maximum(np.minimum(areas[i], areas[rest]), 1e-6)
+        keep[rest[overlap_x * overlap_y > overlap_ratio * min_area]] = False
+    return boxes[keep]
+
+
+def letterbox_pixels(height, width, imgsz, stride=32):
+    """Pixels of the letterboxed network input YOLO builds for an image (minimal stride padding)"""
+    ratio = imgsz / max(height, width)
+    new_h = int(np.ceil(round(height * ratio) / stride) * stride)
+    new_w = int(np.ceil(round(width * ratio) / stride) * stride)
+    return new_h * new_w
+
+
+class BoundaryROIDetector:
+    def __init__(self, model, tile_size=704, tile_overlap=96, margin_above=260, margin_below=60,
+                 full_frame_interval=30, conf_threshold=0.5, imgsz=640, tile_imgsz=None):
+        """Person detection restricted to a band around the boundary line.
+
+        The band reaches margin_above pixels above the boundary (a player whose
+        feet are at the line is mostly above it) and margin_below pixels below.
+        It is covered by overlapping tiles tile_size pixels wide that YOLO sees
+        at tile_imgsz (default tile_size: native resolution, without the
+        downscale of a full-frame pass at imgsz, for better recall on small,
+        distant feet at more network pixels). A smaller tile_imgsz trades that
+        recall for fewer network pixels. Every full_frame_interval video frames
+        (counted by the frame_index passed to detect(), so skipped frames of a
+        detection stride count too) the whole frame is detected instead so new
+        tracks are found.
+        """
+        self.model = model
+        self.tile_size = tile_size
+        self.tile_overlap = tile_overlap
+        self.margin_above = margin_above
+        self.margin_below = margin_below
+        self.full_frame_interval = full_frame_interval
+        self.conf_threshold = conf_threshold
+        self.imgsz = imgsz  # Network size of the full-frame pass
+        self.tile_imgsz = tile_imgsz or tile_size  # Network size of the band tiles
+
+        self.tiles = None       # [(x1, y1, x2, y2), ...] for the current frame size
+        self.tiles_key = None   # (frame size, court transform) the tiles were planned for
+        self.frames = 0
+        self.full_frames = 0
+        self.last_full_frame = None  # Frame index of the last full-frame pass
+        self.pixels = 0                # Frame pixels fed to the detector
+        self.full_pixels = 0           # Frame pixels a full-frame pass on every frame would have used
+        self.network_pixels = 0        # Letterboxed network input pixels actually inferred
+        self.full_network_pixels = 0   # Network input pixels of a full-frame pass on every frame
+
+    def plan_tiles(self, court, frame_shape):
+        """Overlapping tiles covering the boundary band of a frame"""
+        height, width = frame_shape[:2]
+        key = ((width, height), court.frame_transform().tobytes())
+        if self.tiles_key == key:
+            return self.tiles
+
+        self.tiles_key = key
+        self.tiles = []
+        if BOUNDARY_LINE not in court.tables:
+            return self.tiles
+
+        # Boundary y at every column, clipped to the frame
+        _, thresholds = court.tables[BOUNDARY_LINE]
+        line_y = thresholds[:width + 1]
+
+        # Fewest tile columns with at least tile_overlap overlap, spread evenly over the width
+        tile_width = min(self.tile_size, width)
+        count = 1
+        if width > tile_width:
+            count = 1 + int(np.ceil((width - tile_width) / max(1, tile_width - self.tile_overlap)))
+        starts = np.linspace(0, width - tile_width, count).round().astype(int)
+
+        spans = []
+        for x1 in starts:
+            x2 = x1 + tile_width
+            y_top = max(0, int(np.floor(line_y[x1:x2 + 1].min())) - self.margin_above)
+            y_bottom = min(height, int(np.ceil(line_y[x1:x2 + 1].max())) + self.margin_below)
+            if y_bottom > y_top:
+                spans.append((x1, x2, y_top, y_bottom))
+
+        # Equal tile sizes let YOLO batch the tiles with minimal letterbox padding
+        tile_height = max((y2 - y1 for _, _, y1, y2 in spans), default=0)
+        for x1, x2, y_top, _ in spans:
+            y1 = min(y_top, height - tile_height)
+            self.tiles.append((x1, y1, x2, y1 + tile_height))
+
+        covered = np.zeros((height, width), dtype=bool)
+        for x1, y1, x2, y2 in self.tiles:
+            covered[y1:y2, x1:x2] = True
+        print(f"🔲 ROI band: {len(self.tiles)} tiles of {tile_width}x{tile_height}, "
+              f"{100.0 * covered.mean():.0f}% of the frame")
+        return self.tiles
+
+    def is_full_frame_due(self, frame_index):
+        return (self.full_frame_interval <= 1 or self.last_full_frame is None or
+                frame_index - self.last_full_frame >= self.full_frame_interval)
+
+    def detect(self, frame, court, frame_index=None):
+        """Detect persons in the boundary band (or the full frame when due), return a BoxArray in frame coordinates.
+
+        frame_index is the video frame number (default: the number of detect() calls).
+        """
+        frame_index = self.frames if frame_index is None else frame_index
+        height, width = frame.shape[:2]
+        tiles = self.plan_tiles(court, frame.shape)
+        full_frame = self.is_full_frame_due(frame_index) or not tiles
+        full_network = letterbox_pixels(height, width, self.imgsz)
+        self.frames += 1
+        self.full_pixels += width * height
+        self.full_network_pixels += full_network
+
+        if full_frame:
+            self.full_frames += 1
+            self.last_full_frame = frame_index
+            self.pixels += width * height
+            self.network_pixels += full_network
+            results = self.model.predict(frame, imgsz=self.imgsz, classes=[0], conf=self.conf_threshold,
+                                         iou=0.7, verbose=False)
+            return BoxArray(results[0].boxes.data.cpu().numpy()[:, :6])
+
+        crops = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in tiles]
+        self.pixels += sum(crop.shape[0] * crop.shape[1] for crop in crops)
+        self.network_pixels += sum(letterbox_pixels(crop.shape[0], crop.shape[1], self.tile_imgsz) for crop in crops)
+        results = self.model.predict(crops, imgsz=self.tile_imgsz, classes=[0], conf=self.conf_threshold,
+                                     iou=0.7, verbose=False)
+
+        # Map tile boxes back to frame coordinates
+        all_boxes, all_tiles = [], []
+        for tile_number, ((x1, y1, _, _), result) in enumerate(zip(tiles, results)):
+            boxes = result.boxes.data.cpu().numpy()[:, :6].astype(np.float32)
+            if len(boxes) == 0:
+                continue
+            boxes[:, [0, 2]] += x1
+            boxes[:, [1, 3]] += y1
+            all_boxes.append(boxes)
+            all_tiles.append(np.full(len(boxes), tile_number))
+        if not all_boxes:
+            return BoxArray(np.zeros((0, 6)))
+
+        return BoxArray(suppress_seam_duplicates(np.concatenate(all_boxes), np.concatenate(all_tiles)))
+
+    def get_stats(self):
+        """Full-frame passes and the fraction of frame/network pixels processed vs. full-frame detection"""
+        return {
+            'frames': self.frames,
+            'full_frames': self.full_frames,
+            'tiles': len(self.tiles or []),
+            'pixel_ratio': self.pixels / self.full_pixels if self.full_pixels else 1.0,
+            'network_pixel_ratio': self.network_pixels / self.full_network_pixels if self.full_network_pixels else 1.0
+        }
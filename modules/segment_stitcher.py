@@ -0,0 +1,118 @@
+import numpy as np
+
+from .track_associator import _solve
+
+
+def plan_segments(total_frames, count, overlap):
+    """Split frames [0, total_frames) into count segments sharing overlap frames with each neighbour.
+
+    Every frame belongs to the core [core_start, core_end) of exactly one
+    segment, which owns the results of that frame. A segment is processed
+    from overlap frames before its core (tracker warm-up, clip pre-roll) to
+    overlap frames after it (violations that started in the core finish).
+    """
+    count = max(1, min(count, total_frames))
+    bounds = np.linspace(0, total_frames, count + 1).round().astype(int)
+    return [
+        {
+            'index': i,
+            'core_start': int(bounds[i]),
+            'core_end': int(bounds[i + 1]),
+            'start': max(0, int(bounds[i]) - overlap),
+            'end': min(total_frames, int(bounds[i + 1]) + overlap)
+        }
+        for i in range(count)
+    ]
+
+
+def _iou(a, b):
+    """Pairwise IoU of (N, 4) and (M, 4) xyxy boxes"""
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+
+def match_overlap_tracks(previous, current, min_iou=0.5, min_frames=10):
+    """Match the tracks two segments saw in their shared frames.
+
+    previous and current map frame -> {stable_id: bbox} of each segment.
+    A pair's score is the mean IoU of its boxes over the frames both tracks
+    are in; pairs seen together in at least min_frames frames with a mean
+    IoU of at least min_iou are assigned one-to-one, best total first.
+    Returns [(previous_id, current_id, mean_iou)].
+    """
+    iou_sum, together = {}, {}
+    for frame in set(previous) & set(current):
+        prev_tracks, cur_tracks = previous[frame], current[frame]
+        if not prev_tracks or not cur_tracks:
+            continue
+        prev_ids, cur_ids = list(prev_tracks), list(cur_tracks)
+        ious = _iou(np.array([prev_tracks[i] for i in prev_ids], dtype=np.float64),
+                    np.array([cur_tracks[i] for i in cur_ids], dtype=np.float64))
+        for r, c in zip(*np.nonzero(ious > 0)):
+            pair = (prev_ids[r], cur_ids[c])
+            iou_sum[pair] = iou_sum.get(pair, 0.0) + ious[r, c]
+        for prev_id in prev_ids:
+            for cur_id in cur_ids:
+                together[(prev_id, cur_id)] = together.get((prev_id, cur_id), 0) + 1
+    if not iou_sum:
+        return []
+
+    prev_ids = sorted({pair[0] for pair in iou_sum})
+    cur_ids = sorted({pair[1] for pair in iou_sum})
+    mean_iou = np.zeros((len(prev_ids), len(cur_ids)))
+    valid = np.zeros(mean_iou.shape, dtype=bool)
+    for (prev_id, cur_id), total in iou_sum.items():
+        r, c = prev_ids.index(prev_id), cur_ids.index(cur_id)
+        frames = together[(prev_id, cur_id)]
+        mean_iou[r, c] = total / frames
+        valid[r, c] = frames >= min_frames and mean_iou[r, c] >= min_iou
+    return [(prev_ids[r], cur_ids[c], round(float(mean_iou[r, c]), 4)) for r, c in _solve(1.0 - mean_iou, valid)]
+
+
+class SegmentStitcher:
+    def __init__(self, min_iou=0.5, min_frames=10):
+        """One global player ID space over the stable IDs of consecutive segments.
+
+        link() carries the global IDs of the previous segment's tracks over to
+        the tracks of the next segment they were matched with in the overlap;
+        every other track gets a new global ID the first time it is looked up.
+        """
+        self.min_iou = min_iou
+        self.min_frames = min_frames
+        self.id_maps = {}  # segment index -> {stable_id: global_id}
+        self.next_global_id = 1
+        self.links = []  # Matches per seam
+
+    def global_id(self, segment, stable_id):
+        ids = self.id_maps.setdefault(segment, {})
+        if stable_id not in ids:
+            ids[stable_id] = self.next_global_id
+            self.next_global_id += 1
+        return ids[stable_id]
+
+    def link(self, segment, previous_tracks, current_tracks):
+        """Match segment's tracks with those of segment - 1 in their shared frames (see match_overlap_tracks)"""
+        matches = match_overlap_tracks(previous_tracks, current_tracks, self.min_iou, self.min_frames)
+        ids = self.id_maps.setdefault(segment, {})
+        for prev_id, cur_id, _ in matches:
+            ids[cur_id] = self.global_id(segment - 1, prev_id)
+        self.links.append({
+            'segment': segment,
+            'matched': len(matches),
+            'previous_tracks': len({i for tracks in previous_tracks.values() for i in tracks}),
+            'tracks': len({i for tracks in current_tracks.values() for i in tracks}),
+            'mean_iou': round(float(np.mean([m[2] for m in matches])), 4) if matches else None
+        })
+        return matches
+
+    def get_stats(self):
+        return {
+            'players': self.next_global_id - 1,
+            'seams': self.links
+        }
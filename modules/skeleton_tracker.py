@@ -1,38 +1,117 @@
 import cv2
 import numpy as np
 import os
+from .landmarker_pool import LandmarkerPool
+from .model_registry import get_model_registry
+
+# Crop padding around the player bbox and minimum crop size for pose detection
+CROP_PAD = 20
+MIN_CROP_HEIGHT = 30
+MIN_CROP_WIDTH = 20
+
+def get_pose_model_path():
+    """Path to downloaded MediaPipe pose model"""
+    model_path = os.path.join(os.path.dirname(__file__), '..', 'models', 'pose_landmarker_lite.task')
+    return os.path.abspath(model_path)
+
+def create_pose_landmarker(model_path, running_mode='image'):
+    """Create a MediaPipe PoseLandmarker for single images ('image') or one player's crop sequence ('video')"""
+    from mediapipe.tasks import python
+    from mediapipe.tasks.python import vision
+    
+    base_options = python.BaseOptions(model_asset_path=model_path)
+    options = vision.PoseLandmarkerOptions(
+        base_options=base_options,
+        running_mode=vision.RunningMode.VIDEO if running_mode == 'video' else vision.RunningMode.IMAGE,
+        num_poses=1,
+        min_pose_detection_confidence=0.3,
+        min_pose_presence_confidence=0.3,
+        min_tracking_confidence=0.3
+    )
+    return vision.PoseLandmarker.create_from_options(options)
+
+def crop_player(frame, bbox):
+    """Crop padded player region, return (crop, crop_box) or None if too small"""
+    x1, y1, x2, y2 = bbox
+    crop_x1 = max(0, x1 - CROP_PAD)
+    crop_y1 = max(0, y1 - CROP_PAD)
+    crop_x2 = min(frame.shape[1], x2 + CROP_PAD)
+    crop_y2 = min(frame.shape[0], y2 + CROP_PAD)
+    
+    player_crop = frame[crop_y1:crop_y2, crop_x1:crop_x2]
+    if player_crop.size > 0 and player_crop.shape[0] > MIN_CROP_HEIGHT and player_crop.shape[1] > MIN_CROP_WIDTH:
+        return player_crop, (crop_x1, crop_y1, crop_x2, crop_y2)
+    return None
+
+def detect_crop_landmarks(pose_landmarker, player_crop, timestamp_ms=None):
+    """Detect pose on a BGR crop, return normalized (x, y, visibility) tuples of first person or None.
+    
+    With timestamp_ms the landmarker must be in VIDEO mode and tracks the landmarks of its previous crop.
+    """
+    import mediapipe as mp
+    
+    # Convert to MediaPipe Image format
+    rgb_crop = cv2.cvtColor(player_crop, cv2.COLOR_BGR2RGB)
+    mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_crop)
+    
+    # Detect pose landmarks
+    if timestamp_ms is None:
+        detection_result = pose_landmarker.detect(mp_image)
+    else:
+        detection_result = pose_landmarker.detect_for_video(mp_image, timestamp_ms)
+    
+    if detection_result.pose_landmarks and len(detection_result.pose_landmarks) > 0:
+        return [(lm.x, lm.y, lm.visibility) for lm in detection_result.pose_landmarks[0]]  # First person
+    return None
+
+def landmarks_to_frame(landmarks, crop_box):
+    """Convert normalized crop landmarks to frame coordinates, return (pose_points, foot or None)"""
+    crop_x1, crop_y1, crop_x2, crop_y2 = crop_box
+    crop_w, crop_h = crop_x2 - crop_x1, crop_y2 - crop_y1
+    
+    # Convert landmarks to frame coordinates
+    pose_points = []
+    for lx, ly, visibility in landmarks:
+        x_coord = int(crop_x1 + lx * crop_w)
+        y_coord = int(crop_y1 + ly * crop_h)
+        pose_points.append((x_coord, y_coord, visibility))
+    
+    # Get foot position from ankles (landmarks 27, 28)
+    foot = None
+    if len(landmarks) > 28:
+        left_ankle = landmarks[27]  # LEFT_ANKLE
+        right_ankle = landmarks[28]  # RIGHT_ANKLE
+        
+        if left_ankle[2] > 0.1 or right_ankle[2] > 0.1:
+            ankle = left_ankle if left_ankle[2] >= right_ankle[2] else right_ankle
+            foot = (int(crop_x1 + ankle[0] * crop_w), int(crop_y1 + ankle[1] * crop_h))
+    
+    return pose_points, foot
 
 class SkeletonTracker:
-    def __init__(self):
+    def __init__(self, running_mode='image', pool_size=12):
+        # running_mode 'video': one tracking VIDEO-mode landmarker per player (at most pool_size, LRU)
         self.mediapipe_working = False
         self.pose_landmarker = None
+        self.pose_pool = None
+        self.running_mode = running_mode
+        self.pool_size = pool_size
+        self.landmarker_pool = None
         
         # Try to initialize MediaPipe with local model file
         self._try_initialize_mediapipe()
+        if self.mediapipe_working and running_mode == 'video':
+            model_path = get_pose_model_path()
+            self.landmarker_pool = LandmarkerPool(lambda: create_pose_landmarker(model_path, 'video'), pool_size)
     
     def _try_initialize_mediapipe(self):
         """Initialize MediaPipe with downloaded model file"""
         try:
-            import mediapipe as mp
-            from mediapipe.tasks import python
-            from mediapipe.tasks.python import vision
-            
-            # Path to downloaded model
-            model_path = os.path.join(os.path.dirname(__file__), '..', 'models', 'pose_landmarker_lite.task')
-            model_path = os.path.abspath(model_path)
+            model_path = get_pose_model_path()
             
             if os.path.exists(model_path):
-                base_options = python.BaseOptions(model_asset_path=model_path)
-                options = vision.PoseLandmarkerOptions(
-                    base_options=base_options,
-                    running_mode=vision.RunningMode.IMAGE,
-                    num_poses=1,
-                    min_pose_detection_confidence=0.3,
-                    min_pose_presence_confidence=0.3,
-                    min_tracking_confidence=0.3
-                )
-                
-                self.pose_landmarker = vision.PoseLandmarker.create_from_options(options)
+                # IMAGE-mode landmarker keeps no state between crops, so one warmed instance is shared
+                self.pose_landmarker = get_model_registry().pose_landmarker(model_path)
                 self.mediapipe_working = True
                 print("SUCCESS: MediaPipe initialized with local model")
                 return
@@ -45,67 +124,110 @@ class SkeletonTracker:
         print("Using YOLO bounding box for foot tracking")
         self.mediapipe_working = False
     
+    def start_pose_workers(self, num_workers):
+        """Run pose detection for all players of a frame in a pool of worker processes"""
+        if num_workers <= 0 or not self.mediapipe_working:
+            return False
+        
+        from .pose_worker_pool import PoseWorkerPool
+        try:
+            self.pose_pool = PoseWorkerPool(num_workers, get_pose_model_path(), self.running_mode, self.pool_size)
+            print(f"SUCCESS: Started {num_workers} MediaPipe pose workers")
+            return True
+        except Exception as e:
+            print(f"WARNING: Pose worker pool failed to start, using in-process pose: {e}")
+            self.pose_pool = None
+            return False
+    
+    def close(self):
+        """Stop pose worker processes and close the per-player landmarkers"""
+        if self.pose_pool is not None:
+            self.pose_pool.close()
+            self.pose_pool = None
+        if self.landmarker_pool is not None:
+            self.landmarker_pool.close()
+    
+    def release_players(self, player_ids):
+        """Free the VIDEO-mode landmarkers of retired players for reuse"""
+        if not player_ids:
+            return
+        if self.pose_pool is not None:
+            self.pose_pool.release(player_ids)
+        elif self.landmarker_pool is not None:
+            self.landmarker_pool.release(player_ids)
+    
+    def _detect_landmarks(self, player_crop, player_id=None, timestamp_ms=None):
+        """Run pose detection on one crop, return normalized (x, y, visibility) landmarks or None.
+        
+        With a player ID and timestamp in video mode, the player's own landmarker tracks its pose.
+        """
+        try:
+            if self.landmarker_pool is not None and timestamp_ms is not None:
+                return self.landmarker_pool.detect(player_id, player_crop, timestamp_ms, detect_crop_landmarks)
+            return detect_crop_landmarks(self.pose_landmarker, player_crop)
+        except Exception as e:
+            return None
+    
     def get_foot_position(self, frame, bbox, player_id):
         """Extract foot position and draw skeleton for individual player"""
-        x1, y1, x2, y2 = bbox
-        skeleton_drawn = False
+        result = self.get_foot_positions(frame, [(player_id, bbox)])[0]
+        return result['foot'], result['skeleton']
+    
+    def get_foot_positions(self, frame, players, draw=True, timestamp_ms=None):
+        """Extract foot positions for all players of a frame at once.
         
-        if self.mediapipe_working and self.pose_landmarker is not None:
-            # Crop player region
-            pad = 20
-            crop_x1 = max(0, x1 - pad)
-            crop_y1 = max(0, y1 - pad)
-            crop_x2 = min(frame.shape[1], x2 + pad)
-            crop_y2 = min(frame.shape[0], y2 + pad)
-            
-            player_crop = frame[crop_y1:crop_y2, crop_x1:crop_x2]
+        players is a list of (player_id, bbox). Every crop is taken from the frame
+        before any skeleton is drawn, so the serial and worker-pool paths see the
+        same pixels. Returns one dict per player (same order) with 'player_id',
+        'foot', 'skeleton' and 'landmarks' (frame coordinates, or None).
+        Skeletons are drawn on the frame unless draw=False. timestamp_ms (the
+        frame time) enables per-player tracking in video mode.
+        """
+        crops = [crop_player(frame, bbox) if self.mediapipe_working else None for _, bbox in players]
+        
+        # Detect pose landmarks for every valid crop
+        valid = [i for i, crop in enumerate(crops) if crop is not None]
+        landmark_sets = [None] * len(players)
+        if valid:
+            if timestamp_ms is not None and self.running_mode == 'video':
+                player_ids = [players[i][0] for i in valid]
+            else:
+                player_ids, timestamp_ms = [None] * len(valid), None
+            if self.pose_pool is not None:
+                detected = self.pose_pool.detect([crops[i][0] for i in valid],
+                                                 player_ids=player_ids if timestamp_ms is not None else None,
+                                                 timestamp_ms=timestamp_ms)
+            else:
+                detected = [self._detect_landmarks(crops[i][0], player_id, timestamp_ms)
+                            for i, player_id in zip(valid, player_ids)]
+            for i, landmarks in zip(valid, detected):
+                landmark_sets[i] = landmarks
+        
+        results = []
+        for (player_id, bbox), crop, landmarks in zip(players, crops, landmark_sets):
+            x1, y1, x2, y2 = bbox
+            result = {
+                'player_id': player_id,
+                # Fallback to bottom center of bounding box (YOLO-based foot tracking)
+                'foot': (int((x1 + x2) / 2), y2),
+                'skeleton': False,
+                'landmarks': None
+            }
             
-            if player_crop.size > 0 and player_crop.shape[0] > 30 and player_crop.shape[1] > 20:
-                try:
-                    import mediapipe as mp
-                    
-                    # Convert to MediaPipe Image format
-                    rgb_crop = cv2.cvtColor(player_crop, cv2.COLOR_BGR2RGB)
-                    mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_crop)
-                    
-                    # Detect pose landmarks
-                    detection_result = self.pose_landmarker.detect(mp_image)
-                    
-                    if detection_result.pose_landmarks and len(detection_result.pose_landmarks) > 0:
-                        landmarks = detection_result.pose_landmarks[0]  # First person
-                        crop_w, crop_h = crop_x2 - crop_x1, crop_y2 - crop_y1
-                        
-                        # Convert landmarks to frame coordinates
-                        pose_points = []
-                        for landmark in landmarks:
-                            x_coord = int(crop_x1 + landmark.x * crop_w)
-                            y_coord = int(crop_y1 + landmark.y * crop_h)
-                            pose_points.append((x_coord, y_coord, landmark.visibility))
-                        
-                        # Draw skeleton
-                        self.draw_skeleton(frame, pose_points, player_id)
-                        skeleton_drawn = True
-                        
-                        # Get foot position from ankles (landmarks 27, 28)
-                        if len(landmarks) > 28:
-                            left_ankle = landmarks[27]  # LEFT_ANKLE
-                            right_ankle = landmarks[28]  # RIGHT_ANKLE
-                            
-                            if left_ankle.visibility > 0.1 or right_ankle.visibility > 0.1:
-                                if left_ankle.visibility >= right_ankle.visibility:
-                                    foot_x = int(crop_x1 + left_ankle.x * crop_w)
-                                    foot_y = int(crop_y1 + left_ankle.y * crop_h)
-                                else:
-                                    foot_x = int(crop_x1 + right_ankle.x * crop_w)
-                                    foot_y = int(crop_y1 + right_ankle.y * crop_h)
-                                
-                                return (foot_x, foot_y), skeleton_drawn
+            if landmarks:
+                pose_points, foot = landmarks_to_frame(landmarks, crop[1])
                 
-                except Exception as e:
-                    pass
+                # Draw skeleton
+                if draw:
+                    self.draw_skeleton(frame, pose_points, player_id)
+                result['skeleton'] = True
+                result['landmarks'] = pose_points
+                if foot is not None:
+                    result['foot'] = foot
+            
+            results.append(result)
         
-        # Fallback to bottom center of bounding box (YOLO-based foot tracking)
-        return (int((x1 + x2) / 2), y2), skeleton_drawn
+        return results
     
     def draw_skeleton(self, frame, pose_points, player_id):
         """Draw skeleton with unique color per player"""
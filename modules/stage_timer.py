@@ -0,0 +1,194 @@
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+# Hot-path stages in pipeline order (panel and export list them in this order)
+STAGES = ('decode', 'resize', 'drift', 'detection', 'association', 'pose', 'boundary', 'draw', 'evidence', 'display')
+
+
+class _NullStage:
+    """Context manager that does nothing (shared by every stage of a disabled timer)"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer.add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class StageTimer:
+    def __init__(self, enabled=False, window=600, export_path=None, export_interval=10.0, panel_interval=15,
+                 labels=None):
+        """Per-stage hot-path timers with rolling p50/p95/p99 over the last window frames.
+
+        with timer.stage('detection'): ... adds to the current frame's time of that
+        stage (a stage may be entered several times per frame); end_frame() closes
+        the frame of the calling thread, so pipeline threads each close their own
+        stages. When disabled, stage() returns a shared no-op context and
+        end_frame() returns at once.
+        """
+        self.enabled = enabled
+        self.window = window
+        self.export_path = export_path
+        self.export_interval = export_interval
+        self.panel_interval = panel_interval
+        self.labels = dict(labels or {})
+
+        self.samples = {}  # stage: ring of the last window per-frame times (seconds)
+        self.counts = {}   # stage: frames recorded
+        self.totals = {}   # stage: total seconds
+        self.pending = threading.local()
+        self.lock = threading.Lock()
+        self.frames = 0
+        self.panel_cache = []
+        self.last_export = time.monotonic()
+
+    def stage(self, name):
+        """Context manager timing one stage of the current frame"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def add(self, name, seconds):
+        """Add time to a stage of the calling thread's current frame"""
+        pending = getattr(self.pending, 'times', None)
+        if pending is None:
+            pending = self.pending.times = {}
+        pending[name] = pending.get(name, 0.0) + seconds
+
+    def end_frame(self):
+        """Record the calling thread's stage times of this frame; exports periodically"""
+        if not self.enabled:
+            return
+        pending = getattr(self.pending, 'times', None)
+        if not pending:
+            return
+        self.pending.times = {}
+
+        with self.lock:
+            for name, seconds in pending.items():
+                if name not in self.samples:
+                    self.samples[name] = np.zeros(self.window, dtype=np.float64)
+                    self.counts[name] = 0
+                    self.totals[name] = 0.0
+                self.samples[name][self.counts[name] % self.window] = seconds
+                self.counts[name] += 1
+                self.totals[name] += seconds
+            self.frames = max(self.counts.values())
+            # Checked and claimed under the lock so only one pipeline thread exports
+            export_due = self.export_path and time.monotonic() - self.last_export >= self.export_interval
+            if export_due:
+                self.last_export = time.monotonic()
+
+        if export_due:
+            self.export()
+
+    def stage_names(self):
+        """Recorded stages, known hot-path stages first"""
+        with self.lock:
+            names = list(self.samples)
+        return [name for name in STAGES if name in names] + sorted(name for name in names if name not in STAGES)
+
+    def _snapshot(self):
+        """[(stage, (p50, p95, p99) ms, frames, total seconds)] of every stage, taken together under the lock"""
+        with self.lock:
+            stages = {name: (self.samples[name][:min(self.counts[name], self.window)].copy(),
+                             self.counts[name], self.totals[name]) for name in self.samples}
+        ordered = [name for name in STAGES if name in stages] + sorted(name for name in stages if name not in STAGES)
+        return [(name, tuple(1000.0 * np.percentile(stages[name][0], (50, 95, 99))), stages[name][1], stages[name][2])
+                for name in ordered]
+
+    def percentiles(self, name):
+        """Rolling (p50, p95, p99) of a stage in milliseconds, None if it was never recorded"""
+        with self.lock:
+            if name not in self.samples:
+                return None
+            window = self.samples[name][:min(self.counts[name], self.window)].copy()
+        return tuple(1000.0 * np.percentile(window, (50, 95, 99)))
+
+    def summary(self):
+        """{stage: {'p50_ms', 'p95_ms', 'p99_ms', 'mean_ms', 'frames'}} over the rolling window / whole run"""
+        result = {}
+        for name, (p50, p95, p99), count, total in self._snapshot():
+            result[name] = {
+                'p50_ms': round(p50, 3),
+                'p95_ms': round(p95, 3),
+                'p99_ms': round(p99, 3),
+                'mean_ms': round(1000.0 * total / count, 3),
+                'frames': count
+            }
+        return result
+
+    def panel_lines(self):
+        """Text lines of the on-screen timing panel (recomputed every panel_interval frames)"""
+        if not self.panel_cache or self.frames % self.panel_interval == 0:
+            lines = [f"{'stage':11} {'p50':>6} {'p95':>6} {'p99':>6} ms"]
+            for name, (p50, p95, p99), _, _ in self._snapshot():
+                lines.append(f"{name:11} {p50:6.1f} {p95:6.1f} {p99:6.1f}")
+            self.panel_cache = lines
+        return self.panel_cache
+
+    def prometheus_text(self):
+        """Rolling quantiles and cumulative totals in the Prometheus text exposition format"""
+        base = "".join(f',{key}="{value}"' for key, value in sorted(self.labels.items()))
+        lines = [
+            "# HELP kabadi_stage_seconds Per-frame time of a tracking stage (quantiles over the rolling window)",
+            "# TYPE kabadi_stage_seconds summary"
+        ]
+        for name, quantiles, count, total in self._snapshot():
+            labels = f'stage="{name}"{base}'
+            for quantile, value in zip(('0.5', '0.95', '0.99'), quantiles):
+                lines.append(f'kabadi_stage_seconds{{{labels},quantile="{quantile}"}} {value / 1000.0:.6f}')
+            lines.append(f'kabadi_stage_seconds_sum{{{labels}}} {total:.6f}')
+            lines.append(f'kabadi_stage_seconds_count{{{labels}}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, path=None):
+        """Write the metrics file (atomically, so a scraper never reads a partial file)"""
+        path = path or self.export_path
+        if not path or not self.enabled:
+            return
+        with self.lock:
+            self.last_export = time.monotonic()
+        text = self.prometheus_text()
+        # A temp file of its own per export, so concurrent exports never write into each other's file
+        temp_path = None
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix=os.path.basename(path) + '.',
+                                             suffix='.tmp')
+            os.chmod(temp_path, 0o644)  # mkstemp creates it owner-only; scrapers may run as another user
+            with os.fdopen(fd, 'w') as f:
+                f.write(text)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"⚠️ Could not write metrics file {path}: {e}")
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def report(self):
+        """Print the rolling percentiles of every stage"""
+        if not self.enabled or not self.samples:
+            return
+        stages = ", ".join(f"{name} {s['p50_ms']:.1f}/{s['p95_ms']:.1f}/{s['p99_ms']:.1f}"
+                           for name, s in self.summary().items())
+        print(f"⏱️ Stage p50/p95/p99 ms @ {self.frames} frames: {stages}")
@@ -0,0 +1,131 @@
+import queue
+import threading
+import time
+
+
+class StreamScheduler:
+    def __init__(self, detector, batch_size=4, queue_size=4, report_interval=300):
+        """Feed frames of several camera streams through one shared detector.
+
+        Every stream decodes on its own thread into a small bounded queue. The
+        scheduler builds each inference batch round-robin, taking at most one
+        frame per stream and starting one stream further every batch, so a busy
+        stream can never starve the others. Detections get per-stream track IDs
+        and are handed to the stream's own process function.
+        """
+        self.detector = detector
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.report_interval = report_interval
+        self.streams = []
+        self.next_stream = 0  # Round-robin start position of the next batch
+        self.frame_ready = threading.Event()
+        self.stop_event = threading.Event()
+        self.batches = 0
+        self.inference_time = 0.0
+
+    def add_stream(self, name, read_fn, process_fn, stream_tracker):
+        """Register a stream: read_fn() -> frame or None at the end,
+        process_fn(frame, detections) -> False to stop the stream"""
+        self.streams.append({
+            'name': name,
+            'read': read_fn,
+            'process': process_fn,
+            'tracker': stream_tracker,
+            'frames': queue.Queue(maxsize=self.queue_size),
+            'decoding': True,
+            'active': True,
+            'processed': 0,
+            'thread': None
+        })
+
+    def _decode(self, stream):
+        """Decode thread: read frames of one stream until it ends or is stopped"""
+        try:
+            while stream['active'] and not self.stop_event.is_set():
+                frame = stream['read']()
+                if frame is None:
+                    break
+                while stream['active'] and not self.stop_event.is_set():
+                    try:
+                        stream['frames'].put(frame, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                self.frame_ready.set()
+        finally:
+            stream['decoding'] = False
+            self.frame_ready.set()
+
+    def _next_batch(self):
+        """Take at most one ready frame per stream, round-robin from next_stream"""
+        batch = []
+        count = len(self.streams)
+        for offset in range(count):
+            if len(batch) >= self.batch_size:
+                break
+            stream = self.streams[(self.next_stream + offset) % count]
+            if not stream['active']:
+                continue
+            try:
+                batch.append((stream, stream['frames'].get_nowait()))
+            except queue.Empty:
+                continue
+        if count:
+            self.next_stream = (self.next_stream + 1) % count
+        return batch
+
+    def _finished(self):
+        """True when no stream can deliver any more frames"""
+        return all(not s['active'] or (not s['decoding'] and s['frames'].empty()) for s in self.streams)
+
+    def stop(self):
+        """Stop all streams (decode threads exit, run() returns)"""
+        self.stop_event.set()
+        self.frame_ready.set()
+
+    def report(self):
+        """Print per-stream progress and the shared inference cost"""
+        avg_batch_ms = 1000 * self.inference_time / max(1, self.batches)
+        progress = ', '.join(f"{s['name']}={s['processed']}" for s in self.streams)
+        print(f"📡 Streams @ batch {self.batches}: {progress} | inference {avg_batch_ms:.1f} ms/batch")
+
+    def run(self):
+        """Run until every stream has ended or stop() is called"""
+        for stream in self.streams:
+            stream['thread'] = threading.Thread(target=self._decode, args=(stream,),
+                                                name=f"decode-{stream['name']}", daemon=True)
+            stream['thread'].start()
+
+        try:
+            while not self.stop_event.is_set():
+                self.frame_ready.clear()
+                batch = self._next_batch()
+                if not batch:
+                    if self._finished():
+                        break
+                    self.frame_ready.wait(timeout=0.05)
+                    continue
+
+                # One shared inference for all streams of the batch
+                start = time.perf_counter()
+                boxes = self.detector.detect_batch([frame for _, frame in batch])
+                self.inference_time += time.perf_counter() - start
+                self.batches += 1
+
+                # Per-stream tracking and analysis
+                for (stream, frame), frame_boxes in zip(batch, boxes):
+                    detections = stream['tracker'].update(frame_boxes, frame)
+                    stream['processed'] += 1
+                    if stream['process'](frame, detections) is False:
+                        stream['active'] = False
+
+                if self.report_interval and self.batches % self.report_interval == 0:
+                    self.report()
+        finally:
+            self.stop_event.set()
+            for stream in self.streams:
+                stream['active'] = False
+                if stream['thread'] is not None:
+                    stream['thread'].join(timeout=1.0)
+        self.report()
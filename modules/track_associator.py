@@ -0,0 +1,102 @@
+import numpy as np
+
+# Optimal assignment when SciPy is available, greedy lowest-cost matching otherwise
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:
+    linear_sum_assignment = None
+
+
+def _greedy_assignment(cost, valid):
+    """Match rows to columns in order of increasing cost, each used at most once"""
+    rows, cols = np.nonzero(valid)
+    order = np.argsort(cost[rows, cols], kind='stable')
+    used_rows, used_cols, matches = set(), set(), []
+    for k in order:
+        r, c = rows[k], cols[k]
+        if r in used_rows or c in used_cols:
+            continue
+        used_rows.add(r)
+        used_cols.add(c)
+        matches.append((r, c))
+    return matches
+
+
+def _solve(cost, valid):
+    """Globally assign rows to columns over the valid (gated) pairs"""
+    if not valid.any():
+        return []
+    if linear_sum_assignment is None:
+        return _greedy_assignment(cost, valid)
+    # Gated pairs get a cost no valid assignment can beat, then are filtered out
+    big = cost[valid].max() * (min(cost.shape) + 1) + 1.0
+    rows, cols = linear_sum_assignment(np.where(valid, cost, big))
+    return [(r, c) for r, c in zip(rows, cols) if valid[r, c]]
+
+
+class TrackAssociator:
+    def __init__(self, max_distance=150, overlap_ratio=0.3):
+        """Frame-level association of all detections with all tracks"""
+        self.max_distance = max_distance
+        self.overlap_ratio = overlap_ratio
+
+    def associate(self, det_centers, det_boxes, det_yolo_ids, track_ids, track_predictions, track_boxes, yolo_index):
+        """Match every detection of a frame to at most one track.
+
+        Matching order is the same as the per-detection logic it replaces:
+        1. YOLO ID already mapped to a track (O(1) through yolo_index)
+        2. Distance to the Kalman-predicted position (< max_distance), solved globally
+        3. Bounding box overlap (> overlap_ratio of the smaller box)
+        Returns the matched track ID (or None for a new player) per detection.
+        """
+        num_dets = len(det_centers)
+        matches = [None] * num_dets
+        if num_dets == 0:
+            return matches
+
+        track_slot = {stable_id: i for i, stable_id in enumerate(track_ids)}
+        free_tracks = np.ones(len(track_ids), dtype=bool)
+
+        # 1. YOLO ID reverse index
+        for j, yolo_id in enumerate(det_yolo_ids):
+            stable_id = yolo_index.get(yolo_id)
+            slot = track_slot.get(stable_id)
+            if slot is not None and free_tracks[slot]:
+                matches[j] = stable_id
+                free_tracks[slot] = False
+
+        if not free_tracks.any():
+            return matches
+
+        # 2. Distance to predicted positions
+        dets = np.array([j for j in range(num_dets) if matches[j] is None])
+        tracks = np.flatnonzero(free_tracks)
+        if len(dets) > 0:
+            centers = np.asarray(det_centers, dtype=np.float64)[dets]
+            predictions = np.asarray(track_predictions, dtype=np.float64).reshape(-1, 2)[tracks]
+            distance = np.sqrt(((centers[:, None, :] - predictions[None, :, :]) ** 2).sum(axis=2))
+            for r, c in _solve(distance, distance < self.max_distance):
+                matches[dets[r]] = track_ids[tracks[c]]
+                free_tracks[tracks[c]] = False
+
+        # 3. Bounding box overlap with remaining tracks (prevent duplicates)
+        dets = np.array([j for j in range(num_dets) if matches[j] is None])
+        tracks = np.flatnonzero(free_tracks)
+        if len(dets) > 0 and len(tracks) > 0:
+            boxes = np.asarray(det_boxes, dtype=np.float64)[dets]
+            existing = np.asarray(track_boxes, dtype=np.float64).reshape(-1, 4)[tracks]
+            overlap_x = np.clip(np.minimum(boxes[:, None, 2], existing[None, :, 2]) -
+                                np.maximum(boxes[:, None, 0], existing[None, :, 0]), 0, None)
+            overlap_y = np.clip(np.minimum(boxes[:, None, 3], existing[None, :, 3]) -
+                                np.maximum(boxes[:, None, 1], existing[None, :, 1]), 0, None)
+            current_area = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+            existing_area = (existing[:, 2] - existing[:, 0]) * (existing[:, 3] - existing[:, 1])
+            min_area = np.minimum(current_area[:, None], existing_area[None, :])
+            overlap_area = overlap_x * overlap_y
+            # Larger overlap is better, so use the uncovered fraction as cost
+            ratio = overlap_area / np.maximum(min_area, 1e-9)
+            for r, c in _solve(1.0 - ratio, overlap_area > self.overlap_ratio * min_area):
+                matches[dets[r]] = track_ids[tracks[c]]
+                free_tracks[tracks[c]] = False
+
+        return matches
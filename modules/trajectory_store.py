@@ -0,0 +1,312 @@
+import os
+import queue
+import threading
+
+import numpy as np
+
+# Where a stored foot point came from (foot_source column codes)
+FOOT_SOURCES = ('bbox', 'pose', 'kalman')
+NUM_LANDMARKS = 33
+
+# One exported row: display-space bbox/center/foot of a track in one frame
+ROW_DTYPE = np.dtype([
+    ('track', '<i4'),
+    ('frame', '<i4'),
+    ('yolo_id', '<i4'),
+    ('bbox', '<i2', (4,)),
+    ('center', '<f4', (2,)),
+    ('foot', '<i2', (2,)),
+    ('foot_source', 'u1'),
+    ('violation', '?')
+])
+LANDMARK_DTYPE = np.dtype(('<f2', (NUM_LANDMARKS, 3)))  # x, y relative to the bbox (0..1), visibility
+
+
+def foot_source(player):
+    """foot_source code of a frame_players entry"""
+    return 2 if player['predicted'] else 1 if player['skeleton'] else 0
+
+
+class TrajectoryStore:
+    def __init__(self, max_tracks=32, memory_mb=64.0, landmarks=False, export_path=None, export_interval=30):
+        """Bounded per-player history of tracked positions in preallocated NumPy columns.
+
+        Every column is a (max_tracks, history) ring array, one row of slots
+        per track, with history sized so the whole store stays within
+        memory_mb. A new track takes a free slot or the one of the track seen
+        least recently. Queries (path, speed, distance) work on whole columns.
+        With export_path, new rows are copied out every export_interval frames
+        and appended to export_path + '.rows' by a writer thread; close() packs
+        them into export_path (.npz, one array per column, sorted by frame).
+        """
+        self.max_tracks = max_tracks
+        self.landmarks = landmarks
+        row_bytes = ROW_DTYPE.itemsize - ROW_DTYPE['track'].itemsize + (LANDMARK_DTYPE.itemsize if landmarks else 0)
+        self.history = max(2, int(memory_mb * 1024 * 1024 / (max_tracks * row_bytes)))
+
+        shape = (max_tracks, self.history)
+        self.frame = np.full(shape, -1, dtype=np.int32)
+        self.yolo_id = np.zeros(shape, dtype=np.int32)
+        self.bbox = np.zeros(shape + (4,), dtype=np.int16)
+        self.center = np.zeros(shape + (2,), dtype=np.float32)
+        self.foot = np.zeros(shape + (2,), dtype=np.int16)
+        self.foot_source = np.zeros(shape, dtype=np.uint8)
+        self.violation = np.zeros(shape, dtype=bool)
+        self.pose = np.zeros(shape + (NUM_LANDMARKS, 3), dtype=np.float16) if landmarks else None
+
+        self.slots = {}  # track ID -> slot
+        self.slot_tracks = np.full(max_tracks, -1, dtype=np.int64)
+        self.written = np.zeros(max_tracks, dtype=np.int64)  # Rows ever written to the slot (head = written % history)
+        self.last_frame = np.full(max_tracks, -1, dtype=np.int64)
+        self.evicted = 0
+
+        self.export_path = export_path
+        self.export_interval = export_interval
+        self.exported = np.zeros(max_tracks, dtype=np.int64)  # Rows of the slot handed to the writer
+        self.exported_rows = 0
+        self.lost_rows = 0  # Overwritten or evicted before they were exported
+        self.last_flush = None
+        self.writer = None
+        if export_path:
+            directory = os.path.dirname(export_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.rows_file = open(export_path + '.rows', 'wb')
+            self.landmarks_file = open(export_path + '.landmarks', 'wb') if landmarks else None
+            self.queue = queue.Queue(maxsize=64)
+            self.writer = threading.Thread(target=self._write_loop, name='trajectory-export', daemon=True)
+            self.writer.start()
+
+    @property
+    def memory_mb(self):
+        columns = [self.frame, self.yolo_id, self.bbox, self.center, self.foot, self.foot_source, self.violation]
+        if self.pose is not None:
+            columns.append(self.pose)
+        return sum(column.nbytes for column in columns) / (1024 * 1024)
+
+    def _slot(self, track_id, frame_number):
+        """Slot of a track, taking a free one or evicting the track seen least recently"""
+        slot = self.slots.get(track_id)
+        if slot is not None:
+            self.last_frame[slot] = frame_number
+            return slot
+        if len(self.slots) < self.max_tracks:
+            slot = int(np.flatnonzero(self.slot_tracks < 0)[0])
+        else:
+            slot = int(np.argmin(self.last_frame))
+            if self.writer is not None:
+                # The evicted history still goes to the export (if the writer keeps up: the slot is reused)
+                self._export(self._pending(np.array([slot])), evicted=True)
+            del self.slots[int(self.slot_tracks[slot])]
+            self.evicted += 1
+        self.slots[track_id] = slot
+        self.slot_tracks[slot] = track_id
+        self.written[slot] = self.exported[slot] = 0
+        self.frame[slot] = -1
+        self.last_frame[slot] = frame_number
+        return slot
+
+    def record(self, frame_number, players):
+        """Append the frame_players of a frame (one row per player, at most max_tracks)"""
+        if players:
+            players = players[:self.max_tracks]
+            slots = np.array([self._slot(player['stable_id'], frame_number) for player in players])
+            rows = self.written[slots] % self.history
+            bbox = np.array([player['bbox'] for player in players], dtype=np.float32)
+            self.frame[slots, rows] = frame_number
+            self.yolo_id[slots, rows] = [player['yolo_id'] if player['yolo_id'] is not None else -1
+                                         for player in players]
+            self.bbox[slots, rows] = np.clip(bbox, -32768, 32767)
+            self.center[slots, rows] = (bbox[:, :2] + bbox[:, 2:]) / 2
+            self.foot[slots, rows] = np.clip([player['foot'] for player in players], -32768, 32767)
+            self.foot_source[slots, rows] = [foot_source(player) for player in players]
+            self.violation[slots, rows] = [player['violation'] for player in players]
+            if self.pose is not None:
+                self.pose[slots, rows] = 0
+                posed = [i for i, player in enumerate(players)
+                         if player['landmarks'] and len(player['landmarks']) >= NUM_LANDMARKS]
+                if posed:
+                    points = np.array([players[i]['landmarks'][:NUM_LANDMARKS] for i in posed], dtype=np.float32)
+                    origin, size = bbox[posed, None, :2], np.maximum(bbox[posed, None, 2:] - bbox[posed, None, :2], 1)
+                    points[:, :, :2] = (points[:, :, :2] - origin) / size
+                    self.pose[slots[posed], rows[posed]] = points
+            self.written[slots] += 1
+
+        if self.writer is not None and (self.last_flush is None or
+                                        frame_number - self.last_flush >= self.export_interval):
+            self.last_flush = frame_number
+            self._export(self._pending(np.flatnonzero(self.written > self.exported)))
+
+    # Queries
+
+    def _chronological(self, slots):
+        """(len(slots), history) row indices of each slot from oldest to newest and their validity"""
+        count = np.minimum(self.written[slots], self.history)
+        offsets = np.arange(self.history)
+        rows = (self.written[slots, None] - count[:, None] + offsets) % self.history
+        return rows, offsets < count[:, None]
+
+    def track_ids(self):
+        """Tracks with history in the store"""
+        return sorted(self.slots)
+
+    def path(self, track_id, start=None, end=None, landmarks=False):
+        """Rows of a track in frames [start, end] (oldest first): dict of column arrays, None if unknown"""
+        slot = self.slots.get(track_id)
+        if slot is None:
+            return None
+        rows, valid = self._chronological(np.array([slot]))
+        rows = rows[0, valid[0]]
+        frames = self.frame[slot, rows]
+        first = 0 if start is None else np.searchsorted(frames, start, side='left')
+        last = len(frames) if end is None else np.searchsorted(frames, end, side='right')
+        rows = rows[first:last]
+        path = {
+            'frame': frames[first:last],
+            'yolo_id': self.yolo_id[slot, rows],
+            'bbox': self.bbox[slot, rows],
+            'center': self.center[slot, rows],
+            'foot': self.foot[slot, rows],
+            'foot_source': self.foot_source[slot, rows],
+            'violation': self.violation[slot, rows]
+        }
+        if landmarks and self.pose is not None:
+            path['landmarks'] = self.pose[slot, rows]
+        return path
+
+    def speed(self, track_id, start=None, end=None, fps=None, point='foot'):
+        """(frames, speeds) of a track between consecutive rows, in pixels per frame (per second with fps)"""
+        path = self.path(track_id, start, end)
+        if path is None or len(path['frame']) < 2:
+            return np.zeros(0, dtype=np.int32), np.zeros(0)
+        positions = path[point].astype(np.float64)
+        steps = np.linalg.norm(np.diff(positions, axis=0), axis=1) / np.diff(path['frame'])
+        return path['frame'][1:], steps * fps if fps else steps
+
+    def distance(self, track_id, start=None, end=None, point='foot'):
+        """Pixels a track moved in frames [start, end]"""
+        return self.distances(start, end, point).get(track_id, 0.0)
+
+    def distances(self, start=None, end=None, point='foot'):
+        """{track_id: pixels moved in frames [start, end]} of every track, computed over all slots at once"""
+        slots = np.array(sorted(self.slots.values()), dtype=np.int64)
+        if len(slots) == 0:
+            return {}
+        rows, valid = self._chronological(slots)
+        frames = self.frame[slots[:, None], rows]
+        if start is not None:
+            valid &= frames >= start
+        if end is not None:
+            valid &= frames <= end
+        positions = getattr(self, point)[slots[:, None], rows].astype(np.float64)
+        steps = np.linalg.norm(np.diff(positions, axis=1), axis=2)
+        totals = np.where(valid[:, 1:] & valid[:, :-1], steps, 0.0).sum(axis=1)
+        return {int(self.slot_tracks[slot]): float(total) for slot, total in zip(slots, totals)}
+
+    # Export
+
+    def _pending(self, slots):
+        """Rows of the slots not handed to the writer yet, as (ROW_DTYPE array, landmarks or None)"""
+        pending = self.written[slots] - self.exported[slots]
+        lost = np.maximum(pending - self.history, 0)
+        self.lost_rows += int(lost.sum())
+        pending -= lost
+        self.exported[slots] = self.written[slots]
+        slots, pending = slots[pending > 0], pending[pending > 0]
+        total = int(pending.sum())
+        if total == 0:
+            return None
+
+        # Flat (slot, row) index of every pending row, oldest first per slot
+        row_slots = np.repeat(slots, pending)
+        offsets = np.arange(total) - np.repeat(np.cumsum(pending) - pending, pending)
+        rows = (self.written[row_slots] - np.repeat(pending, pending) + offsets) % self.history
+        chunk = np.empty(total, dtype=ROW_DTYPE)
+        chunk['track'] = self.slot_tracks[row_slots]
+        chunk['frame'] = self.frame[row_slots, rows]
+        chunk['yolo_id'] = self.yolo_id[row_slots, rows]
+        chunk['bbox'] = self.bbox[row_slots, rows]
+        chunk['center'] = self.center[row_slots, rows]
+        chunk['foot'] = self.foot[row_slots, rows]
+        chunk['foot_source'] = self.foot_source[row_slots, rows]
+        chunk['violation'] = self.violation[row_slots, rows]
+        return chunk, self.pose[row_slots, rows] if self.pose is not None else None
+
+    def _export(self, job, block=False, evicted=False):
+        """Hand a chunk to the writer thread (a full queue keeps it pending until the next flush)
+
+        The rows of an evicted slot cannot stay pending, so with a full queue they are lost.
+        """
+        if job is None:
+            return
+        try:
+            self.queue.put(job, block=block)
+        except queue.Full:
+            if evicted:
+                self.lost_rows += len(job[0])
+                return
+            # Put the rows back: the slots are re-exported from their oldest unexported row
+            tracks, counts = np.unique(job[0]['track'], return_counts=True)
+            for track_id, count in zip(tracks, counts):
+                self.exported[self.slots[int(track_id)]] -= count
+
+    def _write_loop(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                break
+            rows, landmarks = job
+            try:
+                rows.tofile(self.rows_file)
+                if landmarks is not None:
+                    landmarks.tofile(self.landmarks_file)
+                self.exported_rows += len(rows)
+            except OSError as e:
+                print(f"❌ Trajectory export error: {e}")
+
+    def get_stats(self):
+        stats = {
+            'tracks': len(self.slots),
+            'history_frames': self.history,
+            'memory_mb': round(self.memory_mb, 2),
+            'rows': int(np.minimum(self.written, self.history).sum()),
+            'evicted_tracks': self.evicted
+        }
+        if self.export_path:
+            stats.update(exported_rows=self.exported_rows, lost_rows=self.lost_rows, path=self.export_path)
+        return stats
+
+    def close(self):
+        """Export the remaining rows and pack the export into export_path"""
+        if self.writer is None:
+            return
+        self._export(self._pending(np.flatnonzero(self.written > self.exported)), block=True)
+        self.queue.put(None)
+        self.writer.join()
+        self.writer = None
+        self.rows_file.close()
+        if self.landmarks_file is not None:
+            self.landmarks_file.close()
+
+        rows = np.fromfile(self.export_path + '.rows', dtype=ROW_DTYPE)
+        order = np.lexsort((rows['track'], rows['frame']))
+        columns = {name: rows[name][order] for name in ROW_DTYPE.names}
+        if self.landmarks_file is not None:
+            columns['landmarks'] = np.fromfile(self.export_path + '.landmarks', dtype=LANDMARK_DTYPE)[order]
+        save_trajectories(self.export_path, columns)
+        os.remove(self.export_path + '.rows')
+        if self.landmarks_file is not None:
+            os.remove(self.export_path + '.landmarks')
+        print(f"🧭 Trajectories of {len(np.unique(columns['track']))} players ({len(order)} rows) "
+              f"saved to {self.export_path}")
+
+
+def save_trajectories(path, columns):
+    """Write trajectory columns (ROW_DTYPE names, optional landmarks) as an .npz file"""
+    np.savez(path, foot_sources=np.array(FOOT_SOURCES), **columns)
+
+
+def load_trajectories(path):
+    """Columns of an exported trajectory file as a dict of arrays"""
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
@@ -1,10 +1,62 @@
 import cv2
 import numpy as np
-from ultralytics import YOLO
+
+from .model_registry import get_model_registry
+
+
+def boxes_to_detections(xyxy_boxes, track_ids, confidences, frame_shape, conf_threshold=0.5):
+    """Convert tracked YOLO boxes into detection dicts clipped to the frame"""
+    detections = []
+    for bbox, yolo_id, conf in zip(xyxy_boxes, track_ids, confidences):
+        if conf < conf_threshold:  # Skip low confidence detections
+            continue
+
+        x1, y1, x2, y2 = map(int, bbox)
+
+        # Ensure bbox is within frame
+        x1 = max(0, x1)
+        y1 = max(0, y1)
+        x2 = min(frame_shape[1], x2)
+        y2 = min(frame_shape[0], y2)
+
+        if x2 > x1 and y2 > y1:  # Valid bbox
+            center_x = int((x1 + x2) / 2)
+            center_y = int((y1 + y2) / 2)
+
+            detections.append({
+                'bbox': (x1, y1, x2, y2),
+                'center': (center_x, center_y),
+                'yolo_id': int(yolo_id),
+                'confidence': float(conf)
+            })
+    return detections
+
+
+class BoxArray:
+    def __init__(self, data):
+        """Detections as an (N, 6) array of x1, y1, x2, y2, conf, cls, shaped like ultralytics numpy Boxes"""
+        self.data = np.asarray(data, dtype=np.float32).reshape(-1, 6)
+
+    def __len__(self):
+        return len(self.data)
+
+    @property
+    def xyxy(self):
+        return self.data[:, :4]
+
+    @property
+    def conf(self):
+        return self.data[:, 4]
+
+    @property
+    def cls(self):
+        return self.data[:, 5]
+
 
 class YOLODetector:
-    def __init__(self):
-        self.model = YOLO('yolov8n.pt')
+    def __init__(self, model=None):
+        # Pass an existing YOLO model to share it (e.g. between camera streams), else the registry's
+        self.model = model if model is not None else get_model_registry().detector()
         
     def detect_players(self, frame, conf_threshold=0.5):
         """Detect players using YOLO and return bounding boxes with tracking IDs"""
@@ -26,26 +78,45 @@ class YOLODetector:
                 xyxy_boxes = boxes.xyxy.cpu().numpy()
                 track_ids = boxes.id.int().cpu().tolist()
                 confidences = boxes.conf.float().cpu().tolist()
-                
-                for bbox, yolo_id, conf in zip(xyxy_boxes, track_ids, confidences):
-                    if conf >= conf_threshold:
-                        x1, y1, x2, y2 = map(int, bbox)
-                        
-                        # Ensure bbox is within frame
-                        x1 = max(0, x1)
-                        y1 = max(0, y1)
-                        x2 = min(frame.shape[1], x2)
-                        y2 = min(frame.shape[0], y2)
-                        
-                        if x2 > x1 and y2 > y1:  # Valid bbox
-                            center_x = int((x1 + x2) / 2)
-                            center_y = int((y1 + y2) / 2)
-                            
-                            detections.append({
-                                'bbox': (x1, y1, x2, y2),
-                                'center': (center_x, center_y),
-                                'yolo_id': yolo_id,
-                                'confidence': conf
-                            })
+                detections = boxes_to_detections(xyxy_boxes, track_ids, confidences, frame.shape, conf_threshold)
+
+        return detections
+
+    def detect_batch(self, frames, conf_threshold=0.5):
+        """Run one batched inference over several frames (no tracking), return the boxes of each frame"""
+        if not frames:
+            return []
+        results = self.model.predict(
+            frames,
+            classes=[0],  # Only detect persons
+            conf=conf_threshold,
+            iou=0.7,
+            verbose=False
+        )
+        return [result.boxes.cpu().numpy() for result in results]
+
+
+class StreamTracker:
+    def __init__(self, frame_rate=30, tracker_config="bytetrack.yaml"):
+        """Per-stream ByteTrack state for detections from a shared (batched) model.
+
+        model.track(persist=True) keeps one tracker per model, so streams sharing
+        a model each need their own tracker instance.
+        """
+        from ultralytics.trackers.byte_tracker import BYTETracker
+        from ultralytics.utils import IterableSimpleNamespace, yaml_load
+        from ultralytics.utils.checks import check_yaml
         
-        return detections
\ No newline at end of file
+        args = IterableSimpleNamespace(**yaml_load(check_yaml(tracker_config)))
+        self.tracker = BYTETracker(args=args, frame_rate=frame_rate)
+
+    def update(self, boxes, frame, conf_threshold=0.5):
+        """Assign track IDs to one frame's boxes, return detection dicts"""
+        if len(boxes) == 0:
+            # Same as model.track(): empty frames do not advance the tracker
+            return []
+        tracks = self.tracker.update(boxes, frame)
+        if len(tracks) == 0:
+            return []
+        # Track rows: x1, y1, x2, y2, track_id, score, cls, detection index
+        return boxes_to_detections(tracks[:, :4], tracks[:, 4].astype(int), tracks[:, 5], frame.shape, conf_threshold)
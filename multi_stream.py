@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Kabadi Player Tracking System - Multi-Stream Runner
+Runs several courts/cameras through one shared YOLO model with batched
+inference. Each stream keeps its own tracker, boundary config and evidence.
+
+Usage: python multi_stream.py [--streams streams.json] [--show] [--max-frames N]
+"""
+
+import argparse
+import json
+import os
+
+import cv2
+
+from video_config import get_multi_stream_config, get_detector_config, get_events_config
+from player_tracker import PlayerTracker, open_tracking_video, resize_frame, create_renderer, frame_overlay
+from modules.yolo_detector import YOLODetector, StreamTracker
+from modules.stream_scheduler import StreamScheduler
+from modules.model_registry import get_model_registry
+from modules.event_bus import create_event_bus
+
+
+def parse_args(argv=None):
+    multi_config = get_multi_stream_config()
+    parser = argparse.ArgumentParser(description="Track several kabadi courts with one shared YOLO model")
+    parser.add_argument('--streams', default=multi_config['config_path'], help="JSON file listing the streams")
+    parser.add_argument('--batch-size', type=int, default=multi_config['batch_size'],
+                        help="Max frames per shared inference (one per stream)")
+    parser.add_argument('--width', type=int, default=1280, help="Processing width in pixels")
+    parser.add_argument('--max-frames', type=int, default=0, help="Stop each stream after N frames (0 = whole video)")
+    parser.add_argument('--show', action='store_true', help="Show one annotated window per stream")
+    parser.add_argument('--no-evidence', action='store_true', help="Do not write screenshots/clips")
+    return parser.parse_args(argv)
+
+
+def load_streams(path):
+    """Read the stream list: [{"name", "video", "config", "output_dir"}, ...]"""
+    with open(path, 'r') as f:
+        streams = json.load(f)['streams']
+    for i, stream in enumerate(streams):
+        stream.setdefault('name', f"stream{i + 1}")
+        stream.setdefault('config', 'config.json')
+        stream.setdefault('output_dir', f"violations/{stream['name']}")
+    return streams
+
+
+def make_stream_callbacks(name, cap, tracker, args, scheduler):
+    """Frame reader and per-frame processing for one stream"""
+    state = {'frames': 0}
+    # One window per stream, driven by the scheduler thread; the renderer only composites
+    renderer = create_renderer(tracker, enabled=False)
+
+    def read():
+        if args.max_frames and state['frames'] >= args.max_frames:
+            return None
+        with tracker.timer.stage('decode'):
+            ret, frame = cap.read()
+        if not ret:
+            return None
+        state['frames'] += 1
+        with tracker.timer.stage('resize'):
+            frame = resize_frame(frame, args.width)
+        tracker.timer.end_frame()
+        return frame
+
+    def process(frame, detections):
+        frame, violations = tracker.process_frame(frame, detections)
+        if args.show:
+            with tracker.timer.stage('draw'):
+                renderer.compose(frame, frame_overlay(tracker, violations))
+            with tracker.timer.stage('display'):
+                cv2.imshow(f"Kabadi - {name}", frame)
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    scheduler.stop()
+        tracker.timer.end_frame()
+        return True
+
+    return read, process
+
+
+def main():
+    args = parse_args()
+    streams = load_streams(args.streams)
+    multi_config = get_multi_stream_config()
+
+    # One model for all streams
+    shared_model = get_model_registry().detector(get_detector_config())
+    detector = YOLODetector(model=shared_model)
+    scheduler = StreamScheduler(detector, batch_size=args.batch_size, queue_size=multi_config['queue_size'])
+    # One event stream for all courts, every event tagged with its stream name
+    event_bus = create_event_bus(**get_events_config())
+
+    opened = []
+    for stream in streams:
+        print(f"📹 Stream {stream['name']}: {stream['video']} (boundary: {stream['config']})")
+        tracker = PlayerTracker(annotate=args.show, record_evidence=not args.no_evidence,
+                                config_path=stream['config'], output_dir=stream['output_dir'],
+                                yolo_model=shared_model, event_bus=event_bus)
+        tracker.event_fields['stream'] = stream['name']
+        # One metrics series (and file) per stream
+        tracker.timer.labels['stream'] = stream['name']
+        if tracker.timer.export_path:
+            root, ext = os.path.splitext(tracker.timer.export_path)
+            tracker.timer.export_path = f"{root}_{stream['name']}{ext}"
+        cap = open_tracking_video(tracker, stream['video'], target_width=args.width)
+        if cap is None:
+            tracker.close()
+            continue
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30
+        read, process = make_stream_callbacks(stream['name'], cap, tracker, args, scheduler)
+        scheduler.add_stream(stream['name'], read, process, StreamTracker(frame_rate=int(round(fps))))
+        opened.append((cap, tracker))
+
+    if not opened:
+        print("Error: No stream could be opened")
+        event_bus.close()
+        return
+
+    print(f"Starting {len(opened)} streams...")
+    if args.show:
+        print("Press 'q' to quit")
+    scheduler.run()
+
+    for cap, tracker in opened:
+        cap.release()
+        tracker.close()
+    event_bus.close()
+    cv2.destroyAllWindows()
+    print("Multi-stream tracking completed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,151 @@
 import cv2
-import json
 import numpy as np
-from ultralytics import YOLO
 from collections import defaultdict
-import math
 import os
+import sys
+import time
 from datetime import datetime
-from video_config import get_player_tracking_video, get_frame_config
+from video_config import (get_player_tracking_video, get_frame_config, get_pipeline_config, get_pose_config,
+                          get_evidence_config, get_stride_config, get_roi_config, get_preprocess_config,
+                          get_timing_config, get_pose_gate_config, get_detector_config,
+                          get_display_config, get_events_config, get_drift_config,
+                          get_trajectory_config)
 from modules.skeleton_tracker import SkeletonTracker
-from modules.kalman_tracker import KalmanTracker
+from modules.kalman_tracker import KalmanBank
+from modules.frame_pipeline import FramePipeline
+from modules.frame_ring import create_frame_ring
+from modules.evidence_writer import EvidenceWriter
+from modules.court_model import CourtModel, BOUNDARY_LINE
+from modules.track_associator import TrackAssociator
+from modules.yolo_detector import boxes_to_detections, StreamTracker
+from modules.roi_detector import BoundaryROIDetector
+from modules.frame_preprocessor import FramePreprocessor, INTERPOLATIONS, transform_points, transform_boxes
+from modules.detection_stride import DetectionStride
+from modules.stage_timer import StageTimer
+from modules.pose_gate import PoseGate
+from modules.model_registry import get_model_registry
+from modules.display_renderer import DisplayRenderer
+from modules.event_bus import create_event_bus
+from modules.boundary_drift import BoundaryDriftTracker, ALIGNED, TOO_LARGE
+from modules.trajectory_store import TrajectoryStore
 
 class PlayerTracker:
-    def __init__(self):
-        # Load YOLO model
-        self.yolo_model = YOLO('yolov8n.pt')
+    def __init__(self, annotate=True, record_evidence=True, config_path='config.json', output_dir='violations',
+                 yolo_model=None, detection_stride=None, roi_detection=None, timing=None, pose_gating=None,
+                 event_bus=None, drift_tracking=None, trajectories=None, trajectory_export=None):
+        # annotate=False leaves evidence unannotated, record_evidence=False skips screenshots/clips
+        self.annotate = annotate
+        self.record_evidence = record_evidence
+        self.output_dir = output_dir
+        self.frame_players = []  # Per-player results of the last analyzed frame
         
-        # Initialize MediaPipe skeleton tracker
-        self.skeleton_tracker = SkeletonTracker()
+        # Structured events for subscribers (pass a shared bus to publish several trackers on one set of sinks)
+        self.owns_event_bus = event_bus is None
+        self.events = create_event_bus(**get_events_config()) if event_bus is None else event_bus
+        self.event_fields = {}  # Added to every event of this tracker (e.g. the stream name)
         
-        # Load boundary configuration
+        # Per-stage hot-path timers (no-ops unless enabled)
+        timing_config = get_timing_config()
+        if timing is not None:
+            timing_config['enabled'] = timing
+        self.show_timing_panel = timing_config.pop('panel') and timing_config['enabled']
+        self.timer = StageTimer(**timing_config)
+        
+        # Shared, already warmed YOLO model of the configured backend unless one is passed in
+        # (e.g. by the multi-stream runner); a registry model starts with fresh ByteTrack IDs
+        if yolo_model is None:
+            yolo_model = get_model_registry().detector(get_detector_config())
+            get_model_registry().reset_tracking(yolo_model)
+        self.yolo_model = yolo_model
+        
+        # Initialize MediaPipe skeleton tracker (pose crops from the 'display' or 'native' frame)
+        pose_config = get_pose_config()
+        self.skeleton_tracker = SkeletonTracker(running_mode=pose_config['running_mode'],
+                                                pool_size=pose_config['landmarker_pool'])
+        self.pose_source = get_preprocess_config()['pose_source']
+        self.skeleton_tracker.start_pose_workers(pose_config['workers'])
+        self.video_fps = get_frame_config()['fps']  # Frame timestamps of VIDEO-mode pose (set from the video)
+        
+        # Pose only for players near the boundary (bbox foot for the rest)
+        pose_gate_config = get_pose_gate_config()
+        if pose_gating is None:
+            pose_gating = pose_gate_config['enabled']
+        del pose_gate_config['enabled']
+        self.pose_gate = PoseGate(**pose_gate_config) if pose_gating else None
+        
+        # Load boundary and court line configuration
+        self.court = CourtModel()
         try:
-            with open('config.json', 'r') as f:
-                config = json.load(f)
-                self.original_boundary_points = config['boundary_points']
-                self.boundary_points = []
-                print(f"SUCCESS: Loaded {len(self.original_boundary_points)} boundary points")
+            self.court.load_config(config_path)
+            self.original_boundary_points = self.court.lines[BOUNDARY_LINE]['points']
+            self.boundary_points = []
+            print(f"SUCCESS: Loaded {len(self.original_boundary_points)} boundary points")
+            if len(self.court.line_names) > 1:
+                print(f"SUCCESS: Loaded court lines: {', '.join(self.court.line_names[1:])}")
         except Exception as e:
             print(f"ERROR: Loading boundary points: {e}")
             self.original_boundary_points = []
             self.boundary_points = []
         
+        # Camera drift since the court lines were set up, re-registered in the background
+        drift_config = get_drift_config()
+        if drift_tracking is None:
+            drift_tracking = drift_config['enabled']
+        del drift_config['enabled']
+        self.court_drift = np.eye(3)  # Setup frame -> current frame (original video coordinates)
+        self.court_base = None  # (config -> frame matrix without the drift, frame size) of the compiled lines
+        self.drift_state = ALIGNED
+        self.drift_tracker = None
+        if drift_tracking and self.court.lines:
+            self.drift_tracker = BoundaryDriftTracker(points=self.original_boundary_points, **drift_config)
+            reference = cv2.imread(self.court.reference_frame) if self.court.reference_frame else None
+            if reference is not None:
+                self.drift_tracker.set_reference(reference)
+            else:
+                print("⚠️ No saved setup frame (run line_detection.py again), drift is measured from the first frame")
+        
+        # Bounded history of every player's positions (stable_players only has the latest)
+        trajectory_config = get_trajectory_config()
+        if trajectories is None:
+            trajectories = trajectory_config['enabled'] or trajectory_export is not None
+        del trajectory_config['enabled']
+        if trajectory_export is not None:
+            trajectory_config['export_path'] = trajectory_export
+        self.trajectories = TrajectoryStore(**trajectory_config) if trajectories else None
+        if self.trajectories is not None:
+            print(f"🧭 Trajectory history: {self.trajectories.history} frames for up to "
+                  f"{self.trajectories.max_tracks} players ({self.trajectories.memory_mb:.1f} MB)")
+        
         # Player tracking with Kalman filters
         self.stable_players = {}
-        self.kalman_filters = {}  # Store Kalman filter for each player
+        self.kalman_bank = KalmanBank()  # Kalman filters of all players, predicted in one batch
+        self.last_predict_frame = 0
         self.next_stable_id = 1
         self.max_distance = 150
+        self.yolo_index = {}  # yolo_id -> stable_id reverse index
+        self.associator = TrackAssociator(max_distance=self.max_distance)
         self.max_frames_missing = 60
         
+        # Full detection every stride-th frame, Kalman predictions in between
+        stride_config = get_stride_config()
+        if detection_stride is not None:
+            stride_config['stride'] = detection_stride
+        self.detection_stride = DetectionStride(**stride_config)
+        
+        # Detection cache: 'record' stores detections/poses of every frame, 'replay' reads them instead of the models
+        self.detection_cache = None
+        self.cache_mode = None
+        
+        # Boundary-band ROI detection with its own ByteTrack state (full frame every few frames)
+        roi_config = get_roi_config()
+        if roi_detection is None:
+            roi_detection = roi_config['enabled']
+        self.roi_detector = None
+        if roi_detection:
+            del roi_config['enabled']
+            self.roi_detector = BoundaryROIDetector(self.yolo_model, **roi_config)
+            self.roi_tracker = StreamTracker()
+        
         # Violation tracking
         self.violation_status = {}
         self.frame_count = 0
@@ -45,319 +154,669 @@ class PlayerTracker:
         self.violation_start_frames = {}
         
         # Create output directories
-        os.makedirs('violations/screenshots', exist_ok=True)
-        os.makedirs('violations/videos', exist_ok=True)
-        
-        # Circular buffer for last 3 seconds (90 frames at 30fps)
-        self.circular_buffer = []
-        self.buffer_size = 90
-        
-    def scale_boundary_points(self, scale_factor):
-        """Scale boundary points from original resolution to current display resolution"""
-        self.boundary_points = []
-        for point in self.original_boundary_points:
-            scaled_x = int(point[0] * scale_factor)
-            scaled_y = int(point[1] * scale_factor)
-            self.boundary_points.append([scaled_x, scaled_y])
-        print(f"📏 Scaled boundary points by {scale_factor:.3f}: {self.boundary_points}")
-    
-    def is_point_below_boundary(self, point):
-        """Improved boundary violation detection with better interpolation"""
-        if len(self.boundary_points) < 2:
-            return False
-            
-        x, y = point
+        if record_evidence:
+            os.makedirs(os.path.join(output_dir, 'screenshots'), exist_ok=True)
+            os.makedirs(os.path.join(output_dir, 'videos'), exist_ok=True)
         
-        # Find the boundary y-coordinate at the given x using linear interpolation
-        boundary_y = None
+        # Shared frame ring: the pre-roll (3 seconds = 90 frames at 30fps by default)
+        # of every violation clip references the same frames; extra slots let the
+        # background writer lag by a full queue. Clip frames after the pre-roll are
+        # streamed and released one at a time, so clips (up to 5 seconds = 150 frames)
+        # need no slots of their own. Long pre-rolls are affordable with a
+        # JPEG/PNG-encoded ring.
+        evidence_config = get_evidence_config()
+        self.buffer_size = int(round(evidence_config['preroll_seconds'] * evidence_config['fps']))
+        self.max_clip_frames = 150
+        self.evidence_overruns = 0  # Frames not kept for evidence because the ring was full of pinned frames
+        ring_size = self.buffer_size + evidence_config['queue_size'] + 1
+        self.frame_ring = create_frame_ring(ring_size, evidence_config['ring_encoding'], evidence_config['ring_quality'],
+                                            evidence_config['ring_threads'], evidence_config['ring_png_compression'])
         
-        # Check if point is within boundary x-range
-        min_x = min(p[0] for p in self.boundary_points)
-        max_x = max(p[0] for p in self.boundary_points)
+        # Screenshots and clips are encoded and written off the tracking loop
+        self.evidence_config = evidence_config
+        self.evidence_writer = EvidenceWriter(
+            self.frame_ring,
+            codec=evidence_config['codec'],
+            fps=evidence_config['fps'],
+            jpeg_quality=evidence_config['jpeg_quality'],
+            queue_size=evidence_config['queue_size'],
+            drop_policy=evidence_config['drop_policy'],
+            asynchronous=evidence_config['asynchronous'],
+            annotate=self.annotate_evidence if annotate else None,
+            on_saved=self.evidence_saved,
+            max_clip_frames=self.max_clip_frames
+        )
         
-        if x < min_x or x > max_x:
-            # Point is outside boundary x-range - use nearest boundary point
-            if x < min_x:
-                boundary_y = next(p[1] for p in self.boundary_points if p[0] == min_x)
+    def scale_boundary_points(self, scale_factor, frame_size=None):
+        """Scale boundary points from original resolution to current display resolution
+        and precompile the court lines for a (width, height) frame"""
+        self.set_court_transform(np.array([[scale_factor, 0.0, 0.0], [0.0, scale_factor, 0.0], [0.0, 0.0, 1.0]]),
+                                 frame_size)
+        print(f"📏 Scaled boundary points by {scale_factor:.3f}: {self.boundary_points}")
+    
+    def apply_frame_transform(self, prepared):
+        """Map the court lines to the display space of a PreparedFrame (recompiles only when it changes)"""
+        matrix = prepared.native_to_display
+        if (self.court_base is not None and self.court.frame_size == prepared.display_size and
+                np.array_equal(self.court_base[0], matrix)):
+            return
+        self.set_court_transform(matrix, prepared.display_size)
+    
+    def set_court_transform(self, base, frame_size=None, compiled_court=None):
+        """Map the court lines to the frame with base (config -> frame coordinates) after the camera drift
+        correction, and compile them for a (width, height) frame if given (or use compiled_court, compiled for it)"""
+        self.court_base = (base, None if frame_size is None else tuple(frame_size))
+        matrix = base @ self.court_drift
+        self.boundary_points = [[int(x), int(y)] for x, y in transform_points(matrix, self.original_boundary_points)] \
+            if self.original_boundary_points else []
+        if compiled_court is not None:
+            self.court = compiled_court
+            return
+        self.court.scale_factor = base[0, 0]
+        self.court.transform = matrix
+        if frame_size is not None and self.court.lines:
+            self.court.compile(base[0, 0], frame_size, matrix)
+    
+    def update_court_drift(self, frame, prepared=None):
+        """Apply finished camera drift registrations and submit the next one when it is due"""
+        result = self.drift_tracker.poll()
+        if result is not None:
+            self.apply_drift_result(result)
+        if self.court_base is None or (frame is None and prepared is None):
+            return
+        if self.drift_tracker.is_due(self.frame_count):
+            # The detector image is the smallest copy of the frame at hand
+            image, native_to_image = (prepared.detector, prepared.native_to_detector) if prepared is not None \
+                else (frame, self.court_base[0])
+            base, frame_size = self.court_base
+            court = self.court if frame_size is not None else None  # Copied by submit (timed)
+            self.drift_tracker.submit(self.frame_count, image, native_to_image, court, base, frame_size)
+    
+    def apply_drift_result(self, result):
+        """Warp the court lines by a new drift correction and raise/clear the drift alert"""
+        if result['state'] != self.drift_state:
+            self.drift_state = result['state']
+            if self.drift_state == ALIGNED:
+                print("✅ Boundary registration recovered")
+            elif self.drift_state == TOO_LARGE:
+                print(f"🚨 BOUNDARY DRIFT ALERT: camera moved too far to correct (boundary shifted "
+                      f"{result['shift_px']}px, rotated {result['rotation_deg']}°) - set up the boundary again")
             else:
-                boundary_y = next(p[1] for p in self.boundary_points if p[0] == max_x)
-        else:
-            # Find the two boundary points that bracket this x coordinate
-            for i in range(len(self.boundary_points) - 1):
-                x1, y1 = self.boundary_points[i]
-                x2, y2 = self.boundary_points[i + 1]
-                
-                if x1 <= x <= x2:
-                    # Linear interpolation between the two points
-                    if x2 != x1:
-                        boundary_y = y1 + (y2 - y1) * (x - x1) / (x2 - x1)
-                    else:
-                        boundary_y = y1
-                    break
-        
-        if boundary_y is None:
-            return False
+                print("🚨 BOUNDARY DRIFT ALERT: camera registration lost - boundary cannot be verified")
+            self.publish('boundary_drift_alert' if self.drift_state != ALIGNED else 'boundary_drift_recovered',
+                         state=self.drift_state, shift_px=result['shift_px'], rotation_deg=result['rotation_deg'])
         
-        # Check if foot is below (greater y value) the boundary line
-        violation = y > boundary_y
+        if result['drift'] is None:
+            return
+        self.court_drift = result['drift']
+        base, frame_size = self.court_base
+        compiled = result['court'] if result['court'] is not None and np.array_equal(result['base'], base) and \
+            result['frame_size'] == frame_size else None
+        self.set_court_transform(base, frame_size, compiled)
+        print(f"📐 Boundary re-registered: shifted {result['shift_px']}px, rotated {result['rotation_deg']}°")
+        self.publish('boundary_drift_corrected', shift_px=result['shift_px'], rotation_deg=result['rotation_deg'],
+                     inliers=result['inliers'])
+    
+    def is_point_below_boundary(self, point):
+        """Boundary violation check for a single point (see check_feet for the batched version)"""
+        violations, _ = self.check_feet([point])
+        return bool(violations[0])
+    
+    def check_feet(self, feet):
+        """Classify all foot points of a frame against the court lines in one batched lookup.
+        Returns (boundary violation per foot, court line bitflags per foot)"""
+        flags = self.court.classify(feet)
+        if len(self.boundary_points) < 2 or BOUNDARY_LINE not in self.court.tables:
+            return np.zeros(len(feet), dtype=bool), flags
+        violations = (flags & self.court.line_flag(BOUNDARY_LINE)) != 0
         
         # Debug boundary check occasionally
         if self.frame_count % 120 == 0:  # Every 4 seconds
-            print(f"🔍 Boundary check: foot=({x},{y}), boundary_y={boundary_y:.1f}, violation={violation}")
+            for (x, y), violation in zip(feet, violations):
+                boundary_y = self.court.line_position(BOUNDARY_LINE, x)
+                print(f"🔍 Boundary check: foot=({x},{y}), boundary_y={boundary_y:.1f}, violation={violation}")
         
-        return violation
+        return violations, flags
     
     def get_stable_id(self, center_pos, bbox, yolo_id):
-        """Improved stable ID assignment with Kalman filter prediction"""
-        x, y = center_pos
-        x1, y1, x2, y2 = bbox
+        """Stable ID for a single detection (see associate_detections for a whole frame)"""
+        return self.associate_detections([{'center': center_pos, 'bbox': bbox, 'yolo_id': yolo_id}])[0]
+    
+    def associate_detections(self, detections):
+        """Assign stable IDs to all detections of a frame with Kalman prediction.
         
-        # Predict positions for all existing players using Kalman filters
-        predicted_positions = {}
-        for stable_id in self.kalman_filters:
-            predicted_positions[stable_id] = self.kalman_filters[stable_id].predict()
+        Every Kalman filter is predicted exactly once per frame, then all detections
+        are matched against all tracks at once (YOLO ID, predicted distance, overlap).
+        Returns the stable ID of each detection in order.
+        """
+        # Predict positions for all existing players in one batched Kalman step
+        # (dt covers frames that were skipped since the last prediction)
+        track_ids = list(self.stable_players)
+        # (skipped if predict_players already predicted this frame)
+        if self.frame_count > self.last_predict_frame:
+            self.kalman_bank.predict(dt=self.frame_count - self.last_predict_frame)
+            self.last_predict_frame = self.frame_count
+        predictions = self.kalman_bank.positions(track_ids)
+        track_boxes = [self.stable_players[stable_id]['bbox'] for stable_id in track_ids]
         
-        # First, check if we already have this YOLO ID mapped to a stable ID
-        for stable_id, player_data in self.stable_players.items():
-            if player_data.get('yolo_id') == yolo_id:
-                # Update Kalman filter with new measurement
-                self.kalman_filters[stable_id].update(center_pos)
-                
-                # Update existing player data
-                self.stable_players[stable_id].update({
-                    'position': center_pos,
-                    'last_seen': self.frame_count,
-                    'bbox': bbox
-                })
-                return stable_id
+        matches = self.associator.associate(
+            [det['center'] for det in detections],
+            [det['bbox'] for det in detections],
+            [det['yolo_id'] for det in detections],
+            track_ids, predictions, track_boxes, self.yolo_index
+        )
         
-        # If YOLO ID not found, try to match by predicted position (Kalman-based)
-        closest_id = None
-        min_distance = float('inf')
+        # Correct Kalman filters of all matched players with their measurements
+        matched = [(stable_id, det['center']) for det, stable_id in zip(detections, matches) if stable_id is not None]
+        self.kalman_bank.correct([m[0] for m in matched], [m[1] for m in matched])
         
-        for stable_id in predicted_positions:
-            px, py = predicted_positions[stable_id]
-            distance = math.sqrt((x - px)**2 + (y - py)**2)
-            
-            # Check if this is likely the same player using Kalman prediction
-            if distance < self.max_distance and distance < min_distance:
-                min_distance = distance
-                closest_id = stable_id
-        
-        if closest_id is not None:
-            # Update Kalman filter with new measurement
-            self.kalman_filters[closest_id].update(center_pos)
-            
-            # Update existing player with new YOLO ID
-            self.stable_players[closest_id].update({
-                'position': center_pos,
-                'last_seen': self.frame_count,
-                'yolo_id': yolo_id,
-                'bbox': bbox
-            })
-            return closest_id
-        
-        # Check for bounding box overlap with existing players (prevent duplicates)
-        for stable_id, player_data in self.stable_players.items():
-            px1, py1, px2, py2 = player_data['bbox']
+        stable_ids = []
+        for det, stable_id in zip(detections, matches):
+            center_pos, bbox, yolo_id = det['center'], det['bbox'], det['yolo_id']
             
-            # Calculate overlap
-            overlap_x = max(0, min(x2, px2) - max(x1, px1))
-            overlap_y = max(0, min(y2, py2) - max(y1, py1))
-            overlap_area = overlap_x * overlap_y
-            
-            # Calculate areas
-            current_area = (x2 - x1) * (y2 - y1)
-            existing_area = (px2 - px1) * (py2 - py1)
-            
-            # If significant overlap, consider it the same player
-            if overlap_area > 0.3 * min(current_area, existing_area):
-                # Update Kalman filter with new measurement
-                self.kalman_filters[stable_id].update(center_pos)
-                
-                # Update with new YOLO ID
+            if stable_id is not None:
+                # Update existing player (and its YOLO ID mapping)
+                self._map_yolo_id(stable_id, yolo_id)
                 self.stable_players[stable_id].update({
                     'position': center_pos,
                     'last_seen': self.frame_count,
                     'yolo_id': yolo_id,
                     'bbox': bbox
                 })
-                return stable_id
-        
-        # Create new player with Kalman filter
-        new_stable_id = self.next_stable_id
-        self.stable_players[new_stable_id] = {
-            'position': center_pos,
-            'last_seen': self.frame_count,
-            'yolo_id': yolo_id,
-            'bbox': bbox
-        }
+            else:
+                # Create new player with Kalman filter
+                stable_id = self.next_stable_id
+                self.stable_players[stable_id] = {
+                    'position': center_pos,
+                    'last_seen': self.frame_count,
+                    'yolo_id': yolo_id,
+                    'bbox': bbox
+                }
+                self._map_yolo_id(stable_id, yolo_id)
+                
+                # Initialize Kalman filter for new player
+                self.kalman_bank.add(stable_id, center_pos)
+                
+                self.next_stable_id += 1
+                
+                print(f"🆕 New player created: Stable ID {stable_id} (YOLO ID: {yolo_id}) with Kalman filter")
+                self.publish('player_created', player=stable_id, yolo_id=yolo_id, bbox=bbox)
+            
+            stable_ids.append(stable_id)
+        
+        return stable_ids
+    
+    def predict_players(self):
+        """Kalman-predicted (stable_id, bbox, foot, yolo_id) of the players seen at the last detection.
         
-        # Initialize Kalman filter for new player
-        self.kalman_filters[new_stable_id] = KalmanTracker(center_pos)
+        Boxes and foot points are shifted by the predicted movement of the player's center.
+        Returns None if any predicted foot is close to the boundary (full detection needed).
+        """
+        self.kalman_bank.predict(dt=max(1, self.frame_count - self.last_predict_frame))
+        self.last_predict_frame = self.frame_count
         
-        self.next_stable_id += 1
+        last_detection = self.detection_stride.last_detection_frame
+        track_ids = [stable_id for stable_id, player in self.stable_players.items()
+                     if player['last_seen'] == last_detection and 'foot' in player]
+        if not track_ids:
+            return []
         
-        print(f"🆕 New player created: Stable ID {new_stable_id} (YOLO ID: {yolo_id}) with Kalman filter")
-        return new_stable_id
+        players = [self.stable_players[stable_id] for stable_id in track_ids]
+        shifts = self.kalman_bank.positions(track_ids) - np.array([p['position'] for p in players], dtype=np.int64)
+        boxes = np.array([p['bbox'] for p in players], dtype=np.int64) + np.tile(shifts, 2)
+        feet = np.array([p['foot'] for p in players], dtype=np.int64) + shifts
+        
+        if self.detection_stride.near_boundary(self.court.signed_distance(feet)):
+            return None
+        
+        return [(stable_id, tuple(int(v) for v in box), (int(foot[0]), int(foot[1])), player['yolo_id'])
+                for stable_id, box, foot, player in zip(track_ids, boxes, feet, players)]
+    
+    def _map_yolo_id(self, stable_id, yolo_id):
+        """Point the yolo_id -> stable_id reverse index at this player"""
+        old_yolo_id = self.stable_players[stable_id].get('yolo_id')
+        if old_yolo_id != yolo_id and self.yolo_index.get(old_yolo_id) == stable_id:
+            del self.yolo_index[old_yolo_id]
+        self.yolo_index[yolo_id] = stable_id
     
     def cleanup_old_players(self):
-        """Remove players not seen for too long and save any ongoing violation videos"""
+        """Remove players not seen for too long and return their stable IDs"""
         to_remove = []
         for stable_id, player_data in self.stable_players.items():
             if self.frame_count - player_data['last_seen'] > self.max_frames_missing:
                 to_remove.append(stable_id)
         
         for stable_id in to_remove:
-            # Save any ongoing violation video before removing player
+            # Remove player, its YOLO ID mapping and Kalman filter
+            yolo_id = self.stable_players[stable_id].get('yolo_id')
+            self.publish('player_lost', player=stable_id, yolo_id=yolo_id,
+                         last_seen=self.stable_players[stable_id]['last_seen'])
+            if self.yolo_index.get(yolo_id) == stable_id:
+                del self.yolo_index[yolo_id]
+            del self.stable_players[stable_id]
+            self.kalman_bank.remove(stable_id)
+        
+        # Their VIDEO-mode landmarkers go back to the pool
+        self.skeleton_tracker.release_players(to_remove)
+        return to_remove
+    
+    def release_players(self, stable_ids, frame_number=None):
+        """Save any ongoing violation videos of removed players"""
+        for stable_id in stable_ids:
+            # Save any ongoing violation video before forgetting player
             if stable_id in self.violation_records:
                 print(f"⚠️ Player {stable_id} disappeared during violation - saving video")
-                self.save_violation_video(stable_id)
+                self.save_violation_video(stable_id, frame_number, reason='lost')
             
             # Remove from active violations
             self.active_violations.discard(stable_id)
-            
-            # Remove player and Kalman filter
-            del self.stable_players[stable_id]
-            if stable_id in self.kalman_filters:
-                del self.kalman_filters[stable_id]
         
     def get_foot_position_with_skeleton(self, frame, bbox, player_id):
         """Use the working skeleton tracker for foot position detection"""
         return self.skeleton_tracker.get_foot_position(frame, bbox, player_id)
+    
+    def get_foot_positions_with_skeleton(self, frame, players, draw=True, prepared=None):
+        """Foot positions and landmarks for all (stable_id, bbox) of a frame in one batch.
+        
+        With a PreparedFrame and pose_source 'native', crops come from the decoded
+        frame; boxes are mapped there and the results back to display coordinates.
+        """
+        timestamp_ms = int(self.frame_count * 1000.0 / self.video_fps)
+        if prepared is None or self.pose_source != 'native' or not players:
+            image = frame if frame is not None else prepared.display
+            return self.skeleton_tracker.get_foot_positions(image, players, draw=draw, timestamp_ms=timestamp_ms)
+        
+        native_boxes = transform_boxes(prepared.display_to_native, [bbox for _, bbox in players]).round().astype(int)
+        native_players = [(player_id, tuple(box)) for (player_id, _), box in zip(players, native_boxes)]
+        results = self.skeleton_tracker.get_foot_positions(prepared.native, native_players, draw=False,
+                                                           timestamp_ms=timestamp_ms)
+        
+        to_display = prepared.native_to_display
+        for (player_id, bbox), result in zip(players, results):
+            if result['landmarks'] is None:
+                # Bounding box fallback in display coordinates
+                result['foot'] = (int((bbox[0] + bbox[2]) / 2), bbox[3])
+                continue
+            points = transform_points(to_display, [p[:2] for p in result['landmarks']])
+            result['landmarks'] = [(int(x), int(y), p[2]) for (x, y), p in zip(points, result['landmarks'])]
+            foot = transform_points(to_display, [result['foot']])[0]
+            result['foot'] = (int(foot[0]), int(foot[1]))
+            if draw:
+                self.skeleton_tracker.draw_skeleton(frame, result['landmarks'], player_id)
+        return results
 
     
-    def process_frame(self, frame):
+    def estimate_poses(self, frame, players, prepared=None, cached_poses=None):
+        """Foot positions for all (stable_id, bbox) of a frame, with pose only for players picked by the pose gate.
+        
+        With cached_poses (replay) the gate picks among the recorded poses instead of running pose.
+        """
+        if cached_poses is not None and self.pose_gate is None:
+            return cached_poses
+        if cached_poses is None and (self.pose_gate is None or not self.skeleton_tracker.mediapipe_working):
+            return self.get_foot_positions_with_skeleton(frame, players, draw=False, prepared=prepared)
+        
+        # Bounding box foot for everyone, predicted foot from the last pose of the player
+        bbox_feet = [(int((bbox[0] + bbox[2]) / 2), bbox[3]) for _, bbox in players]
+        predicted_feet = []
+        for (stable_id, _), (x, y) in zip(players, bbox_feet):
+            offset = self.stable_players[stable_id].get('foot_offset')
+            predicted_feet.append(None if offset is None else (x + offset[0], y + offset[1]))
+        
+        results = [{'player_id': stable_id, 'foot': foot, 'skeleton': False, 'landmarks': None}
+                   for (stable_id, _), foot in zip(players, bbox_feet)]
+        selected = self.pose_gate.select(self.court, bbox_feet, predicted_feet)
+        if selected:
+            if cached_poses is not None:
+                posed = [cached_poses[i] for i in selected]
+            else:
+                posed = self.get_foot_positions_with_skeleton(frame, [players[i] for i in selected],
+                                                              draw=False, prepared=prepared)
+            for i, result in zip(selected, posed):
+                results[i] = result
+        return results
+    
+    def draw_player(self, frame, stable_id, bbox, yolo_id, foot_pos, skeleton_drawn, is_violation, predicted=False):
+        """Draw bounding box, label and foot marker for one player"""
+        x1, y1, x2, y2 = bbox
+        
+        # Draw bounding box with appropriate color
+        color = (0, 0, 255) if is_violation else (0, 255, 0)  # Red for violation, Green for normal
+        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 3)
+        
+        # Create comprehensive label
+        label_parts = [f"Player {stable_id}"]
+        if is_violation:
+            label_parts.append("VIOLATION!")
+        if predicted:
+            label_parts.append("[PREDICTED]")
+        elif skeleton_drawn:
+            label_parts.append("[SKELETON ON]")
+        else:
+            label_parts.append("[SKELETON OFF]")
+        label_parts.append(f"(Y:{yolo_id})")
+        
+        label = " ".join(label_parts)
+        
+        # Draw label background
+        text_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)[0]
+        cv2.rectangle(frame, (x1, y1-30), (x1 + text_size[0] + 10, y1), color, -1)
+        cv2.putText(frame, label, (x1 + 5, y1-8), 
+                  cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+        
+        # Draw foot position marker
+        foot_color = (0, 255, 255) if skeleton_drawn else (255, 0, 255)  # Yellow for MediaPipe, Magenta for fallback
+        cv2.circle(frame, foot_pos, 6, foot_color, -1)
+        
+        # Draw foot label
+        foot_label = "KF_FOOT" if predicted else "MP_FOOT" if skeleton_drawn else "BBOX_FOOT"
+        cv2.putText(frame, foot_label, (foot_pos[0]-25, foot_pos[1]-15), 
+                  cv2.FONT_HERSHEY_SIMPLEX, 0.4, foot_color, 1)
+    
+    def draw_players(self, frame, players):
+        """Draw skeletons, boxes and foot markers of an analyzed frame's players (entries of frame_players)"""
+        for player in players:
+            if player['landmarks']:
+                self.skeleton_tracker.draw_skeleton(frame, player['landmarks'], player['stable_id'])
+        for player in players:
+            self.draw_player(frame, player['stable_id'], player['bbox'], player['yolo_id'], player['foot'],
+                             player['skeleton'], player['violation'], predicted=player['predicted'])
+    
+    def annotate_evidence(self, frame, players):
+        """Court lines and players on an evidence frame (called by the evidence writer with the ring metadata)"""
+        self.draw_boundary(frame)
+        self.draw_players(frame, players)
+        return frame
+    
+    def process_frame(self, frame, detections=None, prepared=None):
         """Process frame with improved YOLO detection and stable ID tracking"""
-        self.frame_count += 1
+        current_violations, retired_players = self.analyze_frame(frame, detections, prepared)
+        if frame is None and self.record_evidence:
+            frame = prepared.display
+        self.record_frame(frame, current_violations, retired_players)
+        return frame, current_violations
+    
+    def start_at(self, frame_index):
+        """Continue frame numbering at frame_index of the video (after seeking into it)"""
+        self.frame_count = frame_index
+        self.last_predict_frame = frame_index
+    
+    def start_cache(self, cache, mode):
+        """Record detections into (mode='record') or replay them from (mode='replay') a DetectionCache.
+        
+        Every frame must be fully detected for the cache to be complete, so the detection stride is disabled.
+        """
+        self.detection_cache = cache
+        self.cache_mode = mode
+        self.detection_stride.stride = 1
+        self.detection_stride.adaptive = False
+        if mode == 'replay':
+            # Court lines are compiled for the recorded display resolution
+            width, height = cache.display_size
+            self.scale_boundary_points(width / float(cache.native_size[0]), (width, height))
+        print(f"💾 Detection cache {mode}: {cache.cache_dir}")
+    
+    def detection_settings(self, target_width=1280, pose_gate=True):
+        """Everything besides the video that changes detections or poses (detection cache key).
+        
+        pose_gate=False describes poses recorded without the pose gate, which a gated replay gates itself.
+        """
+        preprocess = get_preprocess_config()
+        del preprocess['pose_source']  # The source actually used is self.pose_source
+        detector = get_detector_config()
+        return {
+            # Backends and int8 quantization give different boxes than the PyTorch weights
+            'model': {
+                'backend': detector['backend'],
+                'weights': detector['weights'],
+                'imgsz': detector['imgsz'],
+                'int8': detector['int8'],
+                'calibration': detector['calibration'] if detector['int8'] else None
+            },
+            'conf': 0.5,
+            'iou': 0.7,
+            'tracker': 'bytetrack.yaml',
+            'width': target_width,
+            'preprocess': preprocess,
+            'pose_source': self.pose_source,
+            'pose': self.skeleton_tracker.mediapipe_working and self.skeleton_tracker.running_mode,
+            # Gated poses depend on each player's distance to the boundary they were recorded with
+            'pose_gate': {'distance': self.pose_gate.distance, 'max_poses': self.pose_gate.max_poses,
+                          'boundary': self.original_boundary_points}
+                         if self.pose_gate is not None and pose_gate else None,
+            # The ROI band is cut around the boundary: detections replay only against the same boundary
+            'roi': dict(get_roi_config(), boundary=self.original_boundary_points)
+                   if self.roi_detector is not None else None
+        }
+    
+    def finish_cache(self):
+        """Complete a cache recording"""
+        if self.cache_mode == 'record':
+            self.detection_cache.finish()
+        self.detection_cache = None
+        self.cache_mode = None
+    
+    def detect_players(self, frame, prepared=None):
+        """YOLO detection with ByteTrack IDs, return detection dicts (None if tracking IDs are missing).
         
-        # Add frame to circular buffer
-        self.circular_buffer.append(frame.copy())
-        if len(self.circular_buffer) > self.buffer_size:
-            self.circular_buffer.pop(0)
+        With a PreparedFrame, YOLO gets its detector image (already at imgsz, so
+        it is only padded) and boxes are mapped to display coordinates.
+        """
+        if self.roi_detector is not None:
+            image = frame if frame is not None else prepared.display
+            detections = self.roi_tracker.update(self.roi_detector.detect(image, self.court, self.frame_count), image)
+            if self.frame_count % 60 == 0:
+                print(f"🎯 Frame {self.frame_count}: ROI detection found {len(detections)} players")
+            return detections
         
-        # YOLO detection with tracking - detect persons only
+        # The detector image is already at imgsz, so YOLO's letterbox only pads it
+        size_args = {} if prepared is None else {'imgsz': prepared.detector_imgsz}
         results = self.yolo_model.track(
-            frame, 
+            frame if prepared is None else prepared.detector, 
             persist=True, 
             classes=[0],  # Only detect persons
             conf=0.5,     # Confidence threshold
             iou=0.7,      # IoU threshold for NMS
-            tracker="bytetrack.yaml"  # Use ByteTrack for better tracking
+            tracker="bytetrack.yaml",  # Use ByteTrack for better tracking
+            **size_args
         )
         
+        if not results or len(results) == 0 or results[0].boxes is None:
+            return []
+        
+        boxes = results[0].boxes
+        if boxes.id is None:
+            # No tracking IDs available - YOLO tracking failed
+            if self.frame_count % 60 == 0:
+                print(f"⚠️ Frame {self.frame_count}: YOLO tracking IDs not available")
+            return None
+        
+        # Get detection data
+        xyxy_boxes = boxes.xyxy.cpu().numpy()  # Bounding boxes in xyxy format
+        track_ids = boxes.id.int().cpu().tolist()  # YOLO tracking IDs
+        confidences = boxes.conf.float().cpu().tolist()  # Confidence scores
+        
+        # Debug YOLO detections
+        if self.frame_count % 60 == 0:
+            print(f"🎯 Frame {self.frame_count}: YOLO detected {len(track_ids)} players")
+        
+        if prepared is not None:
+            xyxy_boxes = transform_boxes(prepared.detector_to_display, xyxy_boxes)
+            return boxes_to_detections(xyxy_boxes, track_ids, confidences, prepared.display_shape, conf_threshold=0.5)
+        return boxes_to_detections(xyxy_boxes, track_ids, confidences, frame.shape, conf_threshold=0.5)
+    
+    def analyze_frame(self, frame, detections=None, prepared=None):
+        """Run detection, stable ID tracking and boundary checks for one frame (no drawing, no evidence I/O).
+        
+        detections can be supplied by a shared model (multi-stream runner) instead of self.yolo_model.
+        prepared is an optional PreparedFrame (single-resize path); frame may then be None when
+        nothing is drawn, and the display image is only resized if something needs it.
+        The results for drawing are left in frame_players.
+        """
+        self.frame_count += 1
+        self.frame_players = []
+        if prepared is not None:
+            self.apply_frame_transform(prepared)
+        elif self.court.lines and frame is not None:
+            self.court.ensure_compiled(frame.shape)
+        if self.drift_tracker is not None:
+            with self.timer.stage('drift'):
+                self.update_court_drift(frame, prepared)
+        start_time = time.perf_counter()
+        
+        # Between stride frames, use Kalman predictions unless a player is close to the boundary
+        forced = False
+        if detections is None and not self.detection_stride.is_due(self.frame_count):
+            with self.timer.stage('association'):
+                predicted = self.predict_players()
+            if predicted is not None:
+                current_violations = self.analyze_predicted_frame(frame, predicted)
+                if self.trajectories is not None:
+                    self.trajectories.record(self.frame_count, self.frame_players)
+                retired_players = self.cleanup_old_players()
+                self.detection_stride.record(self.frame_count, False, time.perf_counter() - start_time)
+                return current_violations, retired_players
+            forced = True
+        
+        cached_poses = None
+        with self.timer.stage('detection'):
+            if self.cache_mode == 'replay':
+                detections, cached_poses = self.detection_cache.frame(self.frame_count - 1)
+            elif detections is None:
+                detections = self.detect_players(frame, prepared)
+        
         current_violations = set()
-        current_detections = []
         
-        # Process YOLO detections
-        if results and len(results) > 0 and results[0].boxes is not None:
-            boxes = results[0].boxes
+        if detections:
+            # Assign stable IDs to all detections at once
+            with self.timer.stage('association'):
+                stable_ids = self.associate_detections(detections)
+            players = [(stable_id, det['bbox'], det['yolo_id']) for stable_id, det in zip(stable_ids, detections)]
             
-            # Check if tracking IDs are available
-            if boxes.id is not None:
-                # Get detection data
-                xyxy_boxes = boxes.xyxy.cpu().numpy()  # Bounding boxes in xyxy format
-                track_ids = boxes.id.int().cpu().tolist()  # YOLO tracking IDs
-                confidences = boxes.conf.float().cpu().tolist()  # Confidence scores
+            # SKELETON TRACKING FOR ALL PLAYERS OF THE FRAME AT ONCE
+            if cached_poses is not None:
+                poses = self.estimate_poses(frame, [(sid, bbox) for sid, bbox, _ in players],
+                                            cached_poses=cached_poses)
+            else:
+                with self.timer.stage('pose'):
+                    poses = self.estimate_poses(frame, [(sid, bbox) for sid, bbox, _ in players], prepared)
+            if self.cache_mode == 'record':
+                self.detection_cache.record_frame(detections, poses)
+            
+            # Check boundary violation for every foot in one lookup
+            with self.timer.stage('boundary'):
+                foot_violations, court_flags = self.check_feet([pose['foot'] for pose in poses])
+            
+            for (stable_id, bbox_tuple, yolo_id), pose, is_violation, flags in zip(players, poses, foot_violations, court_flags):
+                foot_pos, skeleton_drawn = pose['foot'], pose['skeleton']
                 
-                # Debug YOLO detections
-                if self.frame_count % 60 == 0:
-                    print(f"🎯 Frame {self.frame_count}: YOLO detected {len(track_ids)} players")
+                # Debug skeleton detection
+                if self.frame_count % 30 == 0:
+                    status = "✅ SKELETON DETECTED" if skeleton_drawn else "❌ NO SKELETON"
+                    print(f"Player {stable_id} (YOLO ID: {yolo_id}) at frame {self.frame_count}: {status}")
                 
-                # Process each detection
-                for i, (bbox, yolo_id, conf) in enumerate(zip(xyxy_boxes, track_ids, confidences)):
-                    if conf < 0.5:  # Skip low confidence detections
-                        continue
-                    
-                    # Extract bounding box coordinates
-                    x1, y1, x2, y2 = map(int, bbox)
-                    
-                    # Ensure bbox is within frame boundaries
-                    x1 = max(0, x1)
-                    y1 = max(0, y1)
-                    x2 = min(frame.shape[1], x2)
-                    y2 = min(frame.shape[0], y2)
-                    
-                    # Skip invalid bounding boxes
-                    if x2 <= x1 or y2 <= y1:
-                        continue
-                    
-                    # Calculate center position
-                    center_x = int((x1 + x2) / 2)
-                    center_y = int((y1 + y2) / 2)
-                    center_pos = (center_x, center_y)
-                    bbox_tuple = (x1, y1, x2, y2)
-                    
-                    # Get stable ID for this detection
-                    stable_id = self.get_stable_id(center_pos, bbox_tuple, yolo_id)
-                    current_detections.append(stable_id)
-                    
-                    # INDIVIDUAL PLAYER SKELETON TRACKING
-                    foot_pos, skeleton_drawn = self.get_foot_position_with_skeleton(frame, bbox_tuple, stable_id)
-                    
-                    # Debug skeleton detection
-                    if self.frame_count % 30 == 0:
-                        status = "✅ SKELETON DETECTED" if skeleton_drawn else "❌ NO SKELETON"
-                        print(f"Player {stable_id} (YOLO ID: {yolo_id}) at frame {self.frame_count}: {status}")
-                    
-                    # Check boundary violation
-                    is_violation = self.is_point_below_boundary(foot_pos)
-                    self.violation_status[stable_id] = is_violation
-                    
-                    if is_violation:
-                        current_violations.add(stable_id)
-                    
-                    # Draw bounding box with appropriate color
-                    color = (0, 0, 255) if is_violation else (0, 255, 0)  # Red for violation, Green for normal
-                    cv2.rectangle(frame, (x1, y1), (x2, y2), color, 3)
-                    
-                    # Create comprehensive label
-                    label_parts = [f"Player {stable_id}"]
-                    if is_violation:
-                        label_parts.append("VIOLATION!")
-                    if skeleton_drawn:
-                        label_parts.append("[SKELETON ON]")
-                    else:
-                        label_parts.append("[SKELETON OFF]")
-                    label_parts.append(f"(Y:{yolo_id})")
-                    
-                    label = " ".join(label_parts)
-                    
-                    # Draw label background
-                    text_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)[0]
-                    cv2.rectangle(frame, (x1, y1-30), (x1 + text_size[0] + 10, y1), color, -1)
-                    cv2.putText(frame, label, (x1 + 5, y1-8), 
-                              cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-                    
-                    # Draw foot position marker
-                    foot_color = (0, 255, 255) if skeleton_drawn else (255, 0, 255)  # Yellow for MediaPipe, Magenta for fallback
-                    cv2.circle(frame, foot_pos, 6, foot_color, -1)
-                    
-                    # Draw foot label
-                    foot_label = "MP_FOOT" if skeleton_drawn else "BBOX_FOOT"
-                    cv2.putText(frame, foot_label, (foot_pos[0]-25, foot_pos[1]-15), 
-                              cv2.FONT_HERSHEY_SIMPLEX, 0.4, foot_color, 1)
-            
-            else:
-                # No tracking IDs available - YOLO tracking failed
-                if self.frame_count % 60 == 0:
-                    print(f"⚠️ Frame {self.frame_count}: YOLO tracking IDs not available")
+                is_violation = bool(is_violation)
+                self.violation_status[stable_id] = is_violation
+                self.stable_players[stable_id]['court_flags'] = int(flags)
+                self.stable_players[stable_id]['foot'] = foot_pos
+                if skeleton_drawn:
+                    # Where the pose foot sits relative to the bbox bottom (predicted foot for the pose gate)
+                    x1, _, x2, y2 = bbox_tuple
+                    self.stable_players[stable_id]['foot_offset'] = (foot_pos[0] - int((x1 + x2) / 2), foot_pos[1] - y2)
+                
+                if is_violation:
+                    current_violations.add(stable_id)
+                
+                self.frame_players.append({
+                    'stable_id': stable_id,
+                    'yolo_id': yolo_id,
+                    'bbox': bbox_tuple,
+                    'foot': foot_pos,
+                    'skeleton': skeleton_drawn,
+                    'violation': is_violation,
+                    'court_flags': int(flags),
+                    'predicted': False,
+                    'landmarks': pose['landmarks']
+                })
         
         else:
-            # No detections
-            if self.frame_count % 120 == 0:
+            if self.cache_mode == 'record':
+                self.detection_cache.record_frame([], [])
+            if detections is not None and self.frame_count % 120 == 0:
+                # No detections
                 print(f"👻 Frame {self.frame_count}: No players detected")
         
-        # Handle violation recording
-        self.handle_violations(frame, current_violations)
+        if self.trajectories is not None:
+            self.trajectories.record(self.frame_count, self.frame_players)
         
-        # Cleanup old players
-        self.cleanup_old_players()
+        # Cleanup old players (their evidence is finalised by record_frame)
+        retired_players = self.cleanup_old_players()
+        self.detection_stride.record(self.frame_count, True, time.perf_counter() - start_time, forced)
         
-        return frame, current_violations
+        return current_violations, retired_players
+    
+    def analyze_predicted_frame(self, frame, predicted):
+        """Boundary check for Kalman-predicted players on a frame without detection"""
+        current_violations = set()
+        with self.timer.stage('boundary'):
+            foot_violations, court_flags = self.check_feet([foot for _, _, foot, _ in predicted])
+        
+        for (stable_id, bbox, foot_pos, yolo_id), is_violation, flags in zip(predicted, foot_violations, court_flags):
+            is_violation = bool(is_violation)
+            self.violation_status[stable_id] = is_violation
+            if is_violation:
+                current_violations.add(stable_id)
+            
+            self.frame_players.append({
+                'stable_id': stable_id,
+                'yolo_id': yolo_id,
+                'bbox': bbox,
+                'foot': foot_pos,
+                'skeleton': False,
+                'violation': is_violation,
+                'court_flags': int(flags),
+                'predicted': True,
+                'landmarks': None
+            })
+        
+        return current_violations
     
-    def handle_violations(self, frame, current_violations):
-        """Improved violation handling - one screenshot per violation, continuous video recording"""
+    def record_frame(self, frame, current_violations, retired_players=(), players=None, frame_number=None):
+        """Store the analyzed frame and its players (default: frame_players) in the ring and write violation evidence.
+        
+        frame_number is the analyzed frame's number when recording lags behind analysis (pipelined mode).
+        """
+        with self.timer.stage('evidence'):
+            # The ring keeps the clean frame; its players are drawn only if it becomes evidence
+            if players is None:
+                players = self.frame_players
+            frame_index = None
+            if self.record_evidence:
+                try:
+                    frame_index = self.frame_ring.push(frame, players)
+                except BufferError as e:
+                    # The writer is too far behind: lose this frame for evidence, keep analyzing
+                    self.evidence_overruns += 1
+                    if self.evidence_overruns % 30 == 1:
+                        print(f"⚠️ Evidence frame skipped ({e}) - {self.evidence_overruns} so far")
+            
+            # Handle violation recording
+            self.handle_violations(frame, current_violations, frame_index, frame_number, players)
+            
+            # Save any ongoing violation videos of players that disappeared
+            self.release_players(retired_players, frame_number)
+    
+    def handle_violations(self, frame, current_violations, frame_index, frame_number=None, players=None):
+        """Improved violation handling - one screenshot per violation, clips streamed from the frame ring
+
+        players are the frame's per-player results (default: frame_players); in pipelined mode
+        they are the analyzed frame's snapshot, as the tracker has already moved on.
+        """
+        if frame_number is None:
+            frame_number = self.frame_count
+        if players is None:
+            players = self.frame_players
+        frame_players = {player['stable_id']: player for player in players}
         
         # Check for new violations (players who just started violating)
         new_violations = current_violations - self.active_violations
@@ -367,62 +826,63 @@ class PlayerTracker:
         
         # Handle new violations
         for player_id in new_violations:
-            print(f"🚨 NEW VIOLATION: Player {player_id} at frame {self.frame_count}")
+            print(f"🚨 NEW VIOLATION: Player {player_id} at frame {frame_number}")
+            player = frame_players.get(player_id) or self.stable_players.get(player_id, {})
+            self.publish('violation_start', frame_number, player=player_id, yolo_id=player.get('yolo_id'),
+                         foot=player.get('foot'), bbox=player.get('bbox'))
+            
+            if not self.record_evidence or frame_index is None:
+                self.violation_records[player_id] = {'clip_id': None, 'start_frame': frame_number}
+                self.violation_start_frames[player_id] = frame_number
+                continue
             
             # Take screenshot immediately (only once per violation)
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            screenshot_path = f"violations/screenshots/player_{player_id}_violation_{self.frame_count}_{timestamp}.jpg"
-            cv2.imwrite(screenshot_path, frame)
-            print(f"📸 Screenshot saved: {screenshot_path}")
+            screenshot_path = f"{self.output_dir}/screenshots/player_{player_id}_violation_{frame_number}_{timestamp}.jpg"
+            self.evidence_writer.save_screenshot(screenshot_path, frame_index, tag=(player_id, frame_number))
             
-            # Start video recording with pre-violation footage
+            # Open the clip now and stream pre-violation footage (3-sec history from the ring)
+            extension = self.evidence_config['extension']
+            video_path = f"{self.output_dir}/videos/player_{player_id}_violation_{frame_number}_{timestamp}.{extension}"
+            first_index = max(self.frame_ring.oldest_index, frame_index - self.buffer_size)
+            clip_id = (player_id, frame_number)
+            self.evidence_writer.open_clip(clip_id, video_path, first_index, frame_index)
             self.violation_records[player_id] = {
                 'screenshot_taken': True,
-                'frames': self.circular_buffer.copy() + [frame.copy()],  # Include 3-sec history
-                'start_frame': self.frame_count
+                'clip_id': clip_id,
+                'start_frame': frame_number
             }
-            self.violation_start_frames[player_id] = self.frame_count
+            self.violation_start_frames[player_id] = frame_number
         
-        # Continue recording for ongoing violations
-        for player_id in current_violations:
-            if player_id in self.violation_records:
-                self.violation_records[player_id]['frames'].append(frame.copy())
-                # Limit frames to prevent memory issues (max 5 seconds at 30fps = 150 frames)
-                if len(self.violation_records[player_id]['frames']) > 150:
-                    self.violation_records[player_id]['frames'].pop(0)
+        # Continue recording for ongoing violations (the writer caps a clip at max_clip_frames
+        # violation frames, 5 seconds at 30fps, and applies the drop policy per frame)
+        for player_id in current_violations - new_violations:
+            record = self.violation_records.get(player_id)
+            if record is None or record['clip_id'] is None or frame_index is None:
+                continue
+            self.evidence_writer.append_frame(record['clip_id'], frame_index)
         
         # Handle ended violations - save video
         for player_id in ended_violations:
-            self.save_violation_video(player_id)
+            self.save_violation_video(player_id, frame_number)
         
         # Update active violations
         self.active_violations = current_violations.copy()
     
-    def save_violation_video(self, player_id):
-        """Save violation video when violation ends"""
+    def save_violation_video(self, player_id, frame_number=None, reason='ended'):
+        """Finish violation video when violation ends (written by the evidence writer)"""
         if player_id not in self.violation_records:
             return
-            
-        frames = self.violation_records[player_id]['frames']
+        
+        frame_number = self.frame_count if frame_number is None else frame_number
         start_frame = self.violation_records[player_id]['start_frame']
+        self.publish('violation_end', frame_number, player=player_id, start_frame=start_frame, reason=reason,
+                     duration_s=round((frame_number - start_frame) / self.video_fps, 3))
         
-        if len(frames) > 0:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            video_path = f"violations/videos/player_{player_id}_violation_{start_frame}_{timestamp}.mp4"
-            
-            # Get frame dimensions
-            h, w, _ = frames[0].shape
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            out = cv2.VideoWriter(video_path, fourcc, 30.0, (w, h))
-            
-            # Write all frames
-            for frame in frames:
-                out.write(frame)
-            
-            out.release()
-            
-            duration = len(frames) / 30.0  # Assuming 30 fps
-            print(f"🎥 Video saved: {video_path} ({duration:.1f}s, {len(frames)} frames)")
+        record = self.violation_records[player_id]
+        clip_id = record['clip_id']
+        if clip_id is not None:
+            self.evidence_writer.close_clip(clip_id)
         
         # Cleanup
         del self.violation_records[player_id]
@@ -431,8 +891,54 @@ class PlayerTracker:
         
         print(f"✅ Violation recording completed for Player {player_id}")
     
+    def close(self):
+        """Finish ongoing violation clips, flush evidence and release worker processes"""
+        for player_id in list(self.violation_records):
+            self.save_violation_video(player_id, reason='stopped')
+        self.active_violations = set()
+        self.evidence_writer.close()
+        self.frame_ring.close()
+        if self.drift_tracker is not None:
+            self.drift_tracker.close()
+        if self.trajectories is not None:
+            self.trajectories.close()
+        if self.owns_event_bus:
+            self.events.close()
+        self.skeleton_tracker.close()
+        self.timer.report()
+        self.timer.export()
+    
+    def publish(self, event_type, frame_number=None, **fields):
+        """Publish an event stamped with the frame number (default: current frame) and its video time"""
+        if not self.events.enabled:
+            return
+        frame_number = self.frame_count if frame_number is None else frame_number
+        self.events.publish(event_type, frame=frame_number, video_time_s=round(frame_number / self.video_fps, 3),
+                            **self.event_fields, **fields)
+    
+    def evidence_saved(self, kind, tag, path, frames):
+        """Evidence writer callback (writer thread): announce screenshots and clips once they are on disk"""
+        if tag is None:
+            return
+        player_id, start_frame = tag
+        if kind == 'screenshot':
+            self.publish('screenshot_saved', start_frame, player=player_id, path=path)
+        else:
+            self.publish('clip_written', player=player_id, start_frame=start_frame, path=path, frames=frames,
+                         duration_s=round(frames / self.evidence_writer.fps, 2))
+    
     def draw_boundary(self, frame):
-        """Draw the boundary line on frame"""
+        """Draw the boundary line and any other court lines on frame"""
+        for name in self.court.line_names:
+            if name == BOUNDARY_LINE:
+                continue
+            points = self.court.scaled_points(name)
+            if len(points) > 1:
+                pts = np.array(points, np.int32)
+                cv2.polylines(frame, [pts], False, (255, 255, 0), 1)  # Thin cyan line
+                cv2.putText(frame, name.upper(), (points[0][0], points[0][1]-10), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
+        
         if len(self.boundary_points) > 1:
             # Convert to numpy array and draw thin yellow line
             pts = np.array(self.boundary_points, np.int32)
@@ -447,11 +953,152 @@ class PlayerTracker:
                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
         return frame
 
-def main():
-    tracker = PlayerTracker()
+def resize_frame(frame, target_width=1280):
+    """Resize frame to fit screen (no cropping)"""
+    orig_h, orig_w = frame.shape[:2]
+    scale_factor = target_width / float(orig_w)
+    new_dim = (target_width, int(orig_h * scale_factor))
+    return cv2.resize(frame, new_dim, interpolation=cv2.INTER_AREA)
+
+# Disabled timer for callers that do not instrument decoding
+NO_TIMER = StageTimer()
+
+def create_preprocessor(target_width=1280):
+    """Single-resize FramePreprocessor from video_config (None when disabled)"""
+    preprocess_config = get_preprocess_config()
+    if not preprocess_config['single_resize']:
+        return None
+    return FramePreprocessor(display_width=target_width, detector_imgsz=preprocess_config['detector_imgsz'],
+                             interpolation=INTERPOLATIONS[preprocess_config['interpolation']])
+
+def decode_frame(cap, preprocessor=None, target_width=1280, need_display=True, timer=NO_TIMER):
+    """Read the next frame, return (display frame or None, PreparedFrame or None); (None, None) at the end"""
+    with timer.stage('decode'):
+        ret, frame = cap.read()
+    if not ret:
+        return None, None
+    with timer.stage('resize'):
+        if preprocessor is None:
+            return resize_frame(frame, target_width), None
+        prepared = preprocessor.prepare(frame, need_display)
+    return prepared.display if need_display else None, prepared
+
+def get_stats_text(tracker, violations):
+    """Lines of the statistics panel for the current tracker state"""
+    return [
+        f"Frame: {tracker.frame_count}",
+        f"Boundary Points: {len(tracker.boundary_points)}",
+        f"Active Players: {len(tracker.stable_players)}",
+        f"Active Violations: {len(violations)}",
+        f"Violating Players: {list(violations) if violations else 'None'}"
+    ]
+
+def draw_stats_panel(frame):
+    """Draw the statistics panel box in the top-left corner (static layer)"""
+    cv2.rectangle(frame, (10, 10), (450, 140), (0, 0, 0), -1)
+    cv2.rectangle(frame, (10, 10), (450, 140), (255, 255, 255), 2)
+    return frame
+
+def draw_stats_text(frame, stats_text):
+    """Draw the statistics lines into the panel box"""
+    for i, text in enumerate(stats_text):
+        cv2.putText(frame, text, (20, 35 + i*25), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+    return frame
+
+def draw_timing_panel(frame, lines):
+    """Draw the per-stage timing panel to the right of the statistics panel"""
+    height = 20 + 20 * len(lines)
+    cv2.rectangle(frame, (460, 10), (840, 10 + height), (0, 0, 0), -1)
+    cv2.rectangle(frame, (460, 10), (840, 10 + height), (255, 255, 255), 2)
+    
+    for i, text in enumerate(lines):
+        cv2.putText(frame, text, (470, 32 + i*20), 
+                   cv2.FONT_HERSHEY_PLAIN, 1.0, (255, 255, 255), 1)
+    return frame
+
+def frame_overlay(tracker, violations):
+    """Annotations of the last analyzed frame for the renderer (metadata only, nothing is drawn here)"""
+    return {
+        'players': tracker.frame_players,
+        'stats': get_stats_text(tracker, violations),
+        'timing': tracker.timer.panel_lines() if tracker.show_timing_panel else None,
+        # The static layer is redrawn only when the court lines move
+        'static_key': (tuple(map(tuple, tracker.boundary_points)), float(tracker.court.scale_factor or 0.0))
+    }
+
+def create_renderer(tracker, enabled=None, window_name='Player Tracking'):
+    """DisplayRenderer for the tracker: court lines and panel box cached, players and text drawn per frame"""
+    display_config = get_display_config()
+    
+    def draw_static(layer):
+        tracker.draw_boundary(layer)
+        draw_stats_panel(layer)
+    
+    def draw_dynamic(frame, overlay):
+        tracker.draw_players(frame, overlay['players'])
+        draw_stats_text(frame, overlay['stats'])
+        if overlay['timing']:
+            draw_timing_panel(frame, overlay['timing'])
+    
+    return DisplayRenderer(draw_static, draw_dynamic, window_name=window_name,
+                           refresh_hz=display_config['refresh_hz'],
+                           enabled=display_config['enabled'] if enabled is None else enabled,
+                           timer=tracker.timer)
+
+def run_sequential(cap, tracker, renderer):
+    """Decode and analyze each frame one after another on this thread, handing results to the renderer"""
+    preprocessor = create_preprocessor()
+    while renderer.keep_running:
+        # Without a window the display frame is only resized when evidence or pose needs it
+        frame, prepared = decode_frame(cap, preprocessor, need_display=renderer.attached, timer=tracker.timer)
+        if frame is None and prepared is None:
+            break
+        
+        frame, violations = tracker.process_frame(frame, prepared=prepared)
+        if renderer.attached:
+            renderer.submit(frame, frame_overlay(tracker, violations))
+        tracker.timer.end_frame()
+
+def run_pipelined(cap, tracker, pipeline_config, renderer):
+    """Run decode, analysis and recording as separate stages with bounded queues"""
+    preprocessor = create_preprocessor()
+    
+    # Each stage thread closes its own part of a frame's stage times
+    def decode():
+        frame, prepared = decode_frame(cap, preprocessor, need_display=renderer.attached, timer=tracker.timer)
+        tracker.timer.end_frame()
+        if frame is None and prepared is None:
+            return None
+        return frame, prepared
     
+    def analyze(decoded):
+        frame, prepared = decoded
+        violations, retired_players = tracker.analyze_frame(frame, prepared=prepared)
+        if frame is None and tracker.record_evidence:
+            frame = prepared.display
+        # The overlay is captured here so recording and display get this frame's state
+        overlay = frame_overlay(tracker, violations) if renderer.attached else None
+        tracker.timer.end_frame()
+        return frame, violations, retired_players, tracker.frame_players, tracker.frame_count, overlay
+    
+    def record(result):
+        frame, violations, retired_players, players, frame_number, overlay = result
+        tracker.record_frame(frame, violations, retired_players, players, frame_number)
+        if overlay is not None:
+            renderer.submit(frame, overlay)
+        tracker.timer.end_frame()
+        return renderer.keep_running
+    
+    pipeline = FramePipeline(decode, analyze, record,
+                             queue_size=pipeline_config['queue_size'],
+                             report_interval=pipeline_config['report_interval'])
+    pipeline.run()
+
+def open_tracking_video(tracker, video_path=None, target_width=1280):
+    """Open the tracking video and scale the tracker's boundary to the processing resolution"""
     # Open video to get original dimensions
-    cap = cv2.VideoCapture(get_player_tracking_video())  # Centralized video config
+    cap = cv2.VideoCapture(video_path or get_player_tracking_video())  # Centralized video config
     
     # Apply frame processing configuration
     frame_config = get_frame_config()
@@ -462,20 +1109,21 @@ def main():
     
     if not cap.isOpened():
         print("Error: Could not open video")
-        return
+        return None
     
     # Get original video dimensions
     ret, first_frame = cap.read()
     if not ret:
         print("Error: Could not read first frame")
-        return
+        cap.release()
+        return None
     
     orig_h, orig_w = first_frame.shape[:2]
-    target_width = 1280
     scale_factor = target_width / float(orig_w)
+    tracker.video_fps = cap.get(cv2.CAP_PROP_FPS) or tracker.video_fps
     
     # Scale boundary points to match display resolution
-    tracker.scale_boundary_points(scale_factor)
+    tracker.scale_boundary_points(scale_factor, (target_width, int(orig_h * scale_factor)))
     
     # Reset video to beginning
     cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
@@ -484,55 +1132,36 @@ def main():
     print(f"Display size: {target_width}x{int(orig_h * scale_factor)}")
     print(f"Scale factor: {scale_factor:.3f}")
     print(f"Boundary points in tracker: {tracker.boundary_points}")
+    return cap
+
+def main(pipelined=None):
+    tracker = PlayerTracker()
+    
+    pipeline_config = get_pipeline_config()
+    if pipelined is None:
+        pipelined = pipeline_config['enabled']
     
+    cap = open_tracking_video(tracker)
+    if cap is None:
+        tracker.close()
+        return
+    
+    # Analysis runs on a worker thread while this thread shows the frames (directly here without a display)
+    renderer = create_renderer(tracker)
     print("Starting player tracking...")
-    print("Press 'q' to quit")
+    if renderer.attached:
+        print("Press 'q' to quit")
     
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        
-        # Resize frame to fit screen (no cropping)
-        target_width = 1280
-        orig_h, orig_w = frame.shape[:2]
-        scale_factor = target_width / float(orig_w)
-        new_dim = (target_width, int(orig_h * scale_factor))
-        frame = cv2.resize(frame, new_dim, interpolation=cv2.INTER_AREA)
-        
-        # ALWAYS draw boundary first (before processing)
-        frame = tracker.draw_boundary(frame)
-        
-        # Process frame
-        frame, violations = tracker.process_frame(frame)
-        
-        # Display statistics
-        stats_text = [
-            f"Frame: {tracker.frame_count}",
-            f"Boundary Points: {len(tracker.boundary_points)}",
-            f"Active Players: {len(tracker.stable_players)}",
-            f"Active Violations: {len(violations)}",
-            f"Violating Players: {list(violations) if violations else 'None'}"
-        ]
-        
-        # Draw stats background
-        cv2.rectangle(frame, (10, 10), (450, 140), (0, 0, 0), -1)
-        cv2.rectangle(frame, (10, 10), (450, 140), (255, 255, 255), 2)
-        
-        for i, text in enumerate(stats_text):
-            cv2.putText(frame, text, (20, 35 + i*25), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-        
-        # Create resizable window that fits screen
-        cv2.namedWindow('Player Tracking', cv2.WINDOW_NORMAL)
-        cv2.imshow('Player Tracking', frame)
-        
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
+    if pipelined:
+        renderer.run(lambda: run_pipelined(cap, tracker, pipeline_config, renderer))
+    else:
+        renderer.run(lambda: run_sequential(cap, tracker, renderer))
     
     cap.release()
+    tracker.close()
     cv2.destroyAllWindows()
     print(f"Tracking completed.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # "--pipelined" overrides PIPELINE_ENABLED from video_config
+    main(pipelined=True if '--pipelined' in sys.argv else None)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the top-level modules (player_tracker, analyze_video, ...) and the modules package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+
+from modules.court_model import CourtModel
+
+
+def reference_below(boundary_points, point):
+    """The per-point boundary check CourtModel replaced (PlayerTracker.is_point_below_boundary)"""
+    if len(boundary_points) < 2:
+        return False
+    x, y = point
+    boundary_y = None
+    min_x = min(p[0] for p in boundary_points)
+    max_x = max(p[0] for p in boundary_points)
+    if x < min_x or x > max_x:
+        if x < min_x:
+            boundary_y = next(p[1] for p in boundary_points if p[0] == min_x)
+        else:
+            boundary_y = next(p[1] for p in boundary_points if p[0] == max_x)
+    else:
+        for i in range(len(boundary_points) - 1):
+            x1, y1 = boundary_points[i]
+            x2, y2 = boundary_points[i + 1]
+            if x1 <= x <= x2:
+                if x2 != x1:
+                    boundary_y = y1 + (y2 - y1) * (x - x1) / (x2 - x1)
+                else:
+                    boundary_y = y1
+                break
+    if boundary_y is None:
+        return False
+    return y > boundary_y
+
+
+BOUNDARIES = [
+    [[100, 500], [700, 430], [1800, 520]],
+    [[0, 600], [640, 600], [640, 650], [1280, 610], [1919, 700]],  # Vertical step at x=640
+    [[300, 200], [301, 900]],
+]
+
+
+@pytest.mark.parametrize('points', BOUNDARIES)
+@pytest.mark.parametrize('scale_factor', [1.0, 2 / 3])
+def test_boundary_matches_per_point_check(points, scale_factor):
+    court = CourtModel()
+    court.add_line('boundary', points)
+    frame_size = (int(1920 * scale_factor), int(1080 * scale_factor))
+    court.compile(scale_factor, frame_size)
+    scaled = [[int(x * scale_factor), int(y * scale_factor)] for x, y in points]
+
+    rng = np.random.default_rng(0)
+    feet = np.stack([rng.integers(0, frame_size[0] + 1, 20000), rng.integers(0, frame_size[1] + 1, 20000)], axis=1)
+    # Points on and next to the line vertices, where rounding would show
+    vertices = np.array(scaled)
+    feet = np.concatenate([feet] + [vertices + [dx, dy] for dx in (-1, 0, 1) for dy in (-1, 0, 1)])
+    feet = np.clip(feet, 0, frame_size)
+
+    expected = np.array([reference_below(scaled, tuple(foot)) for foot in feet])
+    assert np.array_equal(court.is_beyond(feet), expected)
+
+
+def test_classify_sets_one_bit_per_line():
+    court = CourtModel()
+    court.add_line('boundary', [[0, 600], [1280, 600]], 'below')
+    court.add_line('bonus', [[0, 300], [1280, 300]], 'above')
+    court.add_line('lobby_left', [[100, 0], [100, 720]], 'left')
+    court.add_line('lobby_right', [[1180, 0], [1180, 720]], 'right')
+    court.compile(1.0, (1280, 720))
+
+    flags = court.classify([(640, 650), (640, 200), (50, 400), (1200, 650), (640, 400)])
+    assert [court.flag_names(f) for f in flags] == [['boundary'], ['bonus'], ['lobby_left'],
+                                                   ['boundary', 'lobby_right'], []]
+    assert court.line_flag('lobby_left') == 4
+
+
+def test_points_outside_the_frame_take_the_edge_flags():
+    court = CourtModel()
+    court.add_line('boundary', [[0, 600], [1280, 600]])
+    court.compile(1.0, (1280, 720))
+    # bbox bottoms on the frame edge (y == height) and beyond are classified, not out of range
+    assert court.is_beyond([(640, 720), (640, 900), (-20, 650), (1400, 500)]).tolist() == [True, True, True, False]
+
+
+def test_uncompiled_or_empty_classify_is_zero():
+    court = CourtModel()
+    court.add_line('boundary', [[0, 600], [1280, 600]])
+    assert court.classify([(1, 700)]).tolist() == [0]
+    court.compile(1.0, (1280, 720))
+    assert len(court.classify([])) == 0
+    assert court.is_beyond([(1, 700)], name='baulk').tolist() == [False]
+
+
+def test_signed_distance_and_recompile_on_resize():
+    court = CourtModel()
+    court.add_line('boundary', [[0, 400], [1280, 600]])
+    court.compile(1.0, (1280, 720))
+    assert court.signed_distance([(640, 520), (640, 480)]).tolist() == [20.0, -20.0]
+    assert court.line_position('boundary', 640) == 500.0
+
+    court.ensure_compiled((360, 640, 3))
+    assert court.frame_size == (640, 360)
+    assert court.flag_map.shape == (361, 641)
+
+
+def test_transform_maps_lines_like_the_scale_factor():
+    points = [[100, 500], [700, 430], [1800, 520]]
+    scaled, transformed = CourtModel(), CourtModel()
+    scaled.add_line('boundary', points)
+    transformed.add_line('boundary', points)
+    scaled.compile(0.5, (960, 540))
+    transformed.compile(1.0, (960, 540), transform=np.array([[0.5, 0, 0], [0, 0.5, 0], [0, 0, 1.0]]))
+    assert np.array_equal(scaled.flag_map, transformed.flag_map)
+
+
+def test_too_many_lines_and_unknown_side_are_rejected():
+    court = CourtModel()
+    with pytest.raises(ValueError):
+        court.add_line('boundary', [[0, 1], [2, 3]], side='behind')
+    for i in range(33):
+        court.add_line(f'line{i}', [[0, i], [10, i]])
+    with pytest.raises(ValueError):
+        court.compile(1.0, (10, 40))
@@ -0,0 +1,101 @@
+import pytest
+
+from modules.detection_cache import DetectionCache
+
+
+SETTINGS = {'model': {'backend': 'pytorch', 'weights': 'yolov8n.pt', 'imgsz': 640, 'int8': False},
+            'width': 1280, 'boundary': [(100, 500), (1180, 520)]}
+
+
+def make_video(tmp_path, content=b'video'):
+    path = tmp_path / 'clip.mp4'
+    path.write_bytes(content * 1000)
+    return str(path)
+
+
+def detection(x1, y1, x2, y2, yolo_id, confidence=0.9):
+    return {'bbox': (x1, y1, x2, y2), 'center': ((x1 + x2) // 2, (y1 + y2) // 2), 'yolo_id': yolo_id,
+            'confidence': confidence}
+
+
+def record(cache, frames):
+    cache.start_recording((1920, 1080), (1280, 720), fps=25.0)
+    for detections, poses in frames:
+        cache.record_frame(detections, poses)
+    cache.finish()
+
+
+def sample_frames():
+    landmarks = [(i, 2 * i, 0.5) for i in range(33)]
+    return [
+        ([detection(10, 20, 50, 120, 1), detection(200, 40, 260, 180, 2, 0.75)],
+         [{'foot': (30, 118), 'skeleton': True, 'landmarks': landmarks},
+          {'foot': (230, 180), 'skeleton': False, 'landmarks': None}]),
+        ([], []),
+        ([detection(12, 22, 52, 122, 1)], [{'foot': (32, 120), 'skeleton': False, 'landmarks': None}]),
+    ]
+
+
+def test_round_trip(tmp_path):
+    video = make_video(tmp_path)
+    cache = DetectionCache.for_video(video, SETTINGS, root=str(tmp_path / 'cache'))
+    frames = sample_frames()
+    record(cache, frames)
+    assert cache.is_complete()
+
+    replay = DetectionCache.for_video(video, SETTINGS, root=str(tmp_path / 'cache')).load()
+    assert replay.cache_dir == cache.cache_dir
+    assert replay.frame_count == 3
+    assert replay.native_size == (1920, 1080) and replay.display_size == (1280, 720)
+    assert replay.fps == 25.0
+    for index, (detections, poses) in enumerate(frames):
+        replayed_detections, replayed_poses = replay.frame(index)
+        assert replayed_detections == [{**det, 'confidence': pytest.approx(det['confidence'])}
+                                       for det in detections]
+        assert [pose['foot'] for pose in replayed_poses] == [pose['foot'] for pose in poses]
+        assert [pose['landmarks'] for pose in replayed_poses] == [pose['landmarks'] for pose in poses]
+
+
+def test_key_depends_on_video_and_settings(tmp_path):
+    video = make_video(tmp_path)
+    other_video = str(tmp_path / 'other.mp4')
+    with open(other_video, 'wb') as f:
+        f.write(b'other' * 1000)
+    root = str(tmp_path / 'cache')
+    directory = DetectionCache.for_video(video, SETTINGS, root=root).cache_dir
+    assert DetectionCache.for_video(video, dict(SETTINGS), root=root).cache_dir == directory
+    assert DetectionCache.for_video(video, dict(SETTINGS, width=960), root=root).cache_dir != directory
+    assert DetectionCache.for_video(other_video, SETTINGS, root=root).cache_dir != directory
+
+
+def test_incomplete_recording_is_not_loaded(tmp_path):
+    cache = DetectionCache(str(tmp_path / 'cache'))
+    cache.start_recording((1920, 1080), (1280, 720))
+    cache.record_frame([], [])
+    assert not cache.is_complete()
+    with pytest.raises(ValueError):
+        DetectionCache(cache.cache_dir).load()
+
+
+def test_explicit_directory_checks_the_key(tmp_path, capsys):
+    video = make_video(tmp_path)
+    directory = str(tmp_path / 'cache')
+    cache = DetectionCache(directory)
+    cache.key = DetectionCache.key_for(video, SETTINGS)
+    record(cache, sample_frames())
+
+    same = DetectionCache(directory)
+    same.key = DetectionCache.key_for(video, SETTINGS)
+    assert same.load().frame_count == 3
+
+    stale = DetectionCache(directory)
+    stale.key = DetectionCache.key_for(video, dict(SETTINGS, width=960))
+    with pytest.raises(ValueError, match='width'):
+        stale.load()
+
+    other = DetectionCache(directory)
+    other.key = DetectionCache.key_for(make_video(tmp_path, b'edited'), SETTINGS)
+    with pytest.raises(ValueError, match='video'):
+        other.load()
+    assert other.load(force=True).frame_count == 3
+    assert 'forced' in capsys.readouterr().out
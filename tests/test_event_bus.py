@@ -0,0 +1,118 @@
+import base64
+import hashlib
+import json
+import socket
+import time
+
+import pytest
+
+from modules.event_bus import EventBus, JSONLSink, WebSocketSink, WEBSOCKET_GUID
+
+KEY = base64.b64encode(b'0123456789abcdef').decode('ascii')
+
+
+def opening_request(method='GET', version='HTTP/1.1', headers=None, trailing=b''):
+    fields = {'Host': 'localhost', 'Upgrade': 'websocket', 'Connection': 'keep-alive, Upgrade',
+              'Sec-WebSocket-Key': KEY, 'Sec-WebSocket-Version': '13'}
+    fields.update(headers or {})
+    lines = [f"{method} /events {version}"] + [f"{name}: {value}" for name, value in fields.items() if value is not None]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + trailing
+
+
+@pytest.fixture(scope='module')
+def sink():
+    sink = WebSocketSink(('127.0.0.1', 0))
+    yield sink
+    sink.close()
+
+
+def connect(sink, request):
+    """Send an opening request, return the connected socket and the server's response head"""
+    client = socket.create_connection(('127.0.0.1', sink.server.getsockname()[1]), timeout=5)
+    client.sendall(request)
+    response = b''
+    while b"\r\n\r\n" not in response:
+        chunk = client.recv(4096)
+        if not chunk:
+            break
+        response += chunk
+    return client, response.decode('latin-1')
+
+
+def test_valid_handshake_switches_protocols(sink):
+    client, response = connect(sink, opening_request())
+    client.close()
+    accept = base64.b64encode(hashlib.sha1((KEY + WEBSOCKET_GUID).encode('ascii')).digest()).decode('ascii')
+    assert response.startswith("HTTP/1.1 101 ")
+    assert f"Sec-WebSocket-Accept: {accept}\r\n" in response
+
+
+@pytest.mark.parametrize('request_bytes', [
+    opening_request(method='POST'),
+    opening_request(version='HTTP/1.0'),
+    opening_request(headers={'Upgrade': None}),
+    opening_request(headers={'Upgrade': 'h2c'}),
+    opening_request(headers={'Connection': 'keep-alive'}),
+    opening_request(headers={'Sec-WebSocket-Key': None}),
+    opening_request(headers={'Sec-WebSocket-Key': 'not a key'}),
+    opening_request(trailing=b'\x81\x05hello'),
+    b"GET /events\r\n\r\n",
+])
+def test_invalid_request_gets_400(sink, request_bytes):
+    client, response = connect(sink, request_bytes)
+    assert client.recv(1) == b''  # Rejected clients are disconnected
+    client.close()
+    assert response.startswith("HTTP/1.1 400 ")
+
+
+@pytest.mark.parametrize('version', ['8', None])
+def test_other_version_gets_426(sink, version):
+    client, response = connect(sink, opening_request(headers={'Sec-WebSocket-Version': version}))
+    assert client.recv(1) == b''
+    client.close()
+    assert response.startswith("HTTP/1.1 426 ")
+    assert "Sec-WebSocket-Version: 13\r\n" in response
+
+
+def test_idle_client_does_not_delay_other_handshakes(sink):
+    idle = socket.create_connection(('127.0.0.1', sink.server.getsockname()[1]), timeout=5)
+    try:
+        start = time.monotonic()
+        client, response = connect(sink, opening_request())
+        client.close()
+        assert response.startswith("HTTP/1.1 101 ")
+        assert time.monotonic() - start < 1.0  # Well under the idle client's 2 s handshake timeout
+    finally:
+        idle.close()
+
+
+def test_events_arrive_as_text_frames():
+    sink = WebSocketSink(('127.0.0.1', 0))
+    client, response = connect(sink, opening_request())
+    try:
+        assert response.startswith("HTTP/1.1 101 ")
+        deadline = time.monotonic() + 5
+        while not sink.clients and time.monotonic() < deadline:
+            time.sleep(0.01)  # The handshake thread registers the client after the 101
+        sink.emit('{"type": "violation_start"}')
+        frame = b''
+        while len(frame) < 2 or len(frame) < 2 + frame[1]:
+            frame += client.recv(4096)
+        assert frame[0] == 0x81
+        assert json.loads(frame[2:]) == {'type': 'violation_start'}
+    finally:
+        client.close()
+        sink.close()
+
+
+def test_bus_stamps_every_event(tmp_path):
+    paths = [str(tmp_path / 'a.jsonl'), str(tmp_path / 'b' / 'b.jsonl')]
+    bus = EventBus([JSONLSink(path) for path in paths], fields={'stream': 'court1'})
+    bus.publish('violation_start', player=3)
+    bus.publish('violation_end', player=3)
+    bus.close()
+    for path in paths:
+        with open(path) as f:
+            events = [json.loads(line) for line in f]
+        assert [(e['type'], e['seq'], e['stream'], e['player']) for e in events] == \
+            [('violation_start', 1, 'court1', 3), ('violation_end', 2, 'court1', 3)]
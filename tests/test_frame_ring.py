@@ -0,0 +1,114 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from modules.frame_ring import EncodedFrameRing, FrameRing, create_frame_ring
+
+
+def frame(value, shape=(24, 32, 3)):
+    image = np.zeros(shape, dtype=np.uint8)
+    image[:] = value
+    image[value % shape[0], :, 0] = 255  # Something PNG/JPEG must keep apart from a flat frame
+    return image
+
+
+@pytest.fixture(params=['raw', 'png'])
+def ring(request):
+    ring = create_frame_ring(5, request.param, png_compression=1)
+    ring.overrun_timeout = 0.2
+    yield ring
+    ring.close()
+
+
+def test_ring_keeps_the_last_frames(ring):
+    for value in range(8):
+        assert ring.push(frame(value), meta={'value': value}) == value
+    assert (ring.oldest_index, ring.latest_index) == (3, 7)
+    assert [ring.contains(i) for i in (-1, 2, 3, 7, 8)] == [False, False, True, True, False]
+    for index in range(3, 8):
+        assert np.array_equal(ring.get(index), frame(index))
+        assert ring.get_meta(index) == {'value': index}
+    assert [int(f[0, 0, 1]) for f in ring.iter_frames(4, 6)] == [4, 5, 6]
+    with pytest.raises(IndexError):
+        ring.get(2)
+
+
+def test_pinned_frame_is_not_overwritten(ring):
+    for value in range(5):
+        ring.push(frame(value))
+    ring.pin(1, 2)
+    ring.push(frame(5))  # Overwrites frame 0
+    with pytest.raises(BufferError, match="overrun"):
+        ring.push(frame(6))
+    assert np.array_equal(ring.get(1), frame(1))
+    ring.unpin(1, 2)
+    assert ring.push(frame(6)) == 6
+
+
+def test_pins_nest_and_unpin_wakes_push(ring):
+    ring.overrun_timeout = 5.0
+    for value in range(5):
+        ring.push(frame(value))
+    # Two violation clips sharing frame 0
+    ring.pin(0)
+    ring.pin(0, 1)
+    ring.unpin(0)
+    assert ring.pins[0] == 1
+
+    pushed = []
+    thread = threading.Thread(target=lambda: pushed.append(ring.push(frame(5))))
+    thread.start()
+    time.sleep(0.1)
+    assert pushed == []  # Waiting for the writer
+    ring.unpin(0, 1)
+    thread.join(5)
+    assert pushed == [5]
+
+
+def test_pin_ranges_wrap_and_are_bounded(ring):
+    for value in range(7):
+        ring.push(frame(value))
+    ring.pin(3, 6)  # Slots 3, 4, 0, 1
+    assert ring.pins.tolist() == [1, 1, 0, 1, 1]
+    ring.unpin(3, 6)
+    assert not ring.pins.any()
+    with pytest.raises(BufferError):
+        ring.pin(0, 5)
+
+
+def test_frame_size_change_with_pins_is_refused():
+    ring = FrameRing(4)
+    ring.push(frame(1))
+    ring.pin(0)
+    with pytest.raises(BufferError):
+        ring.push(frame(2, shape=(12, 16, 3)))
+    ring.unpin(0)
+    assert ring.push(frame(2, shape=(12, 16, 3))) == 1
+    assert not ring.contains(0)
+
+
+def test_jpeg_ring_decodes_close_to_the_frame():
+    ring = EncodedFrameRing(3, 'jpeg', quality=95)
+    try:
+        ys, xs = np.mgrid[0:48, 0:64]
+        image = np.stack([xs * 4, ys * 5, xs + ys * 2], axis=2).astype(np.uint8)  # Smooth, so JPEG keeps it
+        index = ring.push(image)
+        decoded = ring.get(index)
+        assert decoded.shape == image.shape
+        assert np.abs(decoded.astype(int) - image).mean() < 3
+        assert ring.get_stats()['format'] == 'jpeg'
+    finally:
+        ring.close()
+
+
+def test_unknown_encoding_is_rejected():
+    with pytest.raises(ValueError):
+        create_frame_ring(4, 'webp')
+
+
+@pytest.mark.parametrize('encoding, quality, png_compression', [('jpeg', 101, 1), ('png', 90, 10), ('png', 90, -1)])
+def test_out_of_range_quality_is_rejected(encoding, quality, png_compression):
+    with pytest.raises(ValueError):
+        create_frame_ring(4, encoding, quality, png_compression=png_compression)
@@ -0,0 +1,74 @@
+import numpy as np
+
+from modules.kalman_tracker import KalmanBank, KalmanTracker
+
+
+def run_both(num_tracks=12, steps=60, miss_rate=0.3, seed=0, predictions=None):
+    """Step KalmanBank and one cv2.KalmanFilter per track with the same measurements and misses.
+
+    With a predictions list, (bank positions, KalmanTracker.predict() outputs) are appended after every predict.
+    """
+    rng = np.random.default_rng(seed)
+    start = rng.uniform(50, 1200, (num_tracks, 2))
+    velocity = rng.uniform(-6, 6, (num_tracks, 2))
+
+    bank = KalmanBank(capacity=4)  # Small capacity: the bank grows while tracks are added
+    trackers = []
+    for track_id, position in enumerate(start):
+        bank.add(track_id, tuple(position))
+        trackers.append(KalmanTracker(tuple(position)))
+
+    track_ids = list(range(num_tracks))
+    for step in range(1, steps + 1):
+        bank.predict()
+        predicted = [tracker.predict() for tracker in trackers]
+        if predictions is not None:
+            predictions.append((bank.positions(track_ids).tolist(), [list(position) for position in predicted]))
+        measured = [i for i in track_ids if rng.random() >= miss_rate]
+        measurements = start[measured] + velocity[measured] * step + rng.normal(0, 2, (len(measured), 2))
+        bank.correct(measured, measurements)
+        for i, measurement in zip(measured, measurements):
+            trackers[i].update(measurement)
+        yield step, bank, trackers
+
+
+def test_state_matches_cv2_kalman_filter():
+    for step, bank, trackers in run_both():
+        expected_state = np.array([tracker.kalman.statePost.ravel() for tracker in trackers])
+        expected_covariance = np.array([tracker.kalman.errorCovPost for tracker in trackers])
+        slots = [bank.slots[i] for i in range(len(trackers))]
+        assert np.allclose(bank.state[slots], expected_state, rtol=1e-5, atol=1e-3), step
+        assert np.allclose(bank.covariance[slots], expected_covariance, rtol=1e-5, atol=1e-5), step
+
+
+def test_positions_match_kalman_tracker_predictions():
+    predictions = []
+    for _ in run_both(seed=1, predictions=predictions):
+        pass
+    for step, (positions, expected) in enumerate(predictions, start=1):
+        assert positions == expected, step
+
+
+def test_removed_slots_are_reused():
+    bank = KalmanBank(capacity=2)
+    bank.add('a', (10, 20))
+    bank.add('b', (30, 40))
+    bank.remove('a')
+    bank.add('c', (50, 60))
+    assert len(bank.state) == 2 and len(bank) == 2
+    assert 'a' not in bank and 'c' in bank
+    bank.add('d', (70, 80))
+    assert len(bank.state) == 4
+    assert bank.positions(['b', 'c', 'd']).tolist() == [[30, 40], [50, 60], [70, 80]]
+
+
+def test_predict_with_gap_advances_by_velocity():
+    bank = KalmanBank()
+    bank.add(1, (100, 100))
+    for step in range(1, 20):
+        bank.predict()
+        bank.correct([1], [(100 + 5 * step, 100)])
+    x_before = bank.state[bank.slots[1], 0]
+    vx = bank.state[bank.slots[1], 2]
+    bank.predict(dt=3)
+    assert np.isclose(bank.state[bank.slots[1], 0], x_before + 3 * vx)
@@ -0,0 +1,90 @@
+import functools
+import os
+import sys
+
+import numpy as np
+
+import analyze_video
+from modules.court_model import CourtModel
+from modules.detection_cache import DetectionCache, NUM_LANDMARKS
+from modules.pose_gate import PoseGate
+from modules.yolo_detector import boxes_to_detections
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from synthetic_scene import SyntheticScene, StubDetector  # noqa: E402
+
+
+def flat_court(boundary_y=400, size=(1280, 720)):
+    court = CourtModel()
+    court.add_line('boundary', [[0, boundary_y], [size[0], boundary_y]])
+    court.compile(1.0, size)
+    return court
+
+
+def test_select_closest_candidates_first():
+    gate = PoseGate(distance=80, max_poses=2)
+    feet = [(100, 100), (200, 390), (300, 470), (400, 420), (500, 700)]
+    # 390 (10 px), 420 (20 px) and 470 (70 px) are candidates; the cap keeps the two closest
+    assert gate.select(flat_court(), feet, [None] * len(feet)) == [1, 3]
+    assert gate.get_stats()['capped'] == 1
+
+
+def test_predicted_foot_makes_a_candidate():
+    gate = PoseGate(distance=80, max_poses=0)
+    feet = [(100, 250), (200, 250)]
+    # The second player's last pose foot was much lower than its box
+    assert gate.select(flat_court(), feet, [None, (200, 380)]) == [1]
+
+
+def test_without_compiled_boundary_everyone_gets_pose():
+    gate = PoseGate()
+    assert gate.select(CourtModel(), [(1, 2), (3, 4)], [None, None]) == [0, 1]
+
+
+def record_scene_cache(directory, video_path, settings, scene, frames):
+    """Detections of the scene and a pose for every player (ankle a few pixels off the bbox bottom)"""
+    stub = StubDetector(scene, jitter=2.0)
+    cache = DetectionCache(directory)
+    cache.key = DetectionCache.key_for(video_path, settings)
+    cache.start_recording((scene.width, scene.height), (scene.width, scene.height), fps=30.0)
+    rng = np.random.default_rng(0)
+    for frame_index in range(frames):
+        stub.set_frame(frame_index)
+        xyxy, ids, confs = stub.boxes((scene.height, scene.width))
+        detections = boxes_to_detections(xyxy, ids, confs, (scene.height, scene.width, 3), 0.5)
+        poses = []
+        for det in detections:
+            x1, y1, x2, y2 = det['bbox']
+            foot = ((x1 + x2) // 2 + int(rng.integers(-4, 5)), y2 + int(rng.integers(-6, 7)))
+            landmarks = [((x1 + x2) // 2, y1 + (y2 - y1) * i // NUM_LANDMARKS, 0.9) for i in range(NUM_LANDMARKS)]
+            landmarks[27] = landmarks[28] = (foot[0], foot[1], 0.9)  # Ankles
+            poses.append({'foot': foot, 'skeleton': True, 'landmarks': landmarks})
+        cache.record_frame(detections, poses)
+    cache.finish()
+
+
+def test_gated_replay_keeps_the_violations(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    scene = SyntheticScene(num_players=8, crossing_fraction=0.4, seed=3)
+    scene.write_config('config.json')
+    video_path = str(tmp_path / 'match.mp4')
+    with open(video_path, 'wb') as f:
+        f.write(b'not decoded on replay' * 100)
+    monkeypatch.setattr(analyze_video, 'PlayerTracker',
+                        functools.partial(analyze_video.PlayerTracker, yolo_model=StubDetector(scene)))
+
+    args = analyze_video.parse_args(['--video', video_path, '--replay', '--cache', str(tmp_path / 'cache'),
+                                     '--no-evidence', '--output', str(tmp_path / 'results.jsonl')])
+    tracker = analyze_video.create_analysis_tracker(args)
+    record_scene_cache(args.cache, video_path, tracker.detection_settings(args.width), scene, frames=240)
+    tracker.close()
+
+    result = analyze_video.run_pose_gate_comparison(args)
+    assert result is not None
+    assert args.pose_gate is False  # The comparison works on copies
+    baseline, gated = result['baseline'], result['gated']
+    starts = [event for event in baseline['events'] if event['type'] == 'violation_start']
+    assert starts, "the scene must produce violations"
+    assert result['diff'] == {'missing': [], 'extra': []}
+    assert gated['events'] == baseline['events']
+    assert gated['pose_gate']['pose_calls'] < gated['pose_gate']['players']
@@ -0,0 +1,116 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from modules import pose_worker_pool
+from modules.pose_worker_pool import PoseWorkerPool
+
+
+def echo_worker(model_path, task_queue, result_conn, running_mode='image', pool_size=12):
+    """Stand-in worker: answers every crop with its own value, 'die' exits, 'hang' never answers"""
+    result_conn.send(('ready', None, None))
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        if task[0] == 'release':
+            continue
+        job_id, index, crop, player_id, timestamp_ms = task
+        if crop == 'die':
+            os._exit(3)
+        if crop == 'hang':
+            time.sleep(60)
+        result_conn.send((job_id, index, [crop, player_id]))
+
+
+class EchoPool(PoseWorkerPool):
+    def _start_worker(self, i):
+        task_queue = self.context.Queue()
+        result_conn, worker_conn = self.context.Pipe(duplex=False)
+        worker = self.context.Process(target=echo_worker, args=(None, task_queue, worker_conn), daemon=True)
+        worker.start()
+        worker_conn.close()
+        return task_queue, result_conn, worker
+
+
+@pytest.fixture
+def echo_pool():
+    pool = EchoPool(2, None)
+    yield pool
+    pool.close()
+
+
+def test_results_in_input_order(echo_pool):
+    crops = ['a', 'b', 'c', 'd', 'e']
+    assert echo_pool.detect(crops) == [[crop, None] for crop in crops]
+    assert echo_pool.detect(crops, player_ids=[4, 5, 6, 7, 8], timestamp_ms=33) == \
+        [[crop, player_id] for crop, player_id in zip(crops, [4, 5, 6, 7, 8])]
+
+
+def test_crashed_worker_is_restarted(echo_pool):
+    # Round-robin: worker 1 gets 'die' and 'd', worker 0 is unaffected
+    assert echo_pool.detect(['a', 'die', 'c', 'd']) == [['a', None], None, ['c', None], None]
+    assert echo_pool.restarts == [0, 1]
+    assert echo_pool.detect(['a', 'b', 'c', 'd']) == [[crop, None] for crop in 'abcd']
+
+
+def test_hung_worker_is_restarted(echo_pool, monkeypatch):
+    monkeypatch.setattr(pose_worker_pool, 'RESULT_TIMEOUT', 0.5)
+    assert echo_pool.detect(['a', 'hang', 'c', 'd']) == [['a', None], None, ['c', None], None]
+    assert echo_pool.restarts == [0, 1]
+    start = time.monotonic()
+    assert echo_pool.detect(['a', 'b', 'c', 'd']) == [[crop, None] for crop in 'abcd']
+    assert time.monotonic() - start < 0.5
+
+
+def test_worker_is_given_up_after_max_restarts(echo_pool, monkeypatch):
+    monkeypatch.setattr(pose_worker_pool, 'MAX_RESTARTS', 1)
+    echo_pool.detect(['a', 'die'])
+    echo_pool.detect(['a', 'die'])
+    assert echo_pool.workers[1] is None
+    assert echo_pool.detect(['a', 'b', 'c']) == [['a', None], None, ['c', None]]
+
+
+def synthetic_crops(count=6, seed=0):
+    """Stick figures on noisy backgrounds, different sizes"""
+    import cv2
+
+    rng = np.random.default_rng(seed)
+    crops = []
+    for i in range(count):
+        height, width = 180 + 20 * i, 90 + 10 * i
+        crop = rng.integers(60, 120, (height, width, 3), dtype=np.uint8)
+        cx, head = width // 2, height // 8
+        cv2.circle(crop, (cx, head), head // 2, (200, 180, 160), -1)
+        cv2.line(crop, (cx, head), (cx, height // 2), (40, 40, 200), 8)
+        cv2.line(crop, (cx, height // 4), (cx - width // 3, height // 2), (200, 180, 160), 5)
+        cv2.line(crop, (cx, height // 4), (cx + width // 3, height // 2), (200, 180, 160), 5)
+        cv2.line(crop, (cx, height // 2), (cx - width // 4, height - 10), (30, 30, 30), 7)
+        cv2.line(crop, (cx, height // 2), (cx + width // 4, height - 10), (30, 30, 30), 7)
+        crops.append(crop)
+    return crops
+
+
+def test_pool_matches_in_process_detector():
+    pytest.importorskip('mediapipe')
+    from modules.skeleton_tracker import get_pose_model_path, create_pose_landmarker, detect_crop_landmarks
+
+    model_path = get_pose_model_path()
+    if not os.path.exists(model_path):
+        pytest.skip(f"pose model not found at {model_path}")
+
+    crops = synthetic_crops()
+    landmarker = create_pose_landmarker(model_path)
+    try:
+        serial = [detect_crop_landmarks(landmarker, crop) for crop in crops]
+    finally:
+        landmarker.close()
+
+    pool = PoseWorkerPool(3, model_path)
+    try:
+        parallel = pool.detect(crops)
+    finally:
+        pool.close()
+    assert parallel == serial
@@ -0,0 +1,121 @@
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+import analyze_video
+from modules.segment_stitcher import SegmentStitcher, match_overlap_tracks, plan_segments
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from synthetic_scene import SyntheticScene  # noqa: E402
+
+
+@pytest.mark.parametrize('total_frames, count, overlap', [(1000, 4, 50), (7, 3, 10), (5, 9, 2), (100, 1, 30)])
+def test_cores_partition_the_video(total_frames, count, overlap):
+    segments = plan_segments(total_frames, count, overlap)
+    assert len(segments) == min(count, total_frames)
+    assert segments[0]['core_start'] == 0 and segments[-1]['core_end'] == total_frames
+    for previous, segment in zip(segments, segments[1:]):
+        assert segment['core_start'] == previous['core_end']
+    for i, segment in enumerate(segments):
+        assert segment['index'] == i
+        assert segment['core_start'] < segment['core_end']
+        assert segment['start'] == max(0, segment['core_start'] - overlap)
+        assert segment['end'] == min(total_frames, segment['core_end'] + overlap)
+
+
+def boxes(ids, shift=0.0):
+    return {track_id: [100 * i + shift, 100, 100 * i + 60 + shift, 250] for i, track_id in enumerate(ids)}
+
+
+def test_tracks_are_matched_by_mean_iou_over_shared_frames():
+    previous = {frame: boxes([1, 2, 3]) for frame in range(100, 120)}
+    # Same players under other IDs, slightly offset; player 3 left before the overlap in this segment
+    current = {frame: boxes([7, 5], shift=4) for frame in range(100, 120)}
+    matches = match_overlap_tracks(previous, current)
+    assert [(p, c) for p, c, _ in matches] == [(1, 7), (2, 5)]
+    assert all(0.8 < iou < 1.0 for _, _, iou in matches)
+
+
+def test_short_or_weak_overlaps_are_not_matched():
+    previous = {frame: boxes([1]) for frame in range(100, 120)}
+    assert match_overlap_tracks(previous, {frame: boxes([9]) for frame in range(100, 105)}) == []
+    assert match_overlap_tracks(previous, {frame: boxes([9], shift=45) for frame in range(100, 120)}) == []
+    assert match_overlap_tracks(previous, {frame: {} for frame in range(100, 120)}) == []
+
+
+def test_one_previous_track_per_current_track():
+    # Two previous tracks on the same player: only the better one is carried over
+    previous = {frame: {1: [0, 0, 60, 150], 2: [5, 0, 65, 150]} for frame in range(20)}
+    current = {frame: {8: [0, 0, 60, 150]} for frame in range(20)}
+    assert [(p, c) for p, c, _ in match_overlap_tracks(previous, current)] == [(1, 8)]
+
+
+def test_stitcher_carries_global_ids_over_the_seam():
+    stitcher = SegmentStitcher(min_iou=0.5, min_frames=10)
+    assert [stitcher.global_id(0, i) for i in (1, 2, 3)] == [1, 2, 3]
+    stitcher.link(1, {frame: boxes([1, 2, 3]) for frame in range(20)},
+                  {frame: boxes([4, 6, 5]) for frame in range(20)})
+    assert [stitcher.global_id(1, i) for i in (4, 6, 5, 9)] == [1, 2, 3, 4]
+    assert stitcher.get_stats()['seams'][0]['matched'] == 3
+
+
+def write_segment(path, scene, segment, rename):
+    """analysis.jsonl of a segment as its own tracker would write it: the scene's players under segment-local IDs"""
+    with open(path, 'w') as f:
+        for frame_index in range(segment['start'], segment['end']):
+            truth = scene.truth(frame_index)
+            tracks = [{'id': rename[player], 'bbox': bbox.tolist()} for player, bbox in zip(truth['ids'], truth['bbox'])]
+            violations = sorted(rename[player] for player in truth['ids'][truth['violation']])
+            f.write(json.dumps({'type': 'frame', 'frame': frame_index + 1, 'tracks': tracks,
+                                'violations': violations}) + "\n")
+
+
+def test_merged_segments_give_the_sequential_violations(tmp_path):
+    scene = SyntheticScene(num_players=8, crossing_fraction=0.5, seed=4)
+    total_frames, fps = 900, 30.0
+    segments = plan_segments(total_frames, 3, overlap=60)
+
+    # Sequential run: one ID space (the scene's player numbers) over every frame
+    sequential, active = [], {}
+    for frame_index in range(total_frames):
+        truth = scene.truth(frame_index)
+        sequential += analyze_video.violation_changes(active, {int(i) for i in truth['ids'][truth['violation']]},
+                                                      frame_index + 1, fps)
+    sequential += analyze_video.open_violation_ends(active, total_frames, fps)
+    assert len(sequential) > 10
+
+    rng = np.random.default_rng(0)
+    segment_dirs, summaries = [], []
+    for segment in segments:
+        segment_dir = tmp_path / f"segment_{segment['index']}"
+        segment_dir.mkdir()
+        # Every segment's tracker numbers the players in its own order
+        local_ids = rng.permutation(scene.num_players) + 1 + 100 * segment['index']
+        write_segment(segment_dir / 'analysis.jsonl', scene, segment,
+                      {int(player): int(local) for player, local in zip(scene.ids, local_ids)})
+        segment_dirs.append(str(segment_dir))
+        summaries.append({'frames': segment['end'] - segment['start'], 'decode_ms_per_frame': 1.0,
+                          'process_ms_per_frame': 1.0, 'fps': 100.0, 'seconds': 1.0, 'worker': 1,
+                          'detection': {'detected_frames': 1, 'predicted_frames': 0, 'forced_frames': 0,
+                                        'stride': 1}})
+
+    args = argparse.Namespace(output=str(tmp_path / 'merged.jsonl'), video='match.mp4', trajectories=None,
+                              no_evidence=True)
+    summary = analyze_video.merge_segments(args, segments, segment_dirs, summaries, fps, start_time=0.0)
+    assert summary['frames'] == total_frames
+    assert summary['players_seen'] == scene.num_players
+    assert [seam['matched'] for seam in summary['seams']] == [scene.num_players] * 2
+
+    # Global IDs are numbered in the order the merge saw them; map them back through the first frame
+    records = analyze_video.read_jsonl(args.output)
+    first = next(record for record in records if record['type'] == 'frame')
+    to_player = {track['id']: int(player) for track, player in zip(first['tracks'], scene.ids)}
+    merged = [dict(event, player=to_player[event['player']]) for event in summary['events']]
+
+    def order(events):
+        return sorted(events, key=lambda e: (e['frame'], e['type'], e['player']))
+    assert order(merged) == order(sequential)
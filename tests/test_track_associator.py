@@ -0,0 +1,113 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from modules import track_associator
+from modules.track_associator import TrackAssociator, _solve
+
+
+def best_assignment(cost, valid):
+    """Brute force: the most valid pairs, then the lowest total cost"""
+    rows, cols = cost.shape
+    best = (0, 0.0)
+    for perm in itertools.permutations(range(max(rows, cols)), min(rows, cols)):
+        pairs = list(zip(range(rows), perm)) if rows <= cols else list(zip(perm, range(cols)))
+        pairs = [(r, c) for r, c in pairs if valid[r, c]]
+        score = (len(pairs), -sum(cost[r, c] for r, c in pairs))
+        if score > (best[0], -best[1]):
+            best = (len(pairs), -score[1])
+    return best
+
+
+@pytest.mark.parametrize('shape', [(3, 3), (4, 2), (2, 5), (5, 5)])
+def test_solve_finds_the_optimal_gated_assignment(shape):
+    rng = np.random.default_rng(sum(shape))
+    for _ in range(30):
+        cost = rng.uniform(0, 200, shape)
+        valid = cost < 120
+        matches = _solve(cost, valid)
+        assert all(valid[r, c] for r, c in matches)
+        assert len({r for r, _ in matches}) == len({c for _, c in matches}) == len(matches)
+        count, total = best_assignment(cost, valid)
+        assert len(matches) == count
+        assert sum(cost[r, c] for r, c in matches) == pytest.approx(total)
+
+
+def test_solve_prefers_the_global_optimum_over_greedy():
+    # Greedy takes (0, 0) at cost 1 and leaves row 1 only column 1 at 100
+    cost = np.array([[1.0, 2.0], [3.0, 100.0]])
+    valid = np.ones_like(cost, dtype=bool)
+    assert sorted(_solve(cost, valid)) == [(0, 1), (1, 0)]
+
+
+def test_greedy_fallback_without_scipy(monkeypatch):
+    monkeypatch.setattr(track_associator, 'linear_sum_assignment', None)
+    cost = np.array([[1.0, 2.0], [3.0, 100.0], [0.5, 4.0]])
+    valid = cost < 50
+    assert _solve(cost, valid) == [(2, 0), (0, 1)]
+    assert _solve(cost, np.zeros_like(valid)) == []
+
+
+def per_detection_reference(det_centers, det_boxes, det_yolo_ids, track_ids, predictions, track_boxes, yolo_index,
+                            max_distance=150, overlap_ratio=0.3):
+    """Matching rules of the replaced per-detection get_stable_id (one prediction per frame)"""
+    matches = []
+    for center, (x1, y1, x2, y2), yolo_id in zip(det_centers, det_boxes, det_yolo_ids):
+        if yolo_id in yolo_index:
+            matches.append(yolo_index[yolo_id])
+            continue
+        closest, min_distance = None, float('inf')
+        for stable_id, (px, py) in zip(track_ids, predictions):
+            distance = np.hypot(center[0] - px, center[1] - py)
+            if distance < max_distance and distance < min_distance:
+                closest, min_distance = stable_id, distance
+        if closest is None:
+            for stable_id, (px1, py1, px2, py2) in zip(track_ids, track_boxes):
+                overlap = max(0, min(x2, px2) - max(x1, px1)) * max(0, min(y2, py2) - max(y1, py1))
+                if overlap > overlap_ratio * min((x2 - x1) * (y2 - y1), (px2 - px1) * (py2 - py1)):
+                    closest = stable_id
+                    break
+        matches.append(closest)
+    return matches
+
+
+def test_matches_per_detection_rules_for_separated_players():
+    rng = np.random.default_rng(1)
+    for _ in range(50):
+        count = int(rng.integers(1, 12))
+        # Players on a grid at least 400 px apart, so each detection has one candidate track
+        cells = rng.choice(40, count + 3, replace=False)
+        positions = np.stack([(cells % 8) * 400 + 100, (cells // 8) * 400 + 100], axis=1).astype(float)
+        track_ids = [10 + i for i in range(count)]
+        predictions = positions[:count] + rng.uniform(-60, 60, (count, 2))
+        track_boxes = [(x - 40, y - 100, x + 40, y + 100) for x, y in predictions]
+        yolo_index = {100 + i: track_ids[i] for i in range(count) if rng.random() < 0.5}
+
+        order = rng.permutation(count + 3)  # Three new players too
+        det_centers = [tuple(positions[i]) for i in order]
+        det_boxes = [(x - 40, y - 100, x + 40, y + 100) for x, y in det_centers]
+        det_yolo_ids = [100 + i for i in order]
+
+        args = (det_centers, det_boxes, det_yolo_ids, track_ids, predictions, track_boxes, yolo_index)
+        assert TrackAssociator().associate(*args) == per_detection_reference(*args)
+
+
+def test_each_track_takes_at_most_one_detection():
+    # Two detections near one track: the old loop gave both the same stable ID
+    associator = TrackAssociator()
+    matches = associator.associate([(100, 100), (130, 100)], [(60, 0, 140, 200), (90, 0, 170, 200)], [1, 2],
+                                   [7], [(125, 100)], [(85, 0, 165, 200)], {})
+    assert matches == [None, 7]
+
+
+def test_yolo_id_beats_distance_and_overlap_catches_far_predictions():
+    associator = TrackAssociator(max_distance=50)
+    matches = associator.associate(
+        [(100, 100), (500, 100)], [(60, 0, 140, 200), (460, 0, 540, 200)], [5, 6],
+        [1, 2], [(102, 100), (600, 100)], [(62, 0, 142, 200), (470, 0, 550, 200)], {5: 2})
+    # Detection 0 holds YOLO ID 5 of track 2; detection 1 is 100 px from track 1's prediction but overlaps nothing free
+    assert matches == [2, None]
+    matches = associator.associate(
+        [(500, 100)], [(460, 0, 540, 200)], [6], [1], [(600, 100)], [(470, 0, 550, 200)], {})
+    assert matches == [1]
@@ -0,0 +1,133 @@
+import threading
+import time
+
+import numpy as np
+
+from modules.trajectory_store import ROW_DTYPE, TrajectoryStore, load_trajectories
+
+
+def small_store(history, max_tracks=4, **kwargs):
+    """Store whose memory budget holds history rows per track"""
+    row_bytes = ROW_DTYPE.itemsize - ROW_DTYPE['track'].itemsize
+    store = TrajectoryStore(max_tracks, memory_mb=(history + 0.5) * max_tracks * row_bytes / (1024 * 1024), **kwargs)
+    assert store.history == history
+    return store
+
+
+def player(track_id, frame, violation=False):
+    x, y = 10 * frame + track_id, 5 * track_id
+    return {'stable_id': track_id, 'yolo_id': track_id + 100, 'bbox': (x - 20, y - 80, x + 20, y), 'foot': (x, y),
+            'predicted': False, 'skeleton': frame % 2 == 0, 'violation': violation, 'landmarks': None}
+
+
+def test_ring_keeps_the_newest_rows_in_order():
+    store = small_store(10)
+    for frame in range(1, 26):
+        store.record(frame, [player(1, frame), player(2, frame)] if frame % 3 else [player(1, frame)])
+    path = store.path(1)
+    assert path['frame'].tolist() == list(range(16, 26))
+    assert path['foot'][:, 0].tolist() == [10 * frame + 1 for frame in range(16, 26)]
+    assert store.path(1, start=20, end=22)['frame'].tolist() == [20, 21, 22]
+    assert store.path(2)['frame'].tolist() == [f for f in range(1, 26) if f % 3][-10:]
+    assert store.path(7) is None
+
+
+def test_speed_and_distances_over_the_wrapped_ring():
+    store = small_store(8)
+    for frame in range(1, 21):
+        store.record(frame, [player(1, frame)] + ([player(2, frame)] if frame % 2 else []))
+    frames, speeds = store.speed(1)
+    assert frames.tolist() == list(range(14, 21))
+    assert np.allclose(speeds, 10.0)
+    # Track 2 skips every other frame: 20 px per step, 10 px per frame
+    assert np.allclose(store.speed(2, fps=30)[1], 300.0)
+    assert store.distances() == {1: 70.0, 2: 140.0}
+    assert store.distance(1, start=15, end=17) == 20.0
+    assert store.distance(3) == 0.0
+
+
+def test_least_recent_track_is_evicted():
+    store = small_store(5, max_tracks=2)
+    store.record(1, [player(1, 1), player(2, 1)])
+    store.record(2, [player(2, 2)])
+    store.record(3, [player(3, 3)])
+    assert store.track_ids() == [2, 3]
+    assert store.path(3)['frame'].tolist() == [3]
+    assert store.get_stats()['evicted_tracks'] == 1
+
+
+def record_frames(store, frames, tracks):
+    for frame in frames:
+        store.record(frame, [player(track_id, frame) for track_id in tracks])
+
+
+class _BlockedRows:
+    def __init__(self):
+        """Chunk whose write waits until released, holding up the writer thread"""
+        self.released = threading.Event()
+
+    def tofile(self, f):
+        self.released.wait(10)
+
+    def __len__(self):
+        return 0
+
+
+def stall_writer(store):
+    """Hold up the writer and fill its queue, return a function letting it catch up"""
+    blocked = _BlockedRows()
+    store.queue.put((blocked, None))
+    while store.queue.qsize():
+        time.sleep(0.001)  # The writer took the blocked chunk
+    while not store.queue.full():
+        store.queue.put((np.empty(0, dtype=ROW_DTYPE), None))
+    return blocked.released.set
+
+
+def test_export_puts_rows_back_while_the_writer_is_behind(tmp_path):
+    path = str(tmp_path / 'trajectories.npz')
+    store = small_store(40, export_path=path, export_interval=5)
+    record_frames(store, range(1, 11), [1, 2])
+    resume = stall_writer(store)
+    record_frames(store, range(11, 31), [1, 2])  # Four flushes that find the queue full
+    assert store.exported.tolist()[:2] == [6, 6]  # Exported up to the flush at frame 6
+    resume()
+    record_frames(store, range(31, 36), [1, 2])
+    store.close()
+
+    columns = load_trajectories(path)
+    assert store.lost_rows == 0
+    assert columns['frame'].tolist() == [frame for frame in range(1, 36) for _ in (1, 2)]
+    assert columns['track'].tolist() == [1, 2] * 35
+    assert columns['foot'][columns['track'] == 1, 0].tolist() == [10 * frame + 1 for frame in range(1, 36)]
+
+
+def test_rows_overwritten_before_export_are_counted_lost(tmp_path):
+    path = str(tmp_path / 'trajectories.npz')
+    store = small_store(10, export_path=path, export_interval=5)
+    record_frames(store, range(1, 6), [1])
+    resume = stall_writer(store)
+    record_frames(store, range(6, 21), [1])
+    resume()
+    store.close()
+    # Only frame 1 was exported (the first record flushes); frames 2..10 were overwritten while the writer was stalled
+    assert store.lost_rows == 9
+    assert load_trajectories(path)['frame'].tolist() == [1] + list(range(11, 21))
+
+
+def test_evicted_rows_are_exported_or_counted_lost(tmp_path):
+    path = str(tmp_path / 'trajectories.npz')
+    store = small_store(20, max_tracks=2, export_path=path, export_interval=100)
+    record_frames(store, range(1, 4), [1, 2])
+    record_frames(store, range(4, 6), [2])
+    store.record(6, [player(3, 6)])  # Evicts track 1 with its three rows
+    resume = stall_writer(store)
+    # Evicts track 2 while the writer is behind: its rows after the first flush (frames 2..5) are lost
+    store.record(7, [player(4, 7)])
+    resume()
+    store.close()
+
+    columns = load_trajectories(path)
+    assert store.lost_rows == 4
+    assert sorted(zip(columns['track'].tolist(), columns['frame'].tolist())) == \
+        [(1, 1), (1, 2), (1, 3), (2, 1), (3, 6), (4, 7)]
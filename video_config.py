@@ -20,6 +20,116 @@ FRAME_HEIGHT = 1080
 FRAME_RATE = 30
 BUFFER_SIZE = 1  # Minimal buffer for real-time processing
 
+# Pipelined run mode (decode / analyze / render+record on separate stages)
+PIPELINE_ENABLED = False
+PIPELINE_QUEUE_SIZE = 8  # Max frames waiting between two stages
+PIPELINE_REPORT_INTERVAL = 120  # Print queue depths every N frames
+
+# Pose estimation (0 = run MediaPipe in the tracking process)
+POSE_WORKERS = 0  # Worker processes running pose on all player crops in parallel
+POSE_RUNNING_MODE = 'image'  # 'image' = detect every crop from scratch, 'video' = per-player tracking landmarkers
+POSE_LANDMARKER_POOL = 12  # Max per-player VIDEO-mode landmarkers (least recently used player loses its own)
+
+# Pose gating (MediaPipe only for players whose feet are near the boundary)
+POSE_GATE_ENABLED = False
+POSE_GATE_DISTANCE = 80  # Pose for players whose bbox bottom or predicted foot is this close (display pixels)
+POSE_GATE_MAX_POSES = 6  # Max pose calls per frame, closest players first (0 = no cap)
+
+# Violation evidence writer
+EVIDENCE_ASYNC = True  # Encode screenshots/clips on a background thread
+EVIDENCE_CODEC = 'mp4v'  # FourCC of violation clips
+EVIDENCE_EXTENSION = 'mp4'
+EVIDENCE_FPS = 30.0
+EVIDENCE_JPEG_QUALITY = 95
+EVIDENCE_QUEUE_SIZE = 32  # Max pending writer jobs
+EVIDENCE_DROP_POLICY = 'block'  # 'block' = tracking waits for the writer, 'drop' = drop streamed clip frames
+EVIDENCE_PREROLL_SECONDS = 3.0  # Footage before the violation at the start of every clip
+EVIDENCE_RING_ENCODING = None  # None = raw frames (~2.7 MB each at 720p), 'jpeg' or 'png' = compressed on a worker thread
+EVIDENCE_RING_QUALITY = 90  # JPEG quality (0-100) of the compressed frame ring
+EVIDENCE_RING_PNG_COMPRESSION = 1  # PNG compression level (0-9) of the compressed frame ring, higher is much slower
+EVIDENCE_RING_THREADS = 2  # Encoder threads of the compressed ring (PNG needs several to keep up at 30fps)
+
+# Preprocessing (single resize: the detector image is downscaled once from the decoded frame)
+SINGLE_RESIZE = False  # False = resize to display width, then let YOLO letterbox again; True = one downscale (pays off headless with POSE_SOURCE = 'native')
+DETECTOR_IMGSZ = 640  # YOLO input size (long side)
+POSE_SOURCE = 'display'  # Pose crops from the 'display' frame or the full-resolution 'native' frame
+RESIZE_INTERPOLATION = 'area'  # 'area' (quality) or 'linear' (much faster for non-integer downscales)
+
+# Detection stride (full YOLO every N-th frame, Kalman predictions in between)
+DETECTION_STRIDE = 1  # 1 = detect on every frame
+DETECTION_STRIDE_ADAPTIVE = False  # Pick the stride from measured processing time
+DETECTION_MAX_STRIDE = 4  # Upper limit for the adaptive stride
+STRIDE_BOUNDARY_MARGIN = 40  # Force detection when a predicted foot is this close (pixels) to the boundary
+STRIDE_TARGET_FPS = 30  # Frame rate the adaptive stride tries to keep up with
+
+# Boundary-band ROI detection (YOLO on tiles around the boundary, full frame every few frames)
+ROI_DETECTION = False
+ROI_TILE_SIZE = 704  # Tile width in frame pixels (704 covers a 1280 frame with two tiles)
+ROI_TILE_IMGSZ = None  # YOLO input size of a tile (None = ROI_TILE_SIZE: native resolution for small, distant feet; 352 = low-cost, full-frame scale)
+ROI_TILE_OVERLAP = 96  # Overlap between neighbouring tiles (pixels)
+ROI_MARGIN_ABOVE = 260  # Band height above the boundary (players stand above their feet)
+ROI_MARGIN_BELOW = 60  # Band height below the boundary
+ROI_FULL_FRAME_INTERVAL = 30  # Full-frame detection every N video frames (strided-out frames count) to pick up new tracks
+
+# Boundary drift tracking (re-register the court lines when the camera is bumped or pans)
+DRIFT_TRACKING = False
+DRIFT_INTERVAL = 30  # Frames between registrations against the setup frame (at least)
+DRIFT_BUDGET_MS = 1.0  # Average CPU milliseconds per frame; the interval is stretched to stay within it
+DRIFT_METHOD = 'orb'  # 'orb' (features + RANSAC, robust to players) or 'ecc' (intensity alignment, small motion)
+DRIFT_WORK_WIDTH = 480  # Width of the grayscale image registration runs on
+DRIFT_MAX_SHIFT = 0.08  # Boundary moved by more than this fraction of the frame width = too large to correct
+DRIFT_MAX_ROTATION = 5.0  # Degrees of camera roll beyond which the drift is not corrected
+DRIFT_MIN_UPDATE = 2.0  # Pixels (original video) the boundary must move before the lines are recompiled
+DRIFT_MIN_INLIERS = 25  # Matched features a registration needs
+DRIFT_LOST_AFTER = 5  # Failed registrations in a row before the boundary is reported unverifiable
+
+# Trajectory history (bounded per-player positions for post-raid analysis and ID-switch debugging)
+TRAJECTORY_HISTORY = False
+TRAJECTORY_MAX_TRACKS = 32  # Tracks kept in memory (the one seen least recently makes room for a new one)
+TRAJECTORY_MEMORY_MB = 64.0  # Memory ceiling of the store, sets how many frames each track keeps
+TRAJECTORY_LANDMARKS = False  # Also keep pose landmarks (float16, relative to the bbox)
+TRAJECTORY_EXPORT_PATH = None  # e.g. 'trajectories.npz' - rows are streamed to disk and packed into it on close
+TRAJECTORY_EXPORT_INTERVAL = 30  # Frames between hand-offs of new rows to the export thread
+
+# Multi-stream settings (multi_stream.py: several courts sharing one YOLO model)
+MULTI_STREAM_CONFIG = 'streams.json'  # List of {"name", "video", "config", "output_dir"}
+MULTI_STREAM_BATCH_SIZE = 4  # Max frames (at most one per stream) per shared inference
+MULTI_STREAM_QUEUE_SIZE = 4  # Decoded frames buffered per stream
+
+# Parallel segment analysis (analyze_video.py --segments: one long file split over a process pool)
+SEGMENT_WORKERS = None  # Worker processes, each with its own model (None = CPU cores / 4, at least 1)
+SEGMENT_OVERLAP_SECONDS = 10.0  # Frames shared by neighbouring segments (>= clip pre-roll + length of 8s)
+SEGMENT_MIN_SECONDS = 60.0  # Shorter videos are split into fewer segments
+SEGMENT_MATCH_IOU = 0.5  # Mean bbox IoU over the overlap for two tracks to be the same player
+SEGMENT_MATCH_FRAMES = 10  # Overlap frames both tracks must be seen in to be matched
+
+# Violation event bus (structured events pushed to subscribers as they happen)
+EVENTS_JSONL_PATH = None  # e.g. 'violations/events.jsonl'
+EVENTS_SOCKET = None  # Unix socket path (e.g. '/tmp/kabadi-events.sock') or 'tcp://127.0.0.1:8765'
+EVENTS_WEBSOCKET_PORT = None  # e.g. 8766 for scoreboards/tablets (ws://host:8766)
+EVENTS_WEBSOCKET_HOST = '127.0.0.1'  # '0.0.0.0' to accept tablets on the network
+EVENTS_QUEUE_SIZE = 1024  # Events buffered per sink before new ones are dropped
+EVENTS_CLIENT_BUFFER = 1 << 20  # Bytes a socket client may lag behind before it is disconnected
+
+# Display window (frames are composited and shown on the main thread while analysis runs on a worker)
+DISPLAY_ENABLED = True  # False = never open a window (also skipped automatically without a display)
+DISPLAY_REFRESH_HZ = 60  # Max window updates per second; newer frames replace ones not shown yet
+
+# Hot-path instrumentation (per-stage timers with rolling p50/p95/p99)
+TIMING_ENABLED = False  # Disabled timers cost one attribute check per stage
+TIMING_WINDOW = 600  # Frames in the rolling percentile window (20s at 30fps)
+TIMING_PANEL = True  # Show the timing panel next to the stats box
+TIMING_EXPORT_PATH = None  # e.g. 'metrics.prom' for a Prometheus textfile collector
+TIMING_EXPORT_INTERVAL = 10.0  # Seconds between metrics file updates
+
+# Detector inference backend (exported models are created in DETECTOR_EXPORT_DIR on first use)
+DETECTOR_BACKEND = 'torch'  # 'torch' (PyTorch weights), 'onnx' (ONNX Runtime) or 'openvino'
+DETECTOR_WEIGHTS = 'yolov8n.pt'
+DETECTOR_INT8 = False  # Quantize the exported onnx/openvino model to int8
+DETECTOR_CALIBRATION = None  # Directory of frames or a video for int8 calibration (None = tracking video)
+DETECTOR_CALIBRATION_FRAMES = 300  # Frames sampled for calibration
+DETECTOR_EXPORT_DIR = 'models'
+
 # Webcam settings
 WEBCAM_ID = 0  # Default webcam (0 = first camera)
 
@@ -47,4 +157,146 @@ def get_frame_config():
         'height': FRAME_HEIGHT,
         'fps': FRAME_RATE,
         'buffer_size': BUFFER_SIZE
-    }
\ No newline at end of file
+    }
+
+def get_pipeline_config():
+    return {
+        'enabled': PIPELINE_ENABLED,
+        'queue_size': PIPELINE_QUEUE_SIZE,
+        'report_interval': PIPELINE_REPORT_INTERVAL
+    }
+
+def get_pose_config():
+    return {
+        'workers': POSE_WORKERS,
+        'running_mode': POSE_RUNNING_MODE,
+        'landmarker_pool': POSE_LANDMARKER_POOL
+    }
+
+def get_pose_gate_config():
+    return {
+        'enabled': POSE_GATE_ENABLED,
+        'distance': POSE_GATE_DISTANCE,
+        'max_poses': POSE_GATE_MAX_POSES
+    }
+
+def get_evidence_config():
+    return {
+        'asynchronous': EVIDENCE_ASYNC,
+        'codec': EVIDENCE_CODEC,
+        'extension': EVIDENCE_EXTENSION,
+        'fps': EVIDENCE_FPS,
+        'jpeg_quality': EVIDENCE_JPEG_QUALITY,
+        'queue_size': EVIDENCE_QUEUE_SIZE,
+        'drop_policy': EVIDENCE_DROP_POLICY,
+        'preroll_seconds': EVIDENCE_PREROLL_SECONDS,
+        'ring_encoding': EVIDENCE_RING_ENCODING,
+        'ring_quality': EVIDENCE_RING_QUALITY,
+        'ring_png_compression': EVIDENCE_RING_PNG_COMPRESSION,
+        'ring_threads': EVIDENCE_RING_THREADS
+    }
+
+def get_multi_stream_config():
+    return {
+        'config_path': MULTI_STREAM_CONFIG,
+        'batch_size': MULTI_STREAM_BATCH_SIZE,
+        'queue_size': MULTI_STREAM_QUEUE_SIZE
+    }
+
+def get_stride_config():
+    return {
+        'stride': DETECTION_STRIDE,
+        'adaptive': DETECTION_STRIDE_ADAPTIVE,
+        'max_stride': DETECTION_MAX_STRIDE,
+        'boundary_margin': STRIDE_BOUNDARY_MARGIN,
+        'target_fps': STRIDE_TARGET_FPS
+    }
+
+def get_roi_config():
+    return {
+        'enabled': ROI_DETECTION,
+        'tile_size': ROI_TILE_SIZE,
+        'imgsz': DETECTOR_IMGSZ,
+        'tile_imgsz': ROI_TILE_IMGSZ,
+        'tile_overlap': ROI_TILE_OVERLAP,
+        'margin_above': ROI_MARGIN_ABOVE,
+        'margin_below': ROI_MARGIN_BELOW,
+        'full_frame_interval': ROI_FULL_FRAME_INTERVAL
+    }
+
+def get_preprocess_config():
+    return {
+        'single_resize': SINGLE_RESIZE,
+        'detector_imgsz': DETECTOR_IMGSZ,
+        'pose_source': POSE_SOURCE,
+        'interpolation': RESIZE_INTERPOLATION
+    }
+
+def get_timing_config():
+    return {
+        'enabled': TIMING_ENABLED,
+        'window': TIMING_WINDOW,
+        'panel': TIMING_PANEL,
+        'export_path': TIMING_EXPORT_PATH,
+        'export_interval': TIMING_EXPORT_INTERVAL
+    }
+
+def get_detector_config():
+    return {
+        'backend': DETECTOR_BACKEND,
+        'weights': DETECTOR_WEIGHTS,
+        'imgsz': DETECTOR_IMGSZ,
+        'int8': DETECTOR_INT8,
+        'calibration': DETECTOR_CALIBRATION or VIDEO_PATHS['player_tracking'],
+        'calibration_frames': DETECTOR_CALIBRATION_FRAMES,
+        'export_dir': DETECTOR_EXPORT_DIR
+    }
+
+def get_display_config():
+    return {
+        'enabled': DISPLAY_ENABLED,
+        'refresh_hz': DISPLAY_REFRESH_HZ
+    }
+
+def get_events_config():
+    return {
+        'jsonl_path': EVENTS_JSONL_PATH,
+        'socket_address': EVENTS_SOCKET,
+        'websocket_port': EVENTS_WEBSOCKET_PORT,
+        'websocket_host': EVENTS_WEBSOCKET_HOST,
+        'queue_size': EVENTS_QUEUE_SIZE,
+        'client_buffer': EVENTS_CLIENT_BUFFER
+    }
+
+def get_segment_config():
+    return {
+        'workers': SEGMENT_WORKERS,
+        'overlap_seconds': SEGMENT_OVERLAP_SECONDS,
+        'min_seconds': SEGMENT_MIN_SECONDS,
+        'match_iou': SEGMENT_MATCH_IOU,
+        'match_frames': SEGMENT_MATCH_FRAMES
+    }
+
+def get_drift_config():
+    return {
+        'enabled': DRIFT_TRACKING,
+        'interval': DRIFT_INTERVAL,
+        'budget_ms': DRIFT_BUDGET_MS,
+        'method': DRIFT_METHOD,
+        'work_width': DRIFT_WORK_WIDTH,
+        'max_shift': DRIFT_MAX_SHIFT,
+        'max_rotation': DRIFT_MAX_ROTATION,
+        'min_update': DRIFT_MIN_UPDATE,
+        'min_inliers': DRIFT_MIN_INLIERS,
+        'lost_after': DRIFT_LOST_AFTER
+    }
+
+def get_trajectory_config():
+    return {
+        'enabled': TRAJECTORY_HISTORY,
+        'max_tracks': TRAJECTORY_MAX_TRACKS,
+        'memory_mb': TRAJECTORY_MEMORY_MB,
+        'landmarks': TRAJECTORY_LANDMARKS,
+        'export_path': TRAJECTORY_EXPORT_PATH,
+        'export_interval': TRAJECTORY_EXPORT_INTERVAL
+    }